@@ -1,18 +1,51 @@
-import math
 import numpy as np
 from config import (
     CLIMB_RATE, DESCENT_RATE, CRUISE_SPEED,
-    MAX_ALTITUDE, MIN_ALTITUDE
+    MAX_ALTITUDE, MIN_ALTITUDE, MIN_ASSIGNED_SPEED
 )
+from fleet import AircraftFleet
+
+
+def _fleet_attribute(name, cast=float):
+    def getter(self):
+        return cast(getattr(self._fleet, name)[self._index])
+
+    def setter(self, value):
+        getattr(self._fleet, name)[self._index] = value
+
+    return property(getter, setter)
+
 
 class Aircraft:
+    # Lightweight view onto one row of an AircraftFleet. A new aircraft lives in a
+    # private single-row fleet until GameState adds it to the shared one.
+    altitude = _fleet_attribute('altitude')  # feet
+    heading = _fleet_attribute('heading')  # degrees
+    speed = _fleet_attribute('speed')  # knots
+    target_altitude = _fleet_attribute('target_altitude')
+    target_heading = _fleet_attribute('target_heading')
+    target_speed = _fleet_attribute('target_speed')
+    cleared_for_approach = _fleet_attribute('cleared_for_approach', bool)
+    holding_pattern = _fleet_attribute('holding_pattern', bool)
+    max_turn_rate = _fleet_attribute('max_turn_rate')  # degrees per second
+    acceleration = _fleet_attribute('acceleration')  # knots per second
+    max_speed = _fleet_attribute('max_speed')  # knots
+    climb_rate = _fleet_attribute('climb_rate')
+    descent_rate = _fleet_attribute('descent_rate')
+    aircraft_id = _fleet_attribute('aircraft_id', int)
+    navigating = _fleet_attribute('navigating', bool)
+
     def __init__(self, callsign, aircraft_type, position, altitude, heading, speed=None):
+        self._fleet = None
+        self._index = None
+        AircraftFleet(capacity=1).add(self)
+
         self.callsign = callsign
         self.aircraft_type = aircraft_type  # 'small', 'medium', or 'heavy'
-        self.position = np.array(position, dtype=float)  # [x, y] in nautical miles
-        self.altitude = float(altitude)  # feet
-        self.heading = float(heading)  # degrees
-        self.speed = float(speed if speed else CRUISE_SPEED[aircraft_type])  # knots
+        self.position = position  # [x, y] in nautical miles
+        self.altitude = altitude
+        self.heading = heading
+        self.speed = speed if speed else CRUISE_SPEED[aircraft_type]
         
         # Flight plan and control
         self.target_altitude = altitude
@@ -23,65 +56,82 @@ class Aircraft:
         self.holding_pattern = False
         
         # Performance characteristics
-        self.max_turn_rate = 3.0  # degrees per second
-        self.acceleration = 2.0    # knots per second
+        self.max_turn_rate = 3.0
+        self.acceleration = 2.0
+        self.max_speed = CRUISE_SPEED[aircraft_type]
         self.climb_rate = CLIMB_RATE[aircraft_type]
         self.descent_rate = DESCENT_RATE[aircraft_type]
 
+    @property
+    def position(self):
+        # Row view into the fleet's position array
+        return self._fleet.position[self._index]
+
+    @position.setter
+    def position(self, value):
+        self._fleet.position[self._index] = value
+        self._fleet.previous_position[self._index] = value
+        self._fleet.version += 1
+        self._fleet.jump_version += 1
+
+    def interpolated_position(self, alpha):
+        # Position blended between the last two physics steps, for rendering
+        previous = self._fleet.previous_position[self._index]
+        return previous + (self.position - previous) * alpha
+
     def update(self, dt, simulation_speed):
-        dt *= simulation_speed
-        
-        # Update altitude
-        if abs(self.target_altitude - self.altitude) > 10:
-            if self.target_altitude > self.altitude:
-                self.altitude = min(
-                    self.altitude + (self.climb_rate * dt / 60),
-                    self.target_altitude
-                )
-            else:
-                self.altitude = max(
-                    self.altitude - (self.descent_rate * dt / 60),
-                    self.target_altitude
-                )
-        
-        # Update speed
-        speed_diff = self.target_speed - self.speed
-        if abs(speed_diff) > 1:
-            self.speed += np.sign(speed_diff) * min(
-                abs(speed_diff),
-                self.acceleration * dt
-            )
-        
-        # Update heading
-        heading_diff = self.get_heading_difference(self.heading, self.target_heading)
-        if abs(heading_diff) > 0.5:
-            max_turn = self.max_turn_rate * dt
-            turn_amount = np.sign(heading_diff) * min(abs(heading_diff), max_turn)
-            self.heading = (self.heading + turn_amount) % 360
-        
-        # Update position based on heading and speed
-        heading_rad = math.radians(self.heading)
-        velocity = np.array([
-            math.sin(heading_rad),
-            math.cos(heading_rad)
-        ]) * self.speed * dt / 3600  # Convert knots to nm/s
-        
-        self.position += velocity
+        self._fleet.step(slice(self._index, self._index + 1), dt * simulation_speed)
 
     def set_target_altitude(self, altitude):
         self.target_altitude = min(max(altitude, MIN_ALTITUDE), MAX_ALTITUDE)
 
     def set_target_heading(self, heading):
+        # An assigned heading takes the aircraft off its route
+        self.navigating = False
         self.target_heading = heading % 360
 
     def set_target_speed(self, speed):
-        self.target_speed = min(max(speed, 100), CRUISE_SPEED[self.aircraft_type])
+        self.target_speed = min(max(speed, MIN_ASSIGNED_SPEED), self.max_speed)
 
     def add_waypoint(self, waypoint):
-        self.waypoints.append(waypoint)
+        self.waypoints.append(np.array(waypoint, dtype=float))
+        if len(self.waypoints) <= 2:
+            self._sync_route()
+
+    def set_route(self, waypoints):
+        self.waypoints = [np.array(waypoint, dtype=float) for waypoint in waypoints]
+        self._sync_route()
 
     def clear_waypoints(self):
         self.waypoints = []
+        self._sync_route()
+
+    def direct_to(self, waypoint):
+        # Proceed direct, resuming the route after the fix if it is on the route
+        waypoint = np.array(waypoint, dtype=float)
+        for index, point in enumerate(self.waypoints):
+            if np.allclose(point, waypoint):
+                self.set_route(self.waypoints[index:])
+                return
+        self.set_route([waypoint])
+
+    def sequence_waypoint(self):
+        # Active waypoint reached: make the next one active
+        if self.waypoints:
+            self.waypoints.pop(0)
+        self._sync_route()
+
+    def _sync_route(self):
+        # Mirror the head of the route into the fleet columns guidance reads
+        fleet, index = self._fleet, self._index
+        waypoints = self.waypoints
+        fleet.navigating[index] = bool(waypoints)
+        fleet.tracking[index] = False  # A new active fix starts untracked
+        if waypoints:
+            fleet.waypoint[index] = waypoints[0]
+        fleet.has_next_waypoint[index] = len(waypoints) > 1
+        if len(waypoints) > 1:
+            fleet.next_waypoint[index] = waypoints[1]
 
     @staticmethod
     def get_heading_difference(current, target):
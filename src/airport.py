@@ -8,6 +8,7 @@ class Airport:
         self.lon = lon
         self.runways = []
         self.taxiways = []
+        self.waypoints = []  # Named fixes published for this airport
 
     def add_runway(self, name, start_pos, end_pos, width):
         self.runways.append({
@@ -19,3 +20,10 @@ class Airport:
 
     def add_taxiway(self, path):
         self.taxiways.append(np.array(path, dtype=float))
+
+    def add_waypoint(self, name, position, waypoint_type='fix'):
+        self.waypoints.append({
+            'name': name,
+            'position': np.array(position, dtype=float),
+            'type': waypoint_type
+        })
@@ -1,59 +1,153 @@
+import json
+import os
+import pickle
+import tempfile
 from airport import Airport
+from config import AIRPORT_DATA_DIR, AIRPORT_CACHE_PATH
+
+CACHE_VERSION = 1
+
+
+def _source_signature(data_dir):
+    # (file name, size, mtime) for every airport file; any edit invalidates the cache
+    return sorted(
+        (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+        for entry in os.scandir(data_dir)
+        if entry.name.endswith('.json')
+    )
+
+
+def compile_airport_cache(data_dir=AIRPORT_DATA_DIR, cache_path=AIRPORT_CACHE_PATH):
+    # Cache layout: a pickled header {version, signature, index} followed by one
+    # pickled record per airport. The index maps ICAO -> (name, offset, length)
+    # so opening the database reads only the header.
+    signature = _source_signature(data_dir)
+    blobs = []
+    index = {}
+    offset = 0
+    for name, _, _ in signature:
+        with open(os.path.join(data_dir, name)) as stream:
+            record = json.load(stream)
+        blob = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        index[record['icao']] = (record['name'], offset, len(blob))
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = {'version': CACHE_VERSION, 'signature': signature, 'index': index}
+    # Write beside the cache and rename over it, so a crash or a second process
+    # starting up never sees a half-written file
+    temp_path = None
+    try:
+        descriptor, temp_path = tempfile.mkstemp(
+            prefix=os.path.basename(cache_path) + '.', suffix='.tmp',
+            dir=os.path.dirname(os.path.abspath(cache_path))
+        )
+        with os.fdopen(descriptor, 'wb') as stream:
+            pickle.dump(header, stream, protocol=pickle.HIGHEST_PROTOCOL)
+            for blob in blobs:
+                stream.write(blob)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None  # Read-only install: fall back to parsing the data files
+    return header
+
+
+def build_airport(record):
+    airport = Airport(record['name'], record['icao'], record['lat'], record['lon'])
+    for runway in record['runways']:
+        airport.add_runway(runway['name'], runway['start'], runway['end'], runway['width'])
+    for taxiway in record['taxiways']:
+        airport.add_taxiway(taxiway)
+    for waypoint in record.get('waypoints', []):
+        airport.add_waypoint(waypoint['name'], waypoint['position'], waypoint.get('type', 'fix'))
+    return airport
+
+
+class AirportDatabase:
+    # Read-only mapping of ICAO code -> Airport. Only the cache header is read up
+    # front; each Airport is built from its record the first time it is requested.
+    def __init__(self, data_dir=AIRPORT_DATA_DIR, cache_path=AIRPORT_CACHE_PATH):
+        self.data_dir = data_dir
+        self.cache_path = cache_path
+        self.airports = {}  # ICAO -> Airport built so far
+        self.data_offset = 0
+        self.index = self._load_index()
+
+    def _load_index(self):
+        signature = _source_signature(self.data_dir)
+        try:
+            with open(self.cache_path, 'rb') as stream:
+                header = pickle.load(stream)
+                self.data_offset = stream.tell()
+            if header.get('version') == CACHE_VERSION and header['signature'] == signature:
+                return header['index']
+        except (OSError, EOFError, pickle.UnpicklingError):
+            pass
+
+        header = compile_airport_cache(self.data_dir, self.cache_path)
+        if header is None:
+            self.cache_path = None
+            return {
+                record['icao']: (record['name'], file_name, None)
+                for file_name, record in self._scan_data_files()
+            }
+        # Index from the file actually on disk, in case another process replaced it
+        with open(self.cache_path, 'rb') as stream:
+            header = pickle.load(stream)
+            self.data_offset = stream.tell()
+        return header['index']
+
+    def _scan_data_files(self):
+        for name, _, _ in _source_signature(self.data_dir):
+            with open(os.path.join(self.data_dir, name)) as stream:
+                record = json.load(stream)
+            yield name, record
+
+    def _load_record(self, icao):
+        _, offset, length = self.index[icao]
+        if self.cache_path is None:
+            with open(os.path.join(self.data_dir, offset)) as stream:  # offset is the file name
+                return json.load(stream)
+        with open(self.cache_path, 'rb') as stream:
+            stream.seek(self.data_offset + offset)
+            return pickle.loads(stream.read(length))
+
+    def __getitem__(self, icao):
+        airport = self.airports.get(icao)
+        if airport is None:
+            if icao not in self.index:
+                raise KeyError(icao)
+            airport = self.airports[icao] = build_airport(self._load_record(icao))
+        return airport
+
+    def __contains__(self, icao):
+        return icao in self.index
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def names(self):
+        # (ICAO, name) for every airport, in ICAO order
+        return sorted((icao, entry[0]) for icao, entry in self.index.items())
+
+
+_database = None
+
+
+def get_airport_database():
+    # Process-wide database shared by every GameState
+    global _database
+    if _database is None:
+        _database = AirportDatabase()
+    return _database
+
 
 def create_airports():
-    airports = {}
-
-    # Rochester International Airport (KRST)
-    rst = Airport("Rochester International", "KRST", 43.9083, -92.5000)
-    # Runway 13/31
-    rst.add_runway("13/31", [-1.2, 0.5], [1.2, -0.5], 150)
-    # Runway 3/21
-    rst.add_runway("3/21", [-0.8, -1.0], [0.8, 1.0], 150)
-    # Taxiways (simplified)
-    rst.add_taxiway([[-1.2, 0.5], [-0.5, 0.0], [0.8, 1.0]])
-    rst.add_taxiway([[1.2, -0.5], [0.5, 0.0], [-0.8, -1.0]])
-    airports['KRST'] = rst
-
-    # Minneapolis-St. Paul International Airport (KMSP)
-    msp = Airport("Minneapolis-St. Paul International", "KMSP", 44.8820, -93.2218)
-    # Runway 12R/30L
-    msp.add_runway("12R/30L", [-1.5, 0.7], [1.5, -0.7], 200)
-    # Runway 12L/30R
-    msp.add_runway("12L/30R", [-1.2, 1.2], [1.2, -1.2], 150)
-    # Runway 4/22
-    msp.add_runway("4/22", [-1.0, -1.5], [1.0, 1.5], 150)
-    # Runway 17/35
-    msp.add_runway("17/35", [0.2, -1.8], [-0.2, 1.8], 150)
-    # Taxiways (simplified)
-    msp.add_taxiway([[-1.5, 0.7], [0.0, 0.0], [1.0, 1.5]])
-    msp.add_taxiway([[1.5, -0.7], [0.0, 0.0], [-1.2, 1.2]])
-    msp.add_taxiway([[-1.0, -1.5], [0.0, 0.0], [0.2, -1.8]])
-    msp.add_taxiway([[1.2, -1.2], [0.0, 0.0], [-0.2, 1.8]])
-    airports['KMSP'] = msp
-
-    # Chicago O'Hare International Airport (KORD)
-    ord = Airport("Chicago O'Hare International", "KORD", 41.9776, -87.9047)
-    # Runway 10L/28R
-    ord.add_runway("10L/28R", [-2.0, 0.3], [2.0, -0.3], 150)
-    # Runway 9R/27L
-    ord.add_runway("9R/27L", [-1.8, 1.0], [1.8, 0.4], 150)
-    # Runway 10C/28C
-    ord.add_runway("10C/28C", [-1.7, -0.5], [1.7, -1.1], 200)
-    # Runway 9C/27C
-    ord.add_runway("9C/27C", [-1.8, 0.8], [1.8, 0.2], 200)
-    # Runway 4R/22L
-    ord.add_runway("4R/22L", [-0.5, -1.5], [0.5, 1.5], 150)
-    # Runway 4L/22R
-    ord.add_runway("4L/22R", [-1.2, -0.8], [1.2, 0.8], 150)
-    # Runway 9L/27R
-    ord.add_runway("9L/27R", [-1.2, 1.5], [1.2, 0.9], 150)
-    # Runway 10R/28L
-    ord.add_runway("10R/28L", [-1.2, -1.2], [1.2, -1.8], 150)
-    # Taxiways (simplified)
-    ord.add_taxiway([[-2.0, 0.3], [0.0, 0.0], [1.8, 0.4]])
-    ord.add_taxiway([[-1.8, 1.0], [0.0, 0.0], [-1.7, -0.5]])
-    ord.add_taxiway([[1.7, -1.1], [0.0, 0.0], [-0.5, -1.5]])
-    ord.add_taxiway([[0.5, 1.5], [0.0, 0.0], [-1.2, -0.8]])
-    airports['KORD'] = ord
-
-    return airports
+    # Every airport, fully built
+    database = get_airport_database()
+    return {icao: database[icao] for icao in database}
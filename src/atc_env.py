@@ -0,0 +1,273 @@
+import argparse
+import time
+import numpy as np
+from fleet import FleetBatch
+from game_state import GameState, LaneFleets
+from profiler import FrameProfiler
+from config import (
+    RADAR_RANGE, MAX_ALTITUDE, CRUISE_SPEED,
+    ENV_MAX_AIRCRAFT, ENV_STEP_DT, ENV_EPISODE_LENGTH
+)
+
+# Per-slot observation columns, scaled to roughly [-1, 1]
+OBSERVATION_FEATURES = (
+    'present', 'x', 'y', 'altitude', 'heading_sin', 'heading_cos', 'speed',
+    'target_altitude', 'cleared_for_approach'
+)
+
+# Per-slot action columns, each the command kind it is issued as; NaN leaves it alone
+ACTION_FIELDS = ('heading', 'altitude', 'speed')
+
+# Fleet columns the observation is built from
+OBSERVED_COLUMNS = (
+    'position', 'altitude', 'heading', 'speed', 'target_altitude', 'cleared_for_approach', 'aircraft_id'
+)
+
+SPEED_SCALE = max(CRUISE_SPEED.values())
+
+
+def write_observations(columns, counts, out, slot_ids):
+    # Observations for several fleets at once. columns maps fleet column names to
+    # (lanes, capacity, ...) arrays, counts is each lane's aircraft count, and out is
+    # (lanes, max_aircraft, features); slot_ids gets the aircraft_id behind each slot.
+    # Rows past a fleet's count are zero, so only the heading cosine needs masking.
+    slots = min(out.shape[1], columns['heading'].shape[1])
+    present = np.arange(slots) < counts[:, None]
+    position = columns['position'][:, :slots]
+    heading = np.radians(columns['heading'][:, :slots])
+    out[:, :slots, 0] = present
+    out[:, :slots, 1] = position[..., 0] / RADAR_RANGE
+    out[:, :slots, 2] = position[..., 1] / RADAR_RANGE
+    out[:, :slots, 3] = columns['altitude'][:, :slots] / MAX_ALTITUDE
+    out[:, :slots, 4] = np.sin(heading)
+    out[:, :slots, 5] = np.cos(heading) * present
+    out[:, :slots, 6] = columns['speed'][:, :slots] / SPEED_SCALE
+    out[:, :slots, 7] = columns['target_altitude'][:, :slots] / MAX_ALTITUDE
+    out[:, :slots, 8] = columns['cleared_for_approach'][:, :slots]
+    out[:, slots:] = 0.0
+    slot_ids[:, :slots] = np.where(present, columns['aircraft_id'][:, :slots], -1)
+    slot_ids[:, slots:] = -1
+
+
+class ATCEnv:
+    # Reinforcement-learning wrapper around one headless GameState, with the
+    # reset/step/observation shape of a Gym environment. Slot i of an observation is
+    # the aircraft in fleet row i, and the action's slot i is issued to that same
+    # aircraft on the next step. The reward is the change in GameState.score, so it
+    # follows _update_score: -100 per conflict pair and +1 per aircraft cleared for
+    # approach, per simulated second. The conflict probe only feeds the radar display,
+    # so it is off unless conflict_probe is set.
+    def __init__(self, airport_icao='KRST', max_aircraft=ENV_MAX_AIRCRAFT, step_dt=ENV_STEP_DT,
+                 episode_length=ENV_EPISODE_LENGTH, spawn_interval=None, seed=None,
+                 conflict_probe=False, fleet=None, profiler=None):
+        self.airport_icao = airport_icao
+        self.max_aircraft = max_aircraft
+        self.step_dt = step_dt
+        self.episode_length = episode_length
+        self.spawn_interval = spawn_interval
+        self.conflict_probe = conflict_probe
+        self.fleet = fleet  # Fleet storage reused by every episode, e.g. a FleetBatch lane
+        self.profiler = profiler  # Shared by every episode's GameState
+        self.observation_shape = (max_aircraft, len(OBSERVATION_FEATURES))
+        self.action_shape = (max_aircraft, len(ACTION_FIELDS))
+        self.seeds = np.random.SeedSequence(seed)  # Episode seeds when reset() gets none
+        self.game_state = None
+        self.slot_ids = np.full(max_aircraft, -1, dtype=np.int64)  # aircraft_id per observed slot
+        self.episode_start = 0.0
+
+    def reset(self, seed=None, out=None):
+        if seed is None:
+            seed = int(self.seeds.spawn(1)[0].generate_state(1)[0])
+        if self.fleet is not None:
+            self.fleet.assign([])
+        self.game_state = GameState(self.airport_icao, seed=seed, profiler=self.profiler, fleet=self.fleet)
+        if not self.conflict_probe:
+            self.game_state.conflict_probe_interval = np.inf
+        if self.spawn_interval is not None:
+            self.game_state.spawn_interval = self.spawn_interval
+        self.episode_start = self.game_state.time
+        return self.observe(out), self._info()
+
+    def step(self, action=None, out=None):
+        # Returns (observation, reward, terminated, truncated, info)
+        game_state = self.game_state
+        if action is not None:
+            self._issue(np.asarray(action, dtype=float))
+        score = game_state.score
+        game_state.step(self.step_dt)
+        reward = game_state.score - score
+        truncated = game_state.time - self.episode_start >= self.episode_length
+        return self.observe(out), reward, False, truncated, self._info()
+
+    def _issue(self, action):
+        slot_ids = self.slot_ids
+        for column, kind in enumerate(ACTION_FIELDS):
+            values = action[:, column]
+            chosen = ~np.isnan(values) & (slot_ids >= 0)
+            if chosen.any():
+                self.game_state.issue_commands(kind, slot_ids[chosen], values[chosen])
+
+    def observe(self, out=None):
+        # Observation of the first max_aircraft fleet rows, written into out if given
+        if out is None:
+            out = np.zeros(self.observation_shape, dtype=np.float32)
+        fleet = self.game_state.fleet
+        columns = {name: getattr(fleet, name)[None] for name in OBSERVED_COLUMNS}
+        write_observations(columns, np.array([fleet.count]), out[None], self.slot_ids[None])
+        return out
+
+    def _info(self):
+        game_state = self.game_state
+        return {
+            'time': game_state.time,
+            'score': game_state.score,
+            'aircraft': len(game_state.aircraft),
+            'conflicts': len(game_state.conflicts)
+        }
+
+
+class VectorATCEnv:
+    # N independent ATCEnvs advanced in lockstep. Observations, rewards and done
+    # flags come back as stacked arrays; an environment that finishes is reset at
+    # once, and the observation it ended on is kept in infos['final_observation'].
+    #
+    # Every environment's fleet is a lane of one FleetBatch, and GameState.step_lockstep
+    # runs guidance, wind and kinematics as single array passes over all of them.
+    # Events, conflicts, score and removal stay per environment, and the results are
+    # the same as stepping each ATCEnv on its own. One profiler times every phase.
+    def __init__(self, num_envs, airport_icao='KRST', seed=None, profiler=None, **env_options):
+        self.batch = FleetBatch(num_envs)
+        self.lanes = LaneFleets(self.batch)
+        self.profiler = profiler or FrameProfiler()  # Disabled unless enabled by the caller
+        seeds = np.random.SeedSequence(seed).spawn(num_envs)
+        self.envs = [
+            ATCEnv(
+                airport_icao, seed=int(env_seed.generate_state(1)[0]), fleet=fleet,
+                profiler=self.profiler, **env_options
+            )
+            for env_seed, fleet in zip(seeds, self.batch.fleets)
+        ]
+        self.num_envs = num_envs
+        first = self.envs[0]
+        self.step_dt = first.step_dt
+        self.observation_shape = (num_envs,) + first.observation_shape
+        self.action_shape = (num_envs,) + first.action_shape
+        self.observations = np.zeros(self.observation_shape, dtype=np.float32)
+        self.final_observations = np.zeros(self.observation_shape, dtype=np.float32)
+        self.slot_ids = np.full((num_envs, first.max_aircraft), -1, dtype=np.int64)
+        for index, env in enumerate(self.envs):
+            env.slot_ids = self.slot_ids[index]
+        self.rewards = np.zeros(num_envs)
+        self.terminated = np.zeros(num_envs, dtype=bool)
+        self.truncated = np.zeros(num_envs, dtype=bool)
+        self.time = np.zeros(num_envs)
+        self.score = np.zeros(num_envs)
+        self.aircraft = np.zeros(num_envs, dtype=np.int64)
+        self.conflicts = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self, seed=None):
+        # A seed reseeds every environment, each with its own seed derived from it
+        seeds = [None] * self.num_envs
+        if seed is not None:
+            seeds = [int(env_seed.generate_state(1)[0]) for env_seed in np.random.SeedSequence(seed).spawn(self.num_envs)]
+        for index, env in enumerate(self.envs):
+            env.reset(seeds[index])
+            self._record_info(index, env._info())
+        self._observe()
+        return self.observations.copy(), self._infos()
+
+    def step(self, actions=None):
+        # Returns (observations, rewards, terminated, truncated, infos), each stacked
+        envs = self.envs
+        if actions is not None:
+            actions = np.asarray(actions, dtype=float)
+            chosen = ~np.isnan(actions).all(axis=2) & (self.slot_ids >= 0)
+            for index in np.flatnonzero(chosen.any(axis=1)).tolist():
+                envs[index]._issue(actions[index])
+        self.rewards[:] = [env.game_state.score for env in envs]
+        GameState.step_lockstep([env.game_state for env in envs], self.step_dt, self.lanes)
+        self.profiler.end_frame()
+        for index, env in enumerate(envs):
+            game_state = env.game_state
+            self.rewards[index] = game_state.score - self.rewards[index]
+            self.truncated[index] = game_state.time - env.episode_start >= env.episode_length
+            self._record_info(index, env._info())
+        self._observe()
+
+        infos = self._infos()
+        done = self.terminated | self.truncated
+        if done.any():
+            self.final_observations[done] = self.observations[done]
+            for index in np.flatnonzero(done).tolist():
+                self.envs[index].reset(out=self.observations[index])
+            infos['final_observation'] = self.final_observations.copy()
+            infos['done'] = done.copy()
+        return (
+            self.observations.copy(), self.rewards.copy(), self.terminated.copy(),
+            self.truncated.copy(), infos
+        )
+
+    def _observe(self):
+        counts = np.array([fleet.count for fleet in self.batch.fleets])
+        write_observations(self.batch.columns, counts, self.observations, self.slot_ids)
+
+    def _record_info(self, index, info):
+        self.time[index] = info['time']
+        self.score[index] = info['score']
+        self.aircraft[index] = info['aircraft']
+        self.conflicts[index] = info['conflicts']
+
+    def _infos(self):
+        return {
+            'time': self.time.copy(),
+            'score': self.score.copy(),
+            'aircraft': self.aircraft.copy(),
+            'conflicts': self.conflicts.copy()
+        }
+
+
+def random_actions(action_shape, rng):
+    # Occasionally clear a few aircraft to a random heading
+    actions = np.full(action_shape, np.nan)
+    pick = rng.random(action_shape[:2]) < 0.01
+    actions[..., 0][pick] = rng.uniform(0, 360, pick.sum())
+    return actions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure vectorized environment throughput with random actions")
+    parser.add_argument('--airport', default='KRST', help="ICAO code of the active airport")
+    parser.add_argument('--envs', type=int, default=16, help="Environments stepped in lockstep")
+    parser.add_argument('--steps', type=int, default=1000, help="Vector steps to run")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the environments and actions")
+    parser.add_argument('--spawn-interval', type=float, default=None, help="Seconds between aircraft spawns")
+    parser.add_argument('--profile', metavar='TRACE', default=None,
+                        help="Time each phase and write a Chrome trace JSON file")
+    args = parser.parse_args(argv)
+
+    profiler = FrameProfiler()
+    profiler.enabled = args.profile is not None
+    envs = VectorATCEnv(
+        args.envs, args.airport, seed=args.seed, profiler=profiler, spawn_interval=args.spawn_interval
+    )
+    rng = np.random.default_rng(args.seed)
+    envs.reset()
+    total_reward = 0.0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        _, rewards, _, _, _ = envs.step(random_actions(envs.action_shape, rng))
+        total_reward += rewards.sum()
+    elapsed = time.perf_counter() - start
+    env_steps = args.envs * args.steps
+    print(f"{env_steps} env-steps in {elapsed:.2f}s: {env_steps / elapsed:.0f} env-steps/s")
+    print(f"Mean reward per env-step: {total_reward / env_steps:.3f}")
+
+    if profiler.enabled:
+        for name, (p50, p95, p99) in sorted(profiler.percentiles().items()):
+            print(f"  {name}: p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms")
+        count = profiler.export_chrome_trace(args.profile)
+        print(f"Wrote {count} trace events to {args.profile}")
+
+
+if __name__ == "__main__":
+    main()
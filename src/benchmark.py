@@ -0,0 +1,222 @@
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+from config import RADAR_RANGE, CRUISE_SPEED, CONFLICT_PROBE_INTERVAL, TICK_DT
+from game_state import GameState
+from conflict_detection import find_conflicts
+from airport_data import AirportDatabase
+
+UPDATE_FLEET_SIZES = [10, 100, 1000, 10000]
+CONFLICT_FLEET_SIZES = [100, 1000, 10000]
+RENDER_FLEET_SIZES = [100, 1000]
+VECTOR_ENV_LANES = 64
+VECTOR_ENV_SPAWN_INTERVALS = [None, 15]  # Seconds; None keeps the environment's default
+VECTOR_ENV_WARMUP = 1000  # Vector steps run before timing, to build up steady traffic
+DEFAULT_THRESHOLD = 0.25  # Allowed slowdown against the baseline before failing
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+BENCHMARK_SEED = 1234
+MIN_REPEATS = 5
+MIN_DURATION = 0.5  # Seconds of timed work per benchmark
+# The conflict probe's work is spread over the CONFLICT_PROBE_INTERVAL / TICK_DT
+# updates of each period, unevenly, so per-tick benchmarks time at least two periods
+TICK_MIN_REPEATS = int(round(2 * CONFLICT_PROBE_INTERVAL / TICK_DT))
+COMPARED_STATS = ('ms', 'mean_ms', 'p99_ms')  # Checked against the baseline, when it has them
+
+
+def populate(game_state, count, seed=BENCHMARK_SEED):
+    # Deterministic fleet spread over the scope, with no scheduled spawns
+    rng = np.random.default_rng(seed)
+    game_state.spawn_interval = float('inf')
+    radius = RADAR_RANGE * np.sqrt(rng.uniform(0, 1, count))
+    bearing = rng.uniform(0, 2 * np.pi, count)
+    types = rng.choice(list(CRUISE_SPEED), count)
+    altitudes = rng.integers(50, 400, count) * 100
+    headings = rng.uniform(0, 360, count)
+    for i in range(count):
+        game_state.add_aircraft(
+            f"B{i:05d}", types[i],
+            (radius[i] * np.sin(bearing[i]), radius[i] * np.cos(bearing[i])),
+            altitudes[i], headings[i]
+        )
+    return game_state
+
+
+def measure(function, min_repeats=MIN_REPEATS, min_duration=MIN_DURATION):
+    # Median, mean and 99th percentile wall time of one call in ms, over enough calls
+    # to fill min_duration. The median hides work done on only some calls, such as
+    # the conflict probe, so the mean (which per_second follows) and p99 are kept too.
+    times = []
+    start = time.perf_counter()
+    while len(times) < min_repeats or time.perf_counter() - start < min_duration:
+        call_start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - call_start)
+    median = float(np.median(times))
+    mean = float(np.mean(times))
+    return {
+        'ms': median * 1000,
+        'mean_ms': mean * 1000,
+        'p99_ms': float(np.percentile(times, 99)) * 1000,
+        'per_second': 1.0 / mean if mean > 0 else float('inf'),
+        'samples': len(times)
+    }
+
+
+def bench_update(count):
+    game_state = populate(GameState('KORD', seed=BENCHMARK_SEED), count)
+    return measure(lambda: game_state.update(1.0), min_repeats=TICK_MIN_REPEATS)
+
+
+def bench_conflicts(count):
+    game_state = populate(GameState('KORD', seed=BENCHMARK_SEED), count)
+    return measure(lambda: find_conflicts(game_state.fleet))
+
+
+def bench_startup():
+    # Open the (cached) airport database and build one airport
+    return measure(lambda: AirportDatabase()['KORD'])
+
+
+def bench_vector_env(lanes, spawn_interval=None):
+    # One VectorATCEnv step with random actions; env_steps_per_second counts every lane
+    from atc_env import VectorATCEnv, random_actions
+    envs = VectorATCEnv(lanes, seed=BENCHMARK_SEED, spawn_interval=spawn_interval)
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    envs.reset()
+    for _ in range(VECTOR_ENV_WARMUP):
+        envs.step(random_actions(envs.action_shape, rng))
+    result = measure(lambda: envs.step(random_actions(envs.action_shape, rng)))
+    result['env_steps_per_second'] = result['per_second'] * lanes
+    return result
+
+
+def _init_display():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from config import WINDOW_WIDTH, WINDOW_HEIGHT
+    pygame.init()
+    return pygame, pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+
+def bench_render(count):
+    pygame, screen = _init_display()
+    from renderer import Renderer
+    renderer = Renderer(screen)
+    game_state = populate(GameState('KORD', seed=BENCHMARK_SEED), count)
+    game_state.update(1.0)
+
+    def frame():
+        game_state.update(1.0)
+        renderer.render(game_state)
+    return measure(frame, min_repeats=TICK_MIN_REPEATS)
+
+
+def bench_first_frame():
+    pygame, screen = _init_display()
+    from renderer import Renderer
+
+    def first_frame():
+        game_state = GameState('KORD', seed=BENCHMARK_SEED)
+        Renderer(screen).render(game_state)
+    return measure(first_frame)
+
+
+def available_benchmarks(include_render=True):
+    benchmarks = {f'update_{count}': (bench_update, count) for count in UPDATE_FLEET_SIZES}
+    benchmarks.update(
+        {f'conflicts_{count}': (bench_conflicts, count) for count in CONFLICT_FLEET_SIZES}
+    )
+    for spawn_interval in VECTOR_ENV_SPAWN_INTERVALS:
+        suffix = f'_spawn_{spawn_interval}' if spawn_interval else ''
+        benchmarks[f'vector_env_{VECTOR_ENV_LANES}{suffix}'] = (bench_vector_env, VECTOR_ENV_LANES, spawn_interval)
+    benchmarks['startup_airport_database'] = (bench_startup,)
+    if include_render:
+        benchmarks.update(
+            {f'render_{count}': (bench_render, count) for count in RENDER_FLEET_SIZES}
+        )
+        benchmarks['startup_first_frame'] = (bench_first_frame,)
+    return benchmarks
+
+
+def run_benchmarks(selected=None, include_render=True, log=None):
+    results = {}
+    for name, (function, *args) in available_benchmarks(include_render).items():
+        if selected and not any(fnmatch.fnmatch(name, pattern) for pattern in selected):
+            continue
+        results[name] = function(*args)
+        if log:
+            result = results[name]
+            log(
+                f"{name}: {result['ms']:.3f} ms median, {result['mean_ms']:.3f} ms mean, "
+                f"{result['p99_ms']:.3f} ms p99 ({result['per_second']:.1f}/s)" + (
+                    f", {result['env_steps_per_second']:.0f} env-steps/s"
+                    if 'env_steps_per_second' in result else ''
+                )
+            )
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results
+    }
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # (name, stat, baseline ms, current ms) for each statistic slower than the
+    # threshold allows; stats missing from an older baseline are skipped
+    regressions = []
+    for name, result in results['results'].items():
+        reference = baseline['results'].get(name)
+        if not reference:
+            continue
+        for stat in COMPARED_STATS:
+            if stat in reference and result[stat] > reference[stat] * (1 + threshold):
+                regressions.append((name, stat, reference[stat], result[stat]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark simulation and rendering scaling")
+    parser.add_argument('--output', default=None, help="Write results JSON to this path")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed fractional slowdown before a benchmark fails")
+    parser.add_argument('--no-render', action='store_true', help="Skip benchmarks that need pygame")
+    parser.add_argument('--only', nargs='+', default=None, help="Run only benchmarks matching these glob patterns")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        args.only,
+        include_render=not args.no_render,
+        log=lambda line: print(line, file=sys.stderr)
+    )
+
+    if args.output:
+        with open(args.output, 'w') as stream:
+            json.dump(results, stream, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as stream:
+            json.dump(results, stream, indent=2)
+        print(f"Saved baseline to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return 0
+
+    with open(args.baseline) as stream:
+        baseline = json.load(stream)
+    regressions = compare(results, baseline, args.threshold)
+    for name, stat, reference, current in regressions:
+        print(f"REGRESSION {name} {stat}: {reference:.3f} ms -> {current:.3f} ms", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
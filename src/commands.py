@@ -0,0 +1,223 @@
+import queue
+import numpy as np
+from config import MIN_ALTITUDE, MAX_ALTITUDE, MIN_ASSIGNED_SPEED
+
+COMMAND_KINDS = ('heading', 'altitude', 'speed', 'direct', 'hold', 'approach')
+
+# Reasons an entry in a batch was not applied
+UNKNOWN_AIRCRAFT = "unknown aircraft"
+BAD_VALUE = "bad value"
+UNKNOWN_WAYPOINT = "unknown waypoint"
+
+NUMERIC_KINDS = ('heading', 'altitude', 'speed')
+FLAG_KINDS = ('hold', 'approach')
+
+
+def _as_number(value):
+    # Float for a real number or numeric string, NaN for anything else
+    if isinstance(value, (bool, np.bool_)):
+        return np.nan
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return np.nan
+    return np.nan
+
+
+def coerce_values(kind, values):
+    # Values as a 1-D array of the kind's type (float, bool or waypoint name), and
+    # which entries were well formed. Malformed entries are rejected when the batch
+    # is applied instead of reaching the fleet arrays.
+    try:
+        array = np.atleast_1d(np.asarray(values))
+    except ValueError:
+        array = np.atleast_1d(np.asarray(values, dtype=object))  # Ragged nested values
+    if array.ndim != 1:
+        raise ValueError("values must be one-dimensional")
+    if kind in FLAG_KINDS:
+        if array.dtype.kind == 'b':
+            return array, np.ones(len(array), dtype=bool)
+        well_formed = np.array([isinstance(value, (bool, np.bool_)) for value in array.tolist()], dtype=bool)
+        flags = np.array([bool(value) if ok else False for value, ok in zip(array.tolist(), well_formed)], dtype=bool)
+        return flags, well_formed
+    if kind == 'direct':
+        if array.dtype.kind == 'U':
+            return array, np.ones(len(array), dtype=bool)
+        array = array.astype(object)
+        return array, np.array([isinstance(name, str) for name in array.tolist()], dtype=bool)
+    if array.dtype.kind in 'iuf':
+        numbers = array.astype(float)
+    else:
+        numbers = np.array([_as_number(value) for value in array.tolist()], dtype=float)
+    return numbers, np.isfinite(numbers)
+
+
+class CommandBatch:
+    # One kind of clearance for many aircraft. aircraft holds aircraft_ids (or
+    # callsigns) and values the matching headings, altitudes, speeds, waypoint names
+    # or on/off flags. After the tick that applies it, accepted marks the entries
+    # that took effect and reasons gives (entry index, reason) for the rest.
+    def __init__(self, kind, aircraft, values=None):
+        if kind not in COMMAND_KINDS:
+            raise ValueError(f"unknown command {kind!r}")
+        self.kind = kind
+        self.aircraft = np.atleast_1d(np.asarray(aircraft))
+        if self.aircraft.ndim != 1:
+            raise ValueError("aircraft must be one-dimensional")
+        if values is None:
+            values = np.ones(len(self.aircraft), dtype=bool)  # hold / approach on
+        self.values, self.well_formed = coerce_values(kind, values)
+        if len(self.values) == 1 and len(self.aircraft) > 1:
+            self.values = np.repeat(self.values, len(self.aircraft))
+            self.well_formed = np.repeat(self.well_formed, len(self.aircraft))
+        if len(self.values) != len(self.aircraft):
+            raise ValueError("aircraft and values must be the same length")
+        self.applied = False
+        self.accepted = np.zeros(len(self.aircraft), dtype=bool)
+        self.reasons = []
+
+    def __len__(self):
+        return len(self.aircraft)
+
+
+class CommandQueue:
+    # Batches and spawn requests submitted between ticks, applied in submission order
+    # by GameState.step before anything moves, so every clearance takes effect on a
+    # tick boundary
+    def __init__(self):
+        self.pending = []  # CommandBatch, or None for a spawn from the scope's button
+        self.commands_applied = 0
+        self.commands_rejected = 0
+
+    def __len__(self):
+        return len(self.pending)
+
+    def submit(self, kind, aircraft, values=None):
+        batch = CommandBatch(kind, aircraft, values)
+        self.pending.append(batch)
+        return batch
+
+    def request_spawn(self):
+        self.pending.append(None)
+
+    def clear(self):
+        self.pending = []
+
+    def apply(self, game_state):
+        items, self.pending = self.pending, []
+        # A spawn splits the batches around it, so a clearance submitted after the
+        # button press can reach the new aircraft and one submitted before cannot
+        run = []
+        for item in items:
+            if item is not None:
+                run.append(item)
+                continue
+            if run:
+                self._apply_batches(run, game_state)
+                run = []
+            game_state._spawn_aircraft()
+        if run:
+            self._apply_batches(run, game_state)
+        return [item for item in items if item is not None]
+
+    def _apply_batches(self, batches, game_state):
+        # One id -> row lookup for the whole tick
+        fleet = game_state.fleet
+        ids = fleet.active('aircraft_id')
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        for batch in batches:
+            rows = self._rows(batch.aircraft, game_state, sorted_ids, order)
+            known = rows >= 0
+            valid = known & self._valid_values(batch, game_state)
+            self._apply_kind(batch, game_state, rows[valid], batch.values[valid])
+
+            batch.applied = True
+            batch.accepted = valid
+            accepted = int(np.count_nonzero(valid))
+            self.commands_applied += accepted
+            if accepted == len(batch):
+                batch.reasons = []
+                continue
+            batch.reasons = [(index, UNKNOWN_AIRCRAFT) for index in np.flatnonzero(~known).tolist()]
+            batch.reasons += [(index, BAD_VALUE) for index in np.flatnonzero(known & ~batch.well_formed).tolist()]
+            batch.reasons += [
+                (index, UNKNOWN_WAYPOINT) for index in np.flatnonzero(known & batch.well_formed & ~valid).tolist()
+            ]
+            batch.reasons.sort()
+            self.commands_rejected += len(batch.reasons)
+
+    def _rows(self, aircraft, game_state, sorted_ids, order):
+        # Fleet row for each entry, -1 when the aircraft is not in the fleet
+        if aircraft.dtype.kind not in 'iu':
+            # Callsigns; anything that is neither a name nor an id is unknown
+            members = game_state.aircraft
+            return np.array(
+                [
+                    members[callsign]._index if isinstance(callsign, str) and callsign in members else -1
+                    for callsign in aircraft.tolist()
+                ],
+                dtype=np.intp
+            )
+        if not len(sorted_ids):
+            return np.full(len(aircraft), -1, dtype=np.intp)
+        aircraft = aircraft.astype(np.int64, copy=False)
+        index = np.minimum(np.searchsorted(sorted_ids, aircraft), len(sorted_ids) - 1)
+        return np.where(sorted_ids[index] == aircraft, order[index], -1)
+
+    def _valid_values(self, batch, game_state):
+        if batch.kind == 'direct':
+            waypoints = game_state.waypoints
+            return batch.well_formed & np.array(
+                [isinstance(name, str) and name in waypoints for name in batch.values.tolist()], dtype=bool
+            )
+        return batch.well_formed
+
+    def _apply_kind(self, batch, game_state, rows, values):
+        fleet = game_state.fleet
+        kind = batch.kind
+        if kind == 'heading':
+            # An assigned heading takes the aircraft off its route, as set_target_heading does
+            fleet.target_heading[rows] = values % 360
+            fleet.navigating[rows] = False
+        elif kind == 'altitude':
+            fleet.target_altitude[rows] = np.clip(values, MIN_ALTITUDE, MAX_ALTITUDE)
+        elif kind == 'speed':
+            fleet.target_speed[rows] = np.clip(values, MIN_ASSIGNED_SPEED, fleet.max_speed[rows])
+        elif kind == 'hold':
+            fleet.holding_pattern[rows] = values
+        elif kind == 'approach':
+            fleet.cleared_for_approach[rows] = values
+        elif kind == 'direct':
+            # Routes are per-aircraft lists, so only this kind walks the entries
+            waypoints = game_state.waypoints
+            members = fleet.members
+            for row, name in zip(rows.tolist(), values.tolist()):
+                members[row].direct_to(waypoints[name]['position'])
+
+
+class CommandChannel:
+    # Stands in for the CommandQueue of a GameState owned by another thread.
+    # submit() and request_spawn() may be called from any thread; drain(), on the
+    # owning thread between steps, moves everything into the real queue in order.
+    def __init__(self):
+        self.items = queue.SimpleQueue()  # As CommandQueue.pending
+
+    def submit(self, kind, aircraft, values=None):
+        batch = CommandBatch(kind, aircraft, values)
+        self.items.put(batch)
+        return batch
+
+    def request_spawn(self):
+        self.items.put(None)
+
+    def drain(self, commands):
+        while True:
+            try:
+                item = self.items.get_nowait()
+            except queue.Empty:
+                return
+            commands.pending.append(item)
@@ -1,8 +1,48 @@
+import os
+
 # Window Settings
 WINDOW_WIDTH = 1600
 WINDOW_HEIGHT = 900
 FPS = 60
 
+# Simulation Timing
+TICK_DT = 1.0 / 60.0  # Simulated seconds per GameState.update tick at 1x
+PHYSICS_DT = 0.1  # Simulated seconds per fixed physics substep
+MIN_SIMULATION_SPEED = 0.25
+MAX_SIMULATION_SPEED = 128.0
+SUBSTEP_TIME_BUDGET = 0.6  # Fraction of each frame that physics substeps may use
+MAX_FRAME_TIME = 0.25  # Seconds; longer frames (window drags, breakpoints) are clamped
+SIM_THREAD_RATE = 60  # Wall-clock ticks per second of the simulation thread, each publishing a snapshot
+
+# Replay
+REPLAY_KEYFRAME_INTERVAL = 60  # Simulated seconds between full GameState keyframes
+REPLAY_SPEEDS = [1, 2, 5, 10, 20, 50, 100]  # Playback multipliers, stepped with +/-
+REPLAY_SCRUB_STEP = 10  # Seconds jumped per arrow key press (x6 with shift)
+
+# Airport Database
+AIRPORT_DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'airports')  # One JSON file per airport
+AIRPORT_CACHE_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'airports.cache')
+
+# Traffic Schedules
+SCHEDULE_LOOKAHEAD = 300  # Seconds of scheduled flights held in the event queue
+
+# Training Environment
+ENV_MAX_AIRCRAFT = 32  # Observation slots per environment; aircraft beyond these are not observed
+ENV_STEP_DT = 1.0  # Simulated seconds per environment step
+ENV_EPISODE_LENGTH = 1800  # Simulated seconds before an episode is truncated
+
+# Network Server
+SERVER_HOST = '127.0.0.1'
+SERVER_PORT = 8765
+SERVER_BROADCAST_INTERVAL = 0.1  # Wall-clock seconds between state broadcasts
+SERVER_POSITION_TOLERANCE = 0.05  # nm a client's dead-reckoned position may drift before a resend
+SERVER_ALTITUDE_TOLERANCE = 50  # Feet of altitude change before a resend
+SERVER_COMMAND_RATE = 5.0  # Commands per second allowed per client
+SERVER_COMMAND_BURST = 10  # Commands a client may send at once after being idle
+SERVER_MAX_BUFFER = 1 << 20  # Bytes queued for a client before it is skipped and resynced
+SERVER_MAX_HEADER = 1 << 16  # Largest JSON header accepted in a frame, in bytes
+SERVER_MAX_BODY = 1 << 26  # Largest frame body accepted (a keyframe of 2M+ aircraft), in bytes
+
 # Colors
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -10,6 +50,7 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 GRAY = (128, 128, 128)
+YELLOW = (255, 255, 0)
 BUTTON_COLOR = (50, 50, 50)
 BUTTON_HOVER_COLOR = (70, 70, 70)
 BUTTON_ACTIVE_COLOR = (0, 100, 0)
@@ -21,6 +62,14 @@ RADAR_RANGE = 50  # Nautical miles
 MAX_ALTITUDE = 40000  # Feet
 MIN_ALTITUDE = 0  # Feet
 
+# Conflict Tracking
+CONFLICT_TRACKER_MARGIN = 10  # Nautical miles of look-out beyond separation per pair rebuild
+CONFLICT_TRACKER_WIND_HEADROOM = 5  # Knots over the current wind ceiling allowed for per rebuild
+
+# Conflict Probe
+CONFLICT_PROBE_HORIZON = 120  # Seconds of look-ahead (2-10 minutes is typical)
+CONFLICT_PROBE_INTERVAL = 1.0  # Simulated seconds between probe runs
+
 # Aircraft Performance
 CLIMB_RATE = {
     'small': 2000,    # feet per minute
@@ -39,17 +88,37 @@ CRUISE_SPEED = {
     'medium': 350,
     'heavy': 450
 }
+MIN_ASSIGNED_SPEED = 100  # knots; the slowest speed a controller may assign
 
 # Weather Effects
 WIND_EFFECT_MULTIPLIER = 0.2
 STORM_RADIUS = 10  # Nautical miles
+WEATHER_GRID_SIZE = 33  # Grid points per side, spanning the radar range plus margin
+WEATHER_UPDATE_INTERVAL = 10  # Simulated seconds between weather field rebuilds
+WIND_VARIATION = 0.3  # Spatial wind variation as a fraction of the mean wind speed
+MAX_STORMS = 4  # Convective cells alive at once
+STORM_SPAWN_CHANCE = 0.02  # Chance per weather update of a new cell, below MAX_STORMS
+STORM_LIFETIME = (1800, 5400)  # Seconds, drawn uniformly per cell
+STORM_GUST = 40  # Knots of outflow at the core of a full-strength cell
+STORM_LEVELS = (0.15, 0.4, 0.7)  # Convective intensity at which each scope colour starts
+STORM_COLORS = ((0, 60, 0), (100, 85, 0), (110, 25, 25))  # Dimmed so traffic stays readable
+STORM_PIXEL_STEP = 2  # Screen pixels per storm sample drawn on the scope
+
+# Profiling
+PROFILER_WINDOW = 600  # Frames kept for rolling percentiles
+PROFILER_MAX_TRACE_EVENTS = 200000  # Most recent phase events kept for trace export
 
 # Waypoint Settings
 WAYPOINT_RADIUS = 10
 WAYPOINT_COLOR = BLUE
+WAYPOINT_CAPTURE_RADIUS = 0.5  # Nautical miles; a waypoint this close counts as reached
+MAX_ANTICIPATED_TURN = 150  # Degrees; larger track changes are anticipated as this much
+WAYPOINT_CLICK_RADIUS = 3.0  # Nautical miles, for picking a Direct To fix on the scope
 
 # UI Settings
 FONT_SIZE = 14
+TEXT_CACHE_SIZE = 4096  # Rendered text surfaces kept in the LRU cache
+DIRTY_RECT_RENDERING = True  # Update only changed screen regions instead of flipping
 INFO_PANEL_WIDTH = 300
 RADAR_CENTER = (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
 BASE_SCALE_FACTOR = 2  # base pixels per nautical mile
@@ -0,0 +1,590 @@
+import numpy as np
+from scipy.spatial import cKDTree
+from config import (
+    MIN_SEPARATION_HORIZONTAL, MIN_SEPARATION_VERTICAL, CONFLICT_PROBE_HORIZON,
+    CONFLICT_TRACKER_MARGIN, CONFLICT_TRACKER_WIND_HEADROOM, CRUISE_SPEED
+)
+
+# Slack on the broad-phase radius so rounding in the altitude scaling never drops a pair
+BROAD_PHASE_SLACK = 1e-9
+
+# Length of each time slice in the conflict probe's swept-box broad phase
+PROBE_SLICE_DURATION = 30  # Seconds
+PROBE_PAIRS_PER_STEP = 4096  # Candidate pairs per step of the probe's narrow phase
+
+# Broad-phase x offset between the lanes of a LaneConflictTracker, far beyond any reach
+LANE_SPACING = 1e4  # Nautical miles
+
+
+def conflict_key(callsign1, callsign2):
+    return tuple(sorted([callsign1, callsign2]))
+
+
+def find_candidate_pairs(positions, altitudes, horizontal_separation, vertical_separation):
+    # Altitude is rescaled so one vertical minimum spans one horizontal minimum. A
+    # Chebyshev (p=inf) pair query then returns exactly the pairs whose bounding boxes
+    # overlap in x, y and altitude band, a superset of the true separation cylinders.
+    points = np.column_stack((
+        positions,
+        altitudes * (horizontal_separation / vertical_separation)
+    ))
+    return cKDTree(points).query_pairs(
+        horizontal_separation * (1 + BROAD_PHASE_SLACK),
+        p=np.inf,
+        output_type='ndarray'
+    )
+
+
+def find_conflict_indices(positions, altitudes,
+                          horizontal_separation=MIN_SEPARATION_HORIZONTAL,
+                          vertical_separation=MIN_SEPARATION_VERTICAL):
+    if len(positions) < 2:
+        return np.empty((0, 2), dtype=np.intp)
+
+    pairs = find_candidate_pairs(positions, altitudes, horizontal_separation, vertical_separation)
+    first, second = pairs[:, 0], pairs[:, 1]
+
+    # Narrow phase, same comparisons as Aircraft.is_in_conflict
+    delta = positions[first] - positions[second]
+    horizontal_distance = np.sqrt((delta * delta).sum(axis=1))
+    vertical_distance = np.abs(altitudes[first] - altitudes[second])
+    in_conflict = (
+        (horizontal_distance < horizontal_separation) &
+        (vertical_distance < vertical_separation)
+    )
+    return pairs[in_conflict]
+
+
+def find_conflicts(fleet,
+                   horizontal_separation=MIN_SEPARATION_HORIZONTAL,
+                   vertical_separation=MIN_SEPARATION_VERTICAL):
+    pairs = find_conflict_indices(
+        fleet.active('position'),
+        fleet.active('altitude'),
+        horizontal_separation,
+        vertical_separation
+    )
+    members = fleet.members
+    return {
+        conflict_key(members[i].callsign, members[j].callsign)
+        for i, j in pairs
+    }
+
+
+class ConflictTracker:
+    # Incremental conflict detection. A rebuild collects every pair within the
+    # separation box plus a margin; at the fleet's top closure speeds no pair outside
+    # it can close that margin before rebuild_time. Each tracked pair records the
+    # earliest time it could be in conflict and is skipped until then, so a step in
+    # steady traffic only tests pairs that are close, and arrivals are paired against
+    # the fleet on their own. Pairs are keyed by aircraft_id, which must be unique.
+    # Conflicts that began or ended in the last update are listed in started/ended.
+    def __init__(self, horizontal_separation=MIN_SEPARATION_HORIZONTAL,
+                 vertical_separation=MIN_SEPARATION_VERTICAL, margin=CONFLICT_TRACKER_MARGIN):
+        self.horizontal_separation = horizontal_separation
+        self.vertical_separation = vertical_separation
+        self.margin = margin
+        self.conflicts = set()
+        self.started = []
+        self.ended = []
+        self.pairs_checked = 0  # Narrow-phase tests in the last update
+        self.reset()
+
+    def reset(self, conflicts=()):
+        # Start over from a known conflict set, e.g. after restoring a snapshot
+        self.conflicts = set(conflicts)
+        self.conflict_keys = {}  # aircraft_id pair -> callsign key, for pairs in conflict
+        self.jump_version = None  # Fleet jump_version the tracked pairs were built from
+        self.rebuild_time = -np.inf
+        self.max_speed = 0.0  # Bounds the closure speeds below were derived from
+        self.max_rate = 0.0
+        self.max_wind = 0.0
+        self.horizontal_closure = 0.0  # nm per second, for any pair
+        self.vertical_closure = 0.0  # feet per second
+        self.reach_horizontal = 0.0
+        self.reach_vertical = 0.0
+        self.ids = np.empty(0, dtype=np.int64)  # Fleet aircraft_ids at the last update
+        self.row_of = np.full(64, -1, dtype=np.intp)  # aircraft_id -> fleet row, -1 if absent
+        self.pairs = np.empty((0, 2), dtype=np.int64)  # aircraft_id pairs
+        self.rows = np.empty((0, 2), dtype=np.intp)  # Fleet rows of the pairs
+        self.earliest = np.empty(0)
+        self.in_conflict = np.empty(0, dtype=bool)
+
+    def update(self, fleet, now, max_wind=0.0):
+        self.started = []
+        self.ended = []
+        ids = fleet.active('aircraft_id')
+        if len(ids) and ids.max() >= len(self.row_of):
+            row_of = np.full(max(int(ids.max()) + 1, 2 * len(self.row_of)), -1, dtype=np.intp)
+            row_of[:len(self.row_of)] = self.row_of
+            self.row_of = row_of
+        arrivals = np.flatnonzero(self.row_of[ids] < 0)
+        if (fleet.jump_version != self.jump_version or now >= self.rebuild_time or
+                max_wind > self.max_wind or not self._within_bounds(fleet, arrivals)):
+            self._rebuild(fleet, now, max_wind)
+            return self.conflicts
+
+        # When aircraft leave (or, in a lane view, rows shift), drop the pairs of the
+        # aircraft that left and remap the rest
+        if len(ids) != len(self.ids) + len(arrivals) or not np.array_equal(ids[:len(self.ids)], self.ids):
+            self._index_rows(ids)
+            rows = self.row_of[self.pairs]
+            left = (rows < 0).any(axis=1)
+            for first, second in self.pairs[left & self.in_conflict].tolist():
+                self._set_conflict((first, second), None, False)
+            keep = ~left
+            self.pairs, self.rows = self.pairs[keep], rows[keep]
+            self.earliest, self.in_conflict = self.earliest[keep], self.in_conflict[keep]
+        elif len(arrivals):
+            self._index_rows(ids)
+        if len(arrivals):
+            rows = self._arrival_pairs(fleet, arrivals)
+            self.pairs = np.concatenate((self.pairs, ids[rows]))
+            self.rows = np.concatenate((self.rows, rows))
+            self.earliest = np.concatenate((self.earliest, np.full(len(rows), now)))
+            self.in_conflict = np.concatenate((self.in_conflict, np.zeros(len(rows), dtype=bool)))
+
+        self._check(fleet, np.flatnonzero(self.earliest <= now), now)
+        return self.conflicts
+
+    def _index_rows(self, ids):
+        self.row_of[self.ids] = -1
+        self.row_of[ids] = np.arange(len(ids))
+        self.ids = ids.copy()
+
+    def _within_bounds(self, fleet, rows):
+        if not len(rows):
+            return True
+        return (
+            max(fleet.speed[rows].max(), fleet.target_speed[rows].max()) <= self.max_speed and
+            max(fleet.climb_rate[rows].max(), fleet.descent_rate[rows].max()) <= self.max_rate
+        )
+
+    def _rebuild(self, fleet, now, max_wind):
+        self.jump_version = fleet.jump_version
+        self._index_rows(fleet.active('aircraft_id'))
+        # Headroom over the wind ceiling, so it creeping up between weather updates
+        # does not force a rebuild every time
+        self.max_wind = max_wind + CONFLICT_TRACKER_WIND_HEADROOM
+        self.max_speed = max(CRUISE_SPEED.values())
+        self.max_rate = 0.0
+        if fleet.count:
+            self.max_speed = max(self.max_speed, fleet.active('speed').max(),
+                                 fleet.active('target_speed').max())
+            self.max_rate = max(fleet.active('climb_rate').max(), fleet.active('descent_rate').max())
+        self.horizontal_closure = 2 * (self.max_speed + self.max_wind) / 3600
+        self.vertical_closure = 2 * self.max_rate / 60
+
+        safe_time = self.margin / self.horizontal_closure
+        self.rebuild_time = now + safe_time
+        self.reach_horizontal = self.horizontal_separation + self.margin
+        self.reach_vertical = self.vertical_separation + self.vertical_closure * safe_time
+        if fleet.count < 2:
+            rows = np.empty((0, 2), dtype=np.intp)
+        else:
+            rows = find_candidate_pairs(
+                self._broad_positions(fleet), fleet.active('altitude'),
+                self.reach_horizontal, self.reach_vertical
+            )
+        self.pairs = fleet.active('aircraft_id')[rows]
+        self.rows = rows
+        self.earliest = np.full(len(rows), now)
+        self.in_conflict = np.zeros(len(rows), dtype=bool)
+
+        # Everything is re-tested; diff against the previous set for the events
+        previous = self.conflicts
+        self.conflicts = set()
+        self.conflict_keys = {}
+        self._check(fleet, np.arange(len(rows)), now)
+        self.started = sorted(self.conflicts - previous)
+        self.ended = sorted(previous - self.conflicts)
+
+    def _arrival_pairs(self, fleet, arrivals):
+        # Rows pairing each arrival with every aircraft inside the rebuild's reach,
+        # counting a pair of arrivals once: the box test of find_candidate_pairs
+        points = np.column_stack((
+            self._broad_positions(fleet),
+            fleet.active('altitude') * (self.reach_horizontal / self.reach_vertical)
+        ))
+        near = cKDTree(points).query_ball_point(
+            points[arrivals], self.reach_horizontal * (1 + BROAD_PHASE_SLACK),
+            p=np.inf, return_sorted=True
+        )
+        first = np.repeat(arrivals, [len(rows) for rows in near])
+        second = np.concatenate(near).astype(np.intp) if len(first) else np.empty(0, dtype=np.intp)
+        arriving = np.zeros(len(points), dtype=bool)
+        arriving[arrivals] = True
+        keep = (first != second) & (~arriving[second] | (first < second))
+        return np.column_stack((first[keep], second[keep]))
+
+    def _check(self, fleet, tracked, now):
+        # Narrow phase for the given tracked pairs
+        self.pairs_checked = len(tracked)
+        if not len(tracked):
+            return
+        first, second = self.rows[tracked, 0], self.rows[tracked, 1]
+        positions = fleet.active('position')
+        altitudes = fleet.active('altitude')
+        delta = positions[first] - positions[second]
+        horizontal_distance = np.sqrt((delta * delta).sum(axis=1))
+        vertical_distance = np.abs(altitudes[first] - altitudes[second])
+        in_conflict = (
+            (horizontal_distance < self.horizontal_separation) &
+            (vertical_distance < self.vertical_separation)
+        )
+
+        # Both gaps must close for a conflict, so the slower one sets the wait
+        horizontal_wait = np.maximum(horizontal_distance - self.horizontal_separation, 0) / self.horizontal_closure
+        vertical_gap = np.maximum(vertical_distance - self.vertical_separation, 0)
+        if self.vertical_closure > 0:
+            vertical_wait = vertical_gap / self.vertical_closure
+        else:
+            vertical_wait = np.where(vertical_gap > 0, np.inf, 0.0)
+        self.earliest[tracked] = now + np.maximum(horizontal_wait, vertical_wait)
+
+        for index in np.flatnonzero(in_conflict != self.in_conflict[tracked]).tolist():
+            key = self._conflict_key(fleet, first[index], second[index])
+            self._set_conflict(tuple(self.pairs[tracked[index]].tolist()), key, in_conflict[index])
+        self.in_conflict[tracked] = in_conflict
+
+    def _broad_positions(self, fleet):
+        return fleet.active('position')
+
+    def _conflict_key(self, fleet, first, second):
+        members = fleet.members
+        return conflict_key(members[first].callsign, members[second].callsign)
+
+    def _set_conflict(self, ids, key, in_conflict):
+        # Callsign keys are remembered by id pair so a conflict can still be ended
+        # after one of its aircraft has left the fleet
+        if in_conflict:
+            self.conflict_keys[ids] = key
+            self.conflicts.add(key)
+            self.started.append(key)
+        else:
+            key = self.conflict_keys.pop(ids, key)
+            self.conflicts.discard(key)
+            self.ended.append(key)
+
+
+class _LaneView:
+    # The live rows of every lane of a FleetBatch as one compact fleet, lane by lane,
+    # with just the columns ConflictTracker reads. Aircraft are identified by
+    # aircraft_id * lanes + lane, and broad_position spaces the lanes LANE_SPACING nm
+    # apart in x so no broad-phase pair can span two lanes.
+    def __init__(self, batch, counts):
+        self.batch = batch
+        rows = np.flatnonzero((np.arange(batch.capacity) < counts[:, None]).ravel())
+        self.count = len(rows)
+        self.lane, self.index = np.divmod(rows, batch.capacity)
+        flat = batch.flat
+        for name in ('position', 'altitude', 'speed', 'target_speed', 'climb_rate', 'descent_rate'):
+            setattr(self, name, getattr(flat, name)[rows])
+        self.aircraft_id = flat.aircraft_id[rows] * batch.lanes + self.lane
+        self.broad_position = self.position.copy()
+        self.broad_position[:, 0] += self.lane * LANE_SPACING
+        self.members = self
+
+    def active(self, name):
+        return getattr(self, name)
+
+    def __getitem__(self, row):
+        # members[row], the Aircraft view for a row
+        return self.batch.fleets[self.lane[row]].members[self.index[row]]
+
+
+class LaneConflictTracker(ConflictTracker):
+    # One ConflictTracker for every lane of a FleetBatch, so a step tests the close
+    # pairs of all lanes in a single pass. Conflict keys are (lane, callsign pair).
+    # Lanes may be at different simulated times, so the tracker keeps its own clock.
+    def __init__(self, batch, **options):
+        self.batch = batch
+        self.clock = 0.0
+        self.owners = [None] * batch.lanes  # The GameState each lane's pairs belong to
+        self.lane_conflicts = [set() for _ in range(batch.lanes)]
+        super().__init__(**options)
+
+    def update_lanes(self, states, dt, max_wind=0.0):
+        # Update every state's conflicts, conflicts_started and conflicts_ended
+        lanes = self.batch.lanes
+        for lane, game_state in enumerate(states):
+            if game_state is not self.owners[lane]:
+                # A new episode in this lane: forget the old one's conflicts quietly
+                self.owners[lane] = game_state
+                self.conflicts -= {(lane, key) for key in self.lane_conflicts[lane]}
+                self.conflict_keys = {
+                    ids: key for ids, key in self.conflict_keys.items() if key[0] != lane
+                }
+                self.lane_conflicts[lane] = set()
+                self.jump_version = None
+        view = _LaneView(self.batch, np.array([game_state.fleet.count for game_state in states]))
+        view.jump_version = sum(fleet.jump_version for fleet in self.batch.fleets)
+        self.clock += dt
+        self.update(view, self.clock, max_wind)
+
+        started = [[] for _ in range(lanes)]
+        ended = [[] for _ in range(lanes)]
+        for lane, key in self.started:
+            self.lane_conflicts[lane].add(key)
+            started[lane].append(key)
+        for lane, key in self.ended:
+            self.lane_conflicts[lane].discard(key)
+            ended[lane].append(key)
+        for lane, game_state in enumerate(states):
+            game_state.conflicts = self.lane_conflicts[lane]
+            game_state.conflicts_started = started[lane]
+            game_state.conflicts_ended = ended[lane]
+
+    def _broad_positions(self, fleet):
+        return fleet.broad_position
+
+    def _conflict_key(self, fleet, first, second):
+        return int(fleet.lane[first]), super()._conflict_key(fleet, first, second)
+
+
+def find_conflicts_brute_force(aircraft_list,
+                               horizontal_separation=MIN_SEPARATION_HORIZONTAL,
+                               vertical_separation=MIN_SEPARATION_VERTICAL):
+    # Reference O(n^2) check, kept for validating the broad phase
+    conflicts = set()
+    for i in range(len(aircraft_list)):
+        for j in range(i + 1, len(aircraft_list)):
+            if aircraft_list[i].is_in_conflict(
+                aircraft_list[j],
+                horizontal_separation,
+                vertical_separation
+            ):
+                conflicts.add(
+                    conflict_key(aircraft_list[i].callsign, aircraft_list[j].callsign)
+                )
+    return conflicts
+
+
+def _vertical_profiles(fleet, horizon):
+    # Climb or descent toward target_altitude at the type's rate, then level off
+    altitudes = fleet.active('altitude')
+    altitude_diff = fleet.active('target_altitude') - altitudes
+    rates = np.where(
+        altitude_diff > 0,
+        fleet.active('climb_rate'),
+        -fleet.active('descent_rate')
+    ) / 60  # feet per second
+    rates = np.where(np.abs(altitude_diff) > 10, rates, 0.0)
+    level_times = np.divide(
+        altitude_diff, rates,
+        out=np.zeros_like(altitude_diff),
+        where=rates != 0
+    )
+    return altitudes, rates, np.minimum(level_times, horizon)
+
+
+def _altitude_at(altitudes, rates, level_times, t):
+    return altitudes + rates * np.minimum(t, level_times)
+
+
+def _first_time_in_band(z_start, slope, start, end, band):
+    # Earliest t in [start, end] where |z_start + slope * (t - start)| < band, else inf
+    inside = np.abs(z_start) < band
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entry = np.where(
+            z_start >= band,
+            start + (z_start - band) / -slope,
+            start + (-band - z_start) / slope
+        )
+    entering = ~inside & (entry >= start) & (entry <= end) & np.isfinite(entry)
+    return np.where(inside, start, np.where(entering, entry, np.inf))
+
+
+def _probe_slice_pairs(positions, velocities, altitudes, rates, level_times, slice_start, slice_end,
+                       horizontal_separation, vertical_separation):
+    # Codes first * count + second of the pairs whose swept boxes overlap over one
+    # short time slice, so the boxes stay tight even over a long horizon
+    count = len(positions)
+    vertical_scale = horizontal_separation / vertical_separation
+    start_altitudes = _altitude_at(altitudes, rates, level_times, slice_start)
+    end_altitudes = _altitude_at(altitudes, rates, level_times, slice_end)
+    centers = np.column_stack((
+        positions + velocities * ((slice_start + slice_end) / 2),
+        (start_altitudes + end_altitudes) / 2 * vertical_scale
+    ))
+    extents = np.column_stack((
+        np.abs(velocities) * ((slice_end - slice_start) / 2),
+        np.abs(end_altitudes - start_altitudes) / 2 * vertical_scale
+    )) + horizontal_separation / 2
+    pairs = cKDTree(centers).query_pairs(
+        2 * extents.max() * (1 + BROAD_PHASE_SLACK),
+        p=np.inf,
+        output_type='ndarray'
+    )
+    first, second = pairs[:, 0], pairs[:, 1]
+    overlapping = (
+        np.abs(centers[first] - centers[second]) <= extents[first] + extents[second]
+    ).all(axis=1)
+    return first[overlapping] * count + second[overlapping]
+
+
+class ConflictProbe:
+    # predict_conflicts in steps, so a large fleet or long horizon need not be paid
+    # for in one tick. start() captures the fleet's motion, and the work is spread
+    # over the given interval of simulated time: each advance(dt) does its share of
+    # the steps left, which are the broad phase's time slices, merging their pairs,
+    # then the narrow phase in chunks of PROBE_PAIRS_PER_STEP candidate pairs. Times
+    # in a prediction count from the advance() that computed it, not from start().
+    # The call that finishes returns {pair: prediction}, and until then None.
+    def __init__(self, horizontal_separation=MIN_SEPARATION_HORIZONTAL,
+                 vertical_separation=MIN_SEPARATION_VERTICAL):
+        self.horizontal_separation = horizontal_separation
+        self.vertical_separation = vertical_separation
+        self.running = False
+
+    def start(self, fleet, horizon=CONFLICT_PROBE_HORIZON, interval=0.0):
+        self.running = True
+        self.horizon = horizon
+        self.interval = interval
+        self.elapsed = 0.0
+        self.share = 0.0  # Of the interval, as of the last advance()
+        self.steps_done = 0
+        self.members = list(fleet.members)
+        self.positions = fleet.active('position').copy()
+        heading_rad = np.radians(fleet.active('heading'))
+        velocities = np.column_stack((np.sin(heading_rad), np.cos(heading_rad)))
+        velocities *= (fleet.active('speed') / 3600)[:, None]  # nm per second
+        velocities += fleet.active('wind') / 3600  # Ground track, not air track
+        self.velocities = velocities
+        altitudes, self.rates, self.level_times = _vertical_profiles(fleet, horizon)
+        self.altitudes = altitudes.copy()
+        slice_count = max(1, int(np.ceil(horizon / PROBE_SLICE_DURATION))) if fleet.count >= 2 else 0
+        self.slice_edges = np.linspace(0.0, horizon, slice_count + 1)
+        self.next_slice = 0
+        self.pair_codes = []
+        self.candidates = None  # (first, second) rows, once every slice is swept
+        self.next_pair = 0
+        self.predictions = {}
+
+    def advance(self, dt):
+        self.elapsed += dt
+        share = min(self.elapsed / self.interval, 1.0) if self.interval > 0 else 1.0
+        return self._run(share)
+
+    def finish(self):
+        # Everything left, at once
+        return self._run(1.0)
+
+    def _step_count(self):
+        # Slices, the merge, then the narrow phase, counted as one step until the
+        # merge has found how many candidate pairs there are
+        pairs = 0 if self.candidates is None else len(self.candidates[0])
+        return len(self.slice_edges) + max(1, -(-pairs // PROBE_PAIRS_PER_STEP))
+
+    def _run(self, share):
+        # Of the steps left, the same fraction as of the interval that was left, so
+        # the count growing once the candidates are known spreads over the rest
+        if share >= 1.0:
+            target = np.inf
+        else:
+            due = (share - self.share) / (1.0 - self.share)
+            target = self.steps_done + due * (self._step_count() - self.steps_done)
+        self.share = share
+        while self.running and self.steps_done < target:
+            self._step()
+            self.steps_done += 1
+        return None if self.running else self.predictions
+
+    def _step(self):
+        if self.next_slice < len(self.slice_edges) - 1:
+            self.pair_codes.append(_probe_slice_pairs(
+                self.positions, self.velocities, self.altitudes, self.rates, self.level_times,
+                self.slice_edges[self.next_slice], self.slice_edges[self.next_slice + 1],
+                self.horizontal_separation, self.vertical_separation
+            ))
+            self.next_slice += 1
+            return
+        if self.candidates is None:
+            codes = np.unique(np.concatenate(self.pair_codes)) if self.pair_codes else np.empty(0, dtype=np.intp)
+            self.candidates = np.divmod(codes, len(self.positions))
+            if not len(codes):
+                self.running = False
+            return
+        end = self.next_pair + PROBE_PAIRS_PER_STEP
+        self._narrow(self.candidates[0][self.next_pair:end], self.candidates[1][self.next_pair:end])
+        self.next_pair = end
+        if self.next_pair >= len(self.candidates[0]):
+            self.running = False
+
+    def _narrow(self, first, second):
+        horizon = self.horizon
+        horizontal_separation = self.horizontal_separation
+        positions, velocities = self.positions, self.velocities
+        altitudes, rates, level_times = self.altitudes, self.rates, self.level_times
+
+        # Horizontal closest point of approach and the window spent inside the minimum
+        relative_position = positions[first] - positions[second]
+        relative_velocity = velocities[first] - velocities[second]
+        a = (relative_velocity * relative_velocity).sum(axis=1)
+        b = 2 * (relative_position * relative_velocity).sum(axis=1)
+        c = (relative_position * relative_position).sum(axis=1) - horizontal_separation ** 2
+        moving = a > 1e-12
+        safe_a = np.where(moving, a, 1.0)
+        time_to_cpa = np.where(moving, np.clip(-b / (2 * safe_a), 0, horizon), 0.0)
+        cpa_offset = relative_position + relative_velocity * time_to_cpa[:, None]
+        cpa_distance = np.sqrt((cpa_offset * cpa_offset).sum(axis=1))
+
+        discriminant = b * b - 4 * a * c
+        root = np.sqrt(np.maximum(discriminant, 0))
+        window_start = np.where(moving, (-b - root) / (2 * safe_a), 0.0)
+        window_end = np.where(moving, (-b + root) / (2 * safe_a), horizon)
+        window_start = np.maximum(window_start, 0.0)
+        window_end = np.minimum(window_end, horizon)
+        horizontal_hit = np.where(moving, discriminant > 0, c < 0) & (window_start <= window_end)
+
+        # Vertical: relative altitude is piecewise linear with breaks at each level-off
+        altitudes1, altitudes2 = altitudes[first], altitudes[second]
+        rates1, rates2 = rates[first], rates[second]
+        levels1, levels2 = level_times[first], level_times[second]
+        breaks = np.sort(np.column_stack((
+            window_start,
+            np.clip(levels1, window_start, window_end),
+            np.clip(levels2, window_start, window_end),
+            window_end
+        )), axis=1)
+        loss_time = np.full(len(first), np.inf)
+        for k in range(3):
+            start, end = breaks[:, k], breaks[:, k + 1]
+            z_start = (
+                _altitude_at(altitudes1, rates1, levels1, start) -
+                _altitude_at(altitudes2, rates2, levels2, start)
+            )
+            slope = np.where(start < levels1, rates1, 0.0) - np.where(start < levels2, rates2, 0.0)
+            loss_time = np.minimum(
+                loss_time,
+                _first_time_in_band(z_start, slope, start, end, self.vertical_separation)
+            )
+
+        hits = np.flatnonzero(horizontal_hit & np.isfinite(loss_time))
+        cpa_vertical = np.abs(
+            _altitude_at(altitudes1, rates1, levels1, time_to_cpa) -
+            _altitude_at(altitudes2, rates2, levels2, time_to_cpa)
+        )
+        members = self.members
+        age = self.elapsed
+        for i, j, loss, cpa_time, distance, vertical in zip(
+            first[hits].tolist(), second[hits].tolist(), loss_time[hits].tolist(),
+            time_to_cpa[hits].tolist(), cpa_distance[hits].tolist(), cpa_vertical[hits].tolist()
+        ):
+            self.predictions[conflict_key(members[i].callsign, members[j].callsign)] = {
+                'time_to_conflict': max(loss - age, 0.0),
+                'time_to_cpa': max(cpa_time - age, 0.0),
+                'cpa_distance': distance,
+                'cpa_vertical': vertical
+            }
+
+
+def predict_conflicts(fleet, horizon=CONFLICT_PROBE_HORIZON,
+                      horizontal_separation=MIN_SEPARATION_HORIZONTAL,
+                      vertical_separation=MIN_SEPARATION_VERTICAL):
+    # Straight-line projection along the current heading and speed, with vertical
+    # motion toward target_altitude. Returns {pair: prediction} for pairs that lose
+    # separation within the horizon.
+    probe = ConflictProbe(horizontal_separation, vertical_separation)
+    probe.start(fleet, horizon)
+    return probe.finish()
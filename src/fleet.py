@@ -0,0 +1,233 @@
+import numpy as np
+
+# Per-aircraft state columns kept as contiguous arrays: name -> (dtype, row shape)
+FLEET_COLUMNS = {
+    'position': (float, (2,)),  # [x, y] in nautical miles
+    'previous_position': (float, (2,)),  # position before the last step, for interpolation
+    'altitude': (float, ()),  # feet
+    'heading': (float, ()),  # degrees
+    'speed': (float, ()),  # knots
+    'target_altitude': (float, ()),
+    'target_heading': (float, ()),
+    'target_speed': (float, ()),
+    'max_turn_rate': (float, ()),  # degrees per second
+    'acceleration': (float, ()),  # knots per second
+    'max_speed': (float, ()),  # knots, the highest speed that may be assigned
+    'climb_rate': (float, ()),  # feet per minute
+    'descent_rate': (float, ()),  # feet per minute
+    'cleared_for_approach': (bool, ()),
+    'holding_pattern': (bool, ()),
+    'aircraft_id': (np.int64, ()),  # unique per GameState, assigned on registration
+    'navigating': (bool, ()),  # steering to the route in Aircraft.waypoints
+    'waypoint': (float, (2,)),  # active waypoint, the first in the route
+    'next_waypoint': (float, (2,)),  # following waypoint, for turn anticipation
+    'has_next_waypoint': (bool, ()),
+    'tracking': (bool, ()),  # has flown toward the active waypoint since it became active
+    'wind': (float, (2,)),  # [east, north] knots of ground-track drift, sampled each step
+}
+
+
+# Structure-of-arrays aircraft store. Rows 0..count-1 are live; removal swaps the
+# last row into the freed slot so members[i] is always the Aircraft view for row i.
+# Rows past count are kept zeroed, so whole-capacity passes over a FleetBatch can
+# run on them harmlessly.
+class AircraftFleet:
+    def __init__(self, capacity=64):
+        self.capacity = max(int(capacity), 1)
+        self.count = 0
+        self.members = []  # Aircraft views, indexed by row
+        self.version = 0  # Bumped whenever rows move or positions change
+        self.jump_version = 0  # Bumped when state jumps instead of flying: assign() or a position set
+        self.batch = None  # FleetBatch owning the columns, if this fleet is one of its lanes
+        for name, (dtype, shape) in FLEET_COLUMNS.items():
+            setattr(self, name, np.zeros((self.capacity,) + shape, dtype=dtype))
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self, capacity):
+        if self.batch is not None:
+            self.batch.grow(capacity)
+            return
+        for name in FLEET_COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    def _bind(self, columns, capacity):
+        # Point every column at externally owned storage
+        for name, column in columns.items():
+            setattr(self, name, column)
+        self.capacity = capacity
+
+    def _clear(self, rows):
+        for name in FLEET_COLUMNS:
+            getattr(self, name)[rows] = 0
+
+    def add(self, aircraft):
+        if aircraft._fleet is self:
+            return aircraft._index
+
+        if self.count == self.capacity:
+            self._grow(self.capacity * 2)
+
+        index = self.count
+        source, source_index = aircraft._fleet, aircraft._index
+        if source is not None:
+            for name in FLEET_COLUMNS:
+                getattr(self, name)[index] = getattr(source, name)[source_index]
+            source._release(source_index)
+
+        aircraft._fleet = self
+        aircraft._index = index
+        self.members.append(aircraft)
+        self.count += 1
+        self.version += 1
+        return index
+
+    def remove(self, aircraft):
+        if aircraft._fleet is not self:
+            return False
+
+        # Detach into a private single-row fleet so the view stays usable
+        detached = AircraftFleet(capacity=1)
+        detached.add(aircraft)
+        return True
+
+    def _release(self, index):
+        last = self.count - 1
+        if index != last:
+            for name in FLEET_COLUMNS:
+                column = getattr(self, name)
+                column[index] = column[last]
+            moved = self.members[last]
+            moved._index = index
+            self.members[index] = moved
+        self.members.pop()
+        self._clear(last)
+        self.count -= 1
+        self.version += 1
+
+    def assign(self, members, **columns):
+        # Replace the whole fleet with members, filling the given columns row-wise
+        count = len(members)
+        if count > self.capacity:
+            self._grow(max(count, self.capacity * 2))
+        if count < self.count:
+            self._clear(slice(count, self.count))
+        for name, values in columns.items():
+            getattr(self, name)[:count] = values
+        for index, aircraft in enumerate(members):
+            aircraft._fleet = self
+            aircraft._index = index
+        self.members = list(members)
+        self.count = count
+        self.version += 1
+        self.jump_version += 1
+
+    def active(self, name):
+        return getattr(self, name)[:self.count]
+
+    def update(self, dt, simulation_speed):
+        if self.count:
+            self.step(slice(0, self.count), dt * simulation_speed)
+
+    def step(self, rows, dt):
+        # dt is seconds, either one for every row or an array with one per row
+        # Update altitude
+        altitude = self.altitude[rows]
+        target_altitude = self.target_altitude[rows]
+        altitude_diff = target_altitude - altitude
+        climbing = altitude_diff > 10
+        descending = altitude_diff < -10
+        altitude = np.where(
+            climbing,
+            np.minimum(altitude + self.climb_rate[rows] * dt / 60, target_altitude),
+            altitude
+        )
+        altitude = np.where(
+            descending,
+            np.maximum(altitude - self.descent_rate[rows] * dt / 60, target_altitude),
+            altitude
+        )
+        self.altitude[rows] = altitude
+
+        # Update speed
+        speed = self.speed[rows]
+        speed_diff = self.target_speed[rows] - speed
+        speed_change = np.sign(speed_diff) * np.minimum(
+            np.abs(speed_diff),
+            self.acceleration[rows] * dt
+        )
+        speed = np.where(np.abs(speed_diff) > 1, speed + speed_change, speed)
+        self.speed[rows] = speed
+
+        # Update heading
+        heading = self.heading[rows]
+        heading_diff = heading_difference(heading, self.target_heading[rows])
+        turn_amount = np.sign(heading_diff) * np.minimum(
+            np.abs(heading_diff),
+            self.max_turn_rate[rows] * dt
+        )
+        heading = np.where(
+            np.abs(heading_diff) > 0.5,
+            (heading + turn_amount) % 360,
+            heading
+        )
+        self.heading[rows] = heading
+
+        # Update position based on heading and speed, drifted by the wind
+        heading_rad = np.radians(heading)
+        distance = speed * dt / 3600  # Convert knots to nm/s
+        wind = self.wind[rows]
+        drift = dt / 3600
+        # Written back by assignment: rows may be an index array, which copies
+        position = self.position[rows]
+        self.previous_position[rows] = position
+        self.position[rows, 0] = position[:, 0] + (np.sin(heading_rad) * distance + wind[:, 0] * drift)
+        self.position[rows, 1] = position[:, 1] + (np.cos(heading_rad) * distance + wind[:, 1] * drift)
+        self.version += 1
+
+
+class FleetBatch:
+    # Columns for several independent fleets stacked lane by lane, shape (lanes,
+    # capacity, ...). Each lane is an ordinary AircraftFleet over its slice, and flat
+    # is one fleet over every row of every lane, so a kinematics or guidance pass can
+    # cover all lanes at once. Growing any lane grows them all.
+    def __init__(self, lanes, capacity=64):
+        self.lanes = lanes
+        self.capacity = 0
+        self.columns = {}
+        self.fleets = []
+        for _ in range(lanes):
+            fleet = AircraftFleet(capacity=1)
+            fleet.batch = self
+            self.fleets.append(fleet)
+        self.flat = AircraftFleet(capacity=1)
+        self._allocate(max(int(capacity), 1))
+
+    def _allocate(self, capacity):
+        old_capacity = self.capacity
+        for name, (dtype, shape) in FLEET_COLUMNS.items():
+            column = np.zeros((self.lanes, capacity) + shape, dtype=dtype)
+            if old_capacity:
+                column[:, :old_capacity] = self.columns[name]
+            self.columns[name] = column
+        self.capacity = capacity
+        for lane, fleet in enumerate(self.fleets):
+            fleet._bind({name: column[lane] for name, column in self.columns.items()}, capacity)
+        self.flat._bind({
+            name: column.reshape((self.lanes * capacity,) + column.shape[2:])
+            for name, column in self.columns.items()
+        }, self.lanes * capacity)
+        self.flat.count = self.lanes * capacity
+
+    def grow(self, capacity):
+        self._allocate(max(capacity, self.capacity * 2))
+
+
+def heading_difference(current, target):
+    diff = target - current
+    return np.where(diff > 180, diff - 360, np.where(diff < -180, diff + 360, diff))
@@ -1,32 +1,88 @@
+import copy
 import random
 import numpy as np
 from aircraft import Aircraft
-from config import MIN_SEPARATION_HORIZONTAL, MIN_SEPARATION_VERTICAL, RADAR_RANGE
-from airport_data import create_airports
+from fleet import AircraftFleet, FLEET_COLUMNS
+from config import (
+    RADAR_RANGE, CONFLICT_PROBE_HORIZON, CONFLICT_PROBE_INTERVAL, TICK_DT,
+    WEATHER_UPDATE_INTERVAL
+)
+from conflict_detection import ConflictProbe, ConflictTracker, LaneConflictTracker
+from airport_data import get_airport_database
+from profiler import FrameProfiler
+from spatial_index import SpatialIndex
+from scheduler import EventScheduler
+from navigation import RouteTable, update_guidance
+from weather import WeatherField, initialize_weather, evolve_storms
+from commands import CommandQueue
+from traffic_schedule import ScheduleFeeder
+
+# Entry points around the radar circle: (name, position, inbound heading)
+SPAWN_POINTS = [
+    ('N', (0, RADAR_RANGE), 180),  # From North, heading South
+    ('S', (0, -RADAR_RANGE), 0),   # From South, heading North
+    ('E', (RADAR_RANGE, 0), 270),  # From East, heading West
+    ('W', (-RADAR_RANGE, 0), 90)   # From West, heading East
+]
 
 class GameState:
-    def __init__(self, airport_icao):
-        self.airports = create_airports()
+    def __init__(self, airport_icao, seed=None, profiler=None, fleet=None):
+        self.rng = random.Random(seed)  # Per-game RNG so seeded runs are reproducible
+        self.profiler = profiler or FrameProfiler()  # Disabled unless enabled by the caller
+        self.airports = get_airport_database()  # Airports are built on first lookup
         self.active_airport = self.airports[airport_icao]
         self.aircraft = {}  # Dictionary of active aircraft
+        self.fleet = fleet if fleet is not None else AircraftFleet()  # Contiguous state arrays behind self.aircraft
+        self.spatial_index = SpatialIndex(self.fleet)  # Nearest and radius queries on positions
         self.waypoints = {}  # Dictionary of waypoints
         self.selected_aircraft = None
+        self.commands = CommandQueue()  # Clearance batches applied at the next tick boundary
         self.conflicts = set()  # Set of aircraft pairs in conflict
+        self.conflict_tracker = ConflictTracker()  # Keeps self.conflicts up to date incrementally
+        self.conflicts_started = []  # Pairs that lost separation in the last step
+        self.conflicts_ended = []  # Pairs that regained it
+        self.predicted_conflicts = {}  # Pair -> closest-approach prediction within the horizon
+        self.conflict_probe_horizon = CONFLICT_PROBE_HORIZON
+        self.conflict_probe_interval = CONFLICT_PROBE_INTERVAL  # inf turns the probe off
+        self.conflict_probe_timer = CONFLICT_PROBE_INTERVAL  # Probe on the first update
+        self.conflict_probe = ConflictProbe()  # The probe in progress, spread over an interval
         self.score = 0
         self.time = 0  # Game time in seconds
+        self.conflict_seconds = 0  # Accumulated pair-seconds spent in conflict
+        self.aircraft_handled = 0  # Aircraft that have entered the airspace
+        self.flights_skipped = 0  # Scheduled flights that could not be entered
+        self.next_aircraft_id = 1
+        self.recorder = None  # Optional TrackRecorder fed after every step
+        self.schedule = None  # ScheduleFeeder while flying a traffic schedule
         self.weather = self._initialize_weather()
-        self.spawn_timer = 0
-        self.spawn_interval = 30  # Seconds between aircraft spawns
+        self.weather_field = WeatherField()  # Gridded wind sampled at every aircraft
+        self.weather_field.rebuild(self.weather)
+        self.weather_changed = False  # Storms have moved since the wind grid was built
+        self.scheduler = EventScheduler()  # Timed events, fired at their exact sim time
+        self.event_handlers = {  # kind -> handler(payload)
+            'spawn': self._handle_spawn_event,
+            'scheduled_flight': self._handle_scheduled_flight,
+            'weather': self._handle_weather_event
+        }
+        self.schedule_event(WEATHER_UPDATE_INTERVAL, 'weather')
+        self.spawn_event = None  # Id of the pending recurring spawn
+        self.last_spawn_time = 0
+        self._spawn_interval = 30  # Seconds between aircraft spawns
+        self._schedule_spawn()
         
         # Initialize some default waypoints
         self._initialize_waypoints()
+        self.routes = RouteTable(self.waypoints, SPAWN_POINTS)  # Arrival routes, built once
 
     def _initialize_weather(self):
-        return {
-            'wind_direction': random.uniform(0, 360),
-            'wind_speed': random.uniform(0, 30),
-            'storms': []  # List of storm centers and radii
-        }
+        return initialize_weather(self.rng)
+
+    def _handle_weather_event(self, payload):
+        # Move storm cells along, then come back next interval; the wind grid is
+        # rebuilt once the step's events have all fired
+        evolve_storms(self.weather, self.rng, WEATHER_UPDATE_INTERVAL)
+        self.weather_changed = True
+        self.schedule_event(self.time + WEATHER_UPDATE_INTERVAL, 'weather')
 
     def _initialize_waypoints(self):
         # Add waypoints based on the active airport's runway ends
@@ -36,68 +92,199 @@ class GameState:
             self.waypoints[start_name] = {'position': runway['start_pos'], 'type': 'runway'}
             self.waypoints[end_name] = {'position': runway['end_pos'], 'type': 'runway'}
 
-        # Add some standard approach waypoints
-        self.waypoints['APP_N'] = {'position': np.array([0, 20]), 'type': 'fix'}
-        self.waypoints['APP_S'] = {'position': np.array([0, -20]), 'type': 'fix'}
-        self.waypoints['APP_E'] = {'position': np.array([20, 0]), 'type': 'fix'}
-        self.waypoints['APP_W'] = {'position': np.array([-20, 0]), 'type': 'fix'}
+        # Add the airport's published fixes
+        for waypoint in self.active_airport.waypoints:
+            self.waypoints[waypoint['name']] = {
+                'position': waypoint['position'],
+                'type': waypoint['type']
+            }
 
     def update(self, simulation_speed):
-        dt = 1.0 / 60.0  # Fixed time step
-        self.time += dt * simulation_speed
-        
-        # Update spawn timer and create new aircraft if needed
-        self.spawn_timer += dt * simulation_speed
-        if self.spawn_timer >= self.spawn_interval:
-            self.spawn_timer = 0
-            self._spawn_aircraft()
-        
-        # Update aircraft positions
-        for aircraft in self.aircraft.values():
-            aircraft.update(dt, simulation_speed)
-        
-        # Check for conflicts
-        self.conflicts.clear()
-        aircraft_list = list(self.aircraft.values())
-        for i in range(len(aircraft_list)):
-            for j in range(i + 1, len(aircraft_list)):
-                if aircraft_list[i].is_in_conflict(
-                    aircraft_list[j],
-                    MIN_SEPARATION_HORIZONTAL,
-                    MIN_SEPARATION_VERTICAL
-                ):
-                    self.conflicts.add(
-                        tuple(sorted([aircraft_list[i].callsign, aircraft_list[j].callsign]))
-                    )
-        
+        # One 1/60 s frame tick scaled by the simulation speed
+        self.step(TICK_DT * simulation_speed)
+
+    @property
+    def spawn_interval(self):
+        return self._spawn_interval
+
+    @spawn_interval.setter
+    def spawn_interval(self, interval):
+        self._spawn_interval = interval
+        self._schedule_spawn()
+
+    def _schedule_spawn(self):
+        # Keep exactly one pending spawn, spawn_interval after the last one
+        self.scheduler.cancel(self.spawn_event)
+        self.spawn_event = None
+        if self._spawn_interval != float('inf'):
+            self.spawn_event = self.schedule_event(
+                self.last_spawn_time + self._spawn_interval, 'spawn'
+            )
+
+    def _handle_spawn_event(self, payload):
+        self.spawn_event = None
+        self.last_spawn_time = self.time
+        self._spawn_aircraft()
+        self._schedule_spawn()
+
+    def schedule_event(self, time, kind, payload=None):
+        # Fire event_handlers[kind](payload) once the simulation reaches time
+        return self.scheduler.schedule(time, kind, payload)
+
+    def cancel_event(self, event_id):
+        self.scheduler.cancel(event_id)
+
+    def issue_commands(self, kind, aircraft, values=None):
+        # Queue one kind of clearance ('heading', 'altitude', 'speed', 'direct', 'hold'
+        # or 'approach') for many aircraft, by aircraft_id or callsign; returns the
+        # CommandBatch, which records what was accepted once the next step applies it
+        return self.commands.submit(kind, aircraft, values)
+
+    def request_spawn(self):
+        # Spawn a random arrival at the next tick boundary
+        self.commands.request_spawn()
+
+    def step(self, dt):
+        # Advance the simulation by dt simulated seconds
+        GameState.step_lockstep((self,), dt)
+
+    @staticmethod
+    def step_lockstep(states, dt, fleets=None):
+        # The phases of one step, each run for every state before the next begins.
+        # fleets carries out the phases that can be batched (guidance, wind,
+        # kinematics, weather, conflicts, score and the out-of-range check):
+        # SeparateFleets runs them on each state's own fleet, and LaneFleets as one
+        # pass over a FleetBatch holding every state's fleet as a lane.
+        fleets = fleets or SEPARATE_FLEETS
+        profiler = states[0].profiler
+        end_times = [game_state.time + dt for game_state in states]
+
+        # Clearances issued since the last step all take effect before anything moves
+        commanded = [game_state for game_state in states if game_state.commands]
+        if commanded:
+            with profiler.phase('commands'):
+                for game_state in commanded:
+                    game_state.commands.apply(game_state)
+
+        # Steer along routes and move on from waypoints that have been reached
+        with profiler.phase('navigation'):
+            fleets.steer(states, dt)
+
+        # Sample the wind at every aircraft for this step's ground tracks
+        with profiler.phase('weather'):
+            fleets.sample_wind(states)
+
+        # Fire due events, then fly every fleet to the end of the step
+        fleets.advance(states, end_times)
+
+        # Rebuild the wind grid wherever the storms moved, for the conflict closure
+        # speeds and the next step's wind
+        with profiler.phase('weather'):
+            fleets.rebuild_weather([game_state for game_state in states if game_state.weather_changed])
+
+        # Check for conflicts, then look ahead for pairs that will lose separation
+        with profiler.phase('conflicts'):
+            fleets.update_conflicts(states, dt)
+        for game_state in states:
+            game_state._update_probe(dt)
+
         # Update score based on conflicts and successful operations
-        self._update_score()
-        
+        with profiler.phase('score'):
+            fleets.update_score(states, dt)
+
         # Remove aircraft that have left the airspace
-        self._remove_out_of_range_aircraft()
+        with profiler.phase('remove_out_of_range'):
+            for game_state, leaving in zip(states, fleets.leaving(states)):
+                if leaving:
+                    game_state._remove_out_of_range_aircraft()
+
+        for game_state in states:
+            if game_state.recorder:
+                with profiler.phase('record'):
+                    game_state.recorder.record(game_state)
+
+    def _steer(self, dt):
+        for row in update_guidance(self.fleet, dt):
+            self.fleet.members[row].sequence_waypoint()
+
+    def _sample_wind(self):
+        self.fleet.active('wind')[:] = self.weather_field.sample_wind(self.fleet.active('position'))
+
+    def _advance(self, end_time):
+        self._fire_events(end_time)
+
+        # Update aircraft positions
+        with self.profiler.phase('kinematics'):
+            self.fleet.update(end_time - self.time, 1.0)
+        self.time = end_time
+
+    def _fire_events(self, end_time):
+        # Fire due events at their own times, flying the fleet up to each one first,
+        # so a long step neither skips events nor lumps them at the step's end
+        profiler = self.profiler
+        while self.scheduler.next_time() <= end_time:
+            event_time, kind, payload = self.scheduler.pop()
+            if event_time > self.time:
+                with profiler.phase('kinematics'):
+                    self.fleet.update(event_time - self.time, 1.0)
+                self.time = event_time
+            # A kind with no handler is a schedule refill whose file was not found
+            # again on restore; there is nothing left for it to do
+            handler = self.event_handlers.get(kind)
+            if handler is not None:
+                with profiler.phase('events'):
+                    handler(payload)
+
+    def _update_conflicts(self):
+        tracker = self.conflict_tracker
+        self.conflicts = tracker.update(self.fleet, self.time, self.weather_field.max_wind)
+        self.conflicts_started = tracker.started
+        self.conflicts_ended = tracker.ended
+
+    def _update_probe(self, dt):
+        self.conflict_seconds += len(self.conflicts) * dt
+
+        # Look ahead for pairs that will lose separation within the probe horizon.
+        # Each probe starts from the fleet as it is at the start of an interval, and
+        # its work is spread over the steps of that interval, so no one step pays for
+        # all of it; a step as long as the interval runs the whole probe at once.
+        probe = self.conflict_probe
+        self.conflict_probe_timer += dt
+        if not probe.running and self.conflict_probe_timer < self.conflict_probe_interval:
+            return
+        with self.profiler.phase('conflict_probe'):
+            if probe.running:
+                self._publish_predictions(probe.advance(dt))
+            if self.conflict_probe_timer >= self.conflict_probe_interval:
+                self.conflict_probe_timer = 0
+                if probe.running:
+                    self._publish_predictions(probe.finish())
+                probe.start(self.fleet, self.conflict_probe_horizon, self.conflict_probe_interval)
+                if dt >= self.conflict_probe_interval:
+                    self._publish_predictions(probe.finish())
+
+    def _publish_predictions(self, predictions):
+        if predictions is None:
+            return
+        self.predicted_conflicts = {
+            pair: prediction for pair, prediction in predictions.items()
+            if pair not in self.conflicts
+        }
 
     def _spawn_aircraft(self):
-        # Define spawn points around the radar circle
-        spawn_points = [
-            ('N', (0, RADAR_RANGE), 180),  # From North, heading South
-            ('S', (0, -RADAR_RANGE), 0),   # From South, heading North
-            ('E', (RADAR_RANGE, 0), 270),  # From East, heading West
-            ('W', (-RADAR_RANGE, 0), 90)   # From West, heading East
-        ]
-        
         # Randomly select a spawn point
-        direction, position, heading = random.choice(spawn_points)
+        direction, position, heading = self.rng.choice(SPAWN_POINTS)
         
         # Generate a unique callsign
         airline_codes = ['AAL', 'UAL', 'DAL', 'SWA', 'JBU']
-        flight_number = random.randint(100, 999)
-        callsign = f"{random.choice(airline_codes)}{flight_number}"
+        flight_number = self.rng.randint(100, 999)
+        callsign = f"{self.rng.choice(airline_codes)}{flight_number}"
         
         # Random aircraft type
-        aircraft_type = random.choice(['small', 'medium', 'heavy'])
+        aircraft_type = self.rng.choice(['small', 'medium', 'heavy'])
         
         # Random initial altitude between 15000 and 35000 feet
-        altitude = random.randint(150, 350) * 100
+        altitude = self.rng.randint(150, 350) * 100
 
         # Create a new aircraft
         new_aircraft = Aircraft(
@@ -108,42 +295,74 @@ class GameState:
             heading=heading
         )
 
-        # Assign a destination waypoint (one of the runway ends)
-        destination_waypoint = random.choice(list(self.waypoints.values()))
-        new_aircraft.add_waypoint(destination_waypoint['position'])
+        # Route to a destination waypoint via the approach fix on this side
+        destination, _ = self.rng.choice(list(self.waypoints.items()))
+        new_aircraft.set_route(self.routes.route(direction, destination))
 
         # Add the new aircraft
-        self.aircraft[callsign] = new_aircraft
+        self._register_aircraft(new_aircraft)
 
-    def _update_score(self):
+    def _handle_scheduled_flight(self, flight):
+        # Enter a flight from a traffic schedule at its entry fix or waypoint
+        entry = flight['entry']
+        for name, position, heading in SPAWN_POINTS:
+            if name == entry:
+                break
+        else:
+            if entry not in self.waypoints:
+                self.flights_skipped += 1
+                return
+            position = self.waypoints[entry]['position']
+            heading = np.degrees(np.arctan2(-position[0], -position[1])) % 360  # Toward the field
+
+        if not self.add_aircraft(
+            flight['callsign'], flight['aircraft_type'], position,
+            flight['altitude'], heading, flight.get('speed')
+        ):
+            self.flights_skipped += 1  # Callsign already in the air
+            return
+        destination = flight.get('destination')
+        if destination in self.waypoints:
+            route = self.routes.route(entry, destination) or [self.waypoints[destination]['position']]
+            self.aircraft[flight['callsign']].set_route(route)
+
+    def _register_aircraft(self, aircraft):
+        previous = self.aircraft.get(aircraft.callsign)
+        if previous is not None:
+            self.fleet.remove(previous)
+        self.fleet.add(aircraft)
+        aircraft.aircraft_id = self.next_aircraft_id
+        self.next_aircraft_id += 1
+        self.aircraft[aircraft.callsign] = aircraft
+        self.aircraft_handled += 1
+
+    def _update_score(self, dt):
         # Decrease score for each conflict
-        self.score -= len(self.conflicts) * 100 * (1.0 / 60.0)  # Points per second
+        self.score -= len(self.conflicts) * 100 * dt  # Points per second
         
         # Increase score for successfully managed aircraft
-        for aircraft in self.aircraft.values():
-            if aircraft.cleared_for_approach:
-                self.score += 1 * (1.0 / 60.0)  # Points per second for good management
+        cleared = np.count_nonzero(self.fleet.active('cleared_for_approach'))
+        self.score += cleared * dt  # Points per second for good management
 
     def _remove_out_of_range_aircraft(self):
-        to_remove = []
-        for callsign, aircraft in self.aircraft.items():
-            if np.linalg.norm(aircraft.position) > RADAR_RANGE * 1.2:
-                to_remove.append(callsign)
-        
+        distances = np.hypot(*self.fleet.active('position').T)
+        out_of_range = np.flatnonzero(distances > RADAR_RANGE * 1.2)
+        to_remove = [self.fleet.members[i].callsign for i in out_of_range]
+
         for callsign in to_remove:
-            del self.aircraft[callsign]
+            self.fleet.remove(self.aircraft.pop(callsign))
 
     def add_aircraft(self, callsign, aircraft_type, position, altitude, heading, speed=None):
         if callsign not in self.aircraft:
-            self.aircraft[callsign] = Aircraft(
+            self._register_aircraft(Aircraft(
                 callsign, aircraft_type, position, altitude, heading, speed
-            )
+            ))
             return True
         return False
 
     def remove_aircraft(self, callsign):
         if callsign in self.aircraft:
-            del self.aircraft[callsign]
+            self.fleet.remove(self.aircraft.pop(callsign))
             if self.selected_aircraft == callsign:
                 self.selected_aircraft = None
             return True
@@ -169,9 +388,221 @@ class GameState:
             return True
         return False
 
+    def snapshot(self):
+        # Complete simulation state as plain data, for keyframes and save points
+        return {
+            'airport': self.active_airport.icao,
+            'time': self.time,
+            'score': self.score,
+            'events': self.scheduler.snapshot(),
+            'spawn_event': self.spawn_event,
+            'last_spawn_time': self.last_spawn_time,
+            'spawn_interval': self._spawn_interval,
+            'conflict_probe_timer': self.conflict_probe_timer,
+            'conflict_probe_horizon': self.conflict_probe_horizon,
+            'conflict_seconds': self.conflict_seconds,
+            'aircraft_handled': self.aircraft_handled,
+            'flights_skipped': self.flights_skipped,
+            'next_aircraft_id': self.next_aircraft_id,
+            'selected_aircraft': self.selected_aircraft,
+            'rng_state': self.rng.getstate(),
+            'weather': copy.deepcopy(self.weather),
+            'waypoints': copy.deepcopy(self.waypoints),
+            'conflicts': set(self.conflicts),
+            'predicted_conflicts': dict(self.predicted_conflicts),
+            'schedule': self.schedule.snapshot() if self.schedule else None,
+            'aircraft': [
+                (aircraft.callsign, aircraft.aircraft_type, [np.array(point) for point in aircraft.waypoints])
+                for aircraft in self.fleet.members
+            ],
+            'fleet': {name: self.fleet.active(name).copy() for name in FLEET_COLUMNS}
+        }
+
+    @classmethod
+    def from_snapshot(cls, snapshot, profiler=None):
+        game_state = cls(snapshot['airport'], profiler=profiler)
+        game_state.restore(snapshot)
+        return game_state
+
+    def restore(self, snapshot):
+        # Inverse of snapshot(); the airport must match the one this state was built for
+        for name in (
+            'time', 'score', 'spawn_event', 'last_spawn_time', 'conflict_probe_timer',
+            'conflict_probe_horizon', 'conflict_seconds', 'aircraft_handled',
+            'flights_skipped', 'next_aircraft_id', 'selected_aircraft'
+        ):
+            setattr(self, name, snapshot[name])
+        self._spawn_interval = snapshot['spawn_interval']
+        self.scheduler.restore(snapshot['events'])
+        self.rng.setstate(snapshot['rng_state'])
+        self.weather = copy.deepcopy(snapshot['weather'])
+        self.weather_field.rebuild(self.weather)
+        self.weather_changed = False
+        self.waypoints = copy.deepcopy(snapshot['waypoints'])
+        self.conflicts = set(snapshot['conflicts'])
+        self.conflict_tracker.reset(self.conflicts)
+        self.conflicts_started = []
+        self.conflicts_ended = []
+        self.commands.clear()
+        self.predicted_conflicts = dict(snapshot['predicted_conflicts'])
+        self.conflict_probe = ConflictProbe()
+        self.schedule = None
+        self.event_handlers.pop('schedule_refill', None)
+        if snapshot.get('schedule'):
+            ScheduleFeeder.restore(self, snapshot['schedule'])
+
+        members = []
+        for callsign, aircraft_type, waypoints in snapshot['aircraft']:
+            aircraft = Aircraft(callsign, aircraft_type, (0, 0), 0, 0)
+            aircraft.waypoints = [np.array(point) for point in waypoints]
+            members.append(aircraft)
+        self.fleet.assign(members, **snapshot['fleet'])
+        self.aircraft = {aircraft.callsign: aircraft for aircraft in members}
+
     def get_aircraft_in_range(self, position, range_nm):
-        in_range = []
-        for aircraft in self.aircraft.values():
-            if np.linalg.norm(aircraft.position - np.array(position)) <= range_nm:
-                in_range.append(aircraft)
-        return in_range 
\ No newline at end of file
+        return self.spatial_index.within_radius(position, range_nm) 
+
+class SeparateFleets:
+    # Batchable phases of GameState.step_lockstep, run on each state's own fleet
+    def steer(self, states, dt):
+        for game_state in states:
+            game_state._steer(dt)
+
+    def sample_wind(self, states):
+        for game_state in states:
+            game_state._sample_wind()
+
+    def advance(self, states, end_times):
+        for game_state, end_time in zip(states, end_times):
+            game_state._advance(end_time)
+
+    def rebuild_weather(self, states):
+        for game_state in states:
+            game_state.weather_field.rebuild(game_state.weather)
+            game_state.weather_changed = False
+
+    def update_conflicts(self, states, dt):
+        for game_state in states:
+            game_state._update_conflicts()
+
+    def update_score(self, states, dt):
+        for game_state in states:
+            game_state._update_score(dt)
+
+    def leaving(self, states):
+        # Whether each state may have aircraft out of range; removal checks itself
+        return [True] * len(states)
+
+
+SEPARATE_FLEETS = SeparateFleets()
+
+
+class LaneFleets:
+    # Batchable phases of GameState.step_lockstep for states whose fleets are the
+    # lanes of one FleetBatch, in lane order. Each phase is one array pass over every
+    # lane; only event handlers and the conflict probe run per state. The lanes'
+    # own ConflictTrackers are not used.
+    def __init__(self, batch):
+        self.batch = batch
+        self.conflict_tracker = LaneConflictTracker(batch)
+        self.wind_grids = None  # Every state's WeatherField.wind, stacked
+        self.wind_sources = [None] * batch.lanes  # The wind array each lane was copied from
+
+    def steer(self, states, dt):
+        batch = self.batch
+        # Empty rows are not navigating, so their 0/0 turn radius is never used
+        with np.errstate(divide='ignore', invalid='ignore'):
+            reached = update_guidance(batch.flat, dt)
+        for row in reached.tolist():
+            lane, index = divmod(row, batch.capacity)
+            states[lane].fleet.members[index].sequence_waypoint()
+
+    def sample_wind(self, states):
+        batch = self.batch
+        counts = np.array([game_state.fleet.count for game_state in states])
+        live = np.arange(batch.capacity) < counts[:, None]
+        wind = states[0].weather_field.sample_wind_lanes(self._wind_grids(states), batch.columns['position'])
+        batch.columns['wind'][:] = np.where(live[..., None], wind, 0.0)
+
+    def _wind_grids(self, states):
+        # Restack only the lanes whose weather was rebuilt since the last step
+        grids = self.wind_grids
+        for lane, game_state in enumerate(states):
+            wind = game_state.weather_field.wind
+            if wind is not self.wind_sources[lane]:
+                if grids is None:
+                    grids = self.wind_grids = np.zeros((len(self.wind_sources),) + wind.shape)
+                grids[lane] = wind
+                self.wind_sources[lane] = wind
+        return grids
+
+    def advance(self, states, end_times):
+        # Events fire at their own times as in _fire_events, a round at a time: each
+        # round takes the next due event of every lane that has one and flies those
+        # lanes up to it in one pass, then every lane flies the rest of its step
+        batch = self.batch
+        profiler = states[0].profiler
+        while True:
+            due = [
+                lane for lane, (game_state, end_time) in enumerate(zip(states, end_times))
+                if game_state.scheduler.next_time() <= end_time
+            ]
+            if not due:
+                break
+            events = [(lane, states[lane].scheduler.pop()) for lane in due]
+            self._fly(states, [(lane, event[0]) for lane, event in events if event[0] > states[lane].time])
+            with profiler.phase('events'):
+                for lane, (event_time, kind, payload) in events:
+                    handler = states[lane].event_handlers.get(kind)
+                    if handler is not None:
+                        handler(payload)
+
+        steps = np.array([end_time - game_state.time for game_state, end_time in zip(states, end_times)])
+        with profiler.phase('kinematics'):
+            batch.flat.step(slice(None), np.repeat(steps, batch.capacity))
+        for game_state, end_time in zip(states, end_times):
+            if game_state.fleet.count:
+                game_state.fleet.version += 1
+            game_state.time = end_time
+
+    def _fly(self, states, targets):
+        # Fly just the given (lane, time) lanes up to their times, in one pass
+        batch = self.batch
+        rows = []
+        steps = []
+        for lane, time in targets:
+            game_state = states[lane]
+            count = game_state.fleet.count
+            if count:
+                rows.append(np.arange(lane * batch.capacity, lane * batch.capacity + count))
+                steps.append(np.full(count, time - game_state.time))
+                game_state.fleet.version += 1
+            game_state.time = time
+        if rows:
+            with states[0].profiler.phase('kinematics'):
+                batch.flat.step(np.concatenate(rows), np.concatenate(steps))
+
+    def rebuild_weather(self, states):
+        if states:
+            WeatherField.rebuild_lanes([game_state.weather_field for game_state in states],
+                                       [game_state.weather for game_state in states])
+            for game_state in states:
+                game_state.weather_changed = False
+
+    def update_conflicts(self, states, dt):
+        max_wind = max(game_state.weather_field.max_wind for game_state in states)
+        self.conflict_tracker.update_lanes(states, dt, max_wind)
+
+    def update_score(self, states, dt):
+        # Same arithmetic as _update_score, lane by lane in one array expression
+        conflicts = np.array([len(game_state.conflicts) for game_state in states])
+        cleared = np.count_nonzero(self.batch.columns['cleared_for_approach'], axis=1)
+        scores = np.array([game_state.score for game_state in states])
+        scores = scores - conflicts * 100 * dt
+        scores = scores + cleared * dt
+        for game_state, score in zip(states, scores.tolist()):
+            game_state.score = score
+
+    def leaving(self, states):
+        position = self.batch.columns['position']
+        return (np.hypot(position[..., 0], position[..., 1]) > RADAR_RANGE * 1.2).any(axis=1).tolist()
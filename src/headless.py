@@ -0,0 +1,101 @@
+import argparse
+import time
+from game_state import GameState
+from profiler import FrameProfiler
+from track_recorder import TrackRecorder
+from traffic_schedule import load_schedule
+
+DEFAULT_TICKS = 36000  # Ten simulated minutes at 1x
+
+
+def run_headless(airport_icao='KRST', ticks=DEFAULT_TICKS, seed=None, simulation_speed=1.0,
+                 spawn_interval=None, profiler=None, record_path=None, schedule_path=None):
+    # Step GameState as fast as the CPU allows, with no pygame anywhere in the loop
+    game_state = GameState(airport_icao, seed=seed, profiler=profiler)
+    if record_path:
+        game_state.recorder = TrackRecorder(record_path, airport_icao)
+    if spawn_interval is not None:
+        game_state.spawn_interval = spawn_interval
+    if schedule_path:
+        load_schedule(game_state, schedule_path)
+    peak_aircraft = 0
+    conflict_events = 0
+
+    start = time.perf_counter()
+    try:
+        for _ in range(ticks):
+            game_state.update(simulation_speed)
+            game_state.profiler.end_frame()
+            peak_aircraft = max(peak_aircraft, len(game_state.aircraft))
+            conflict_events += len(game_state.conflicts_started)
+        elapsed = time.perf_counter() - start
+    finally:
+        if game_state.recorder:
+            game_state.recorder.close()
+
+    return {
+        'airport': airport_icao,
+        'seed': seed,
+        'ticks': ticks,
+        'simulation_speed': simulation_speed,
+        'spawn_interval': game_state.spawn_interval,
+        'elapsed': elapsed,
+        'ticks_per_second': ticks / elapsed if elapsed > 0 else float('inf'),
+        'sim_time': game_state.time,
+        'score': game_state.score,
+        'conflict_seconds': game_state.conflict_seconds,
+        'conflict_events': conflict_events,
+        'aircraft_handled': game_state.aircraft_handled,
+        'peak_aircraft': peak_aircraft,
+        'final_aircraft': len(game_state.aircraft)
+    }
+
+
+def format_summary(results):
+    return "\n".join([
+        f"Airport: {results['airport']}  Seed: {results['seed']}",
+        f"Ticks: {results['ticks']} ({results['sim_time']:.0f}s simulated at "
+        f"{results['simulation_speed']}x)",
+        f"Ticks/s: {results['ticks_per_second']:.0f}",
+        f"Score: {int(results['score'])}",
+        f"Conflict-seconds: {results['conflict_seconds']:.1f} "
+        f"({results['conflict_events']} conflicts)",
+        f"Aircraft handled: {results['aircraft_handled']}",
+        f"Peak aircraft: {results['peak_aircraft']}"
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the ATC simulation without a display")
+    parser.add_argument('--airport', default='KRST', help="ICAO code of the active airport")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="Number of 1/60 s ticks")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for the run")
+    parser.add_argument('--speed', type=float, default=1.0, help="Simulation speed multiplier")
+    parser.add_argument('--spawn-interval', type=float, default=None,
+                        help="Seconds between random arrivals (default: the game's own)")
+    parser.add_argument('--profile', metavar='TRACE', default=None,
+                        help="Time each phase and write a Chrome trace JSON file")
+    parser.add_argument('--record', metavar='DIR', default=None,
+                        help="Record every tick's flight tracks to this directory")
+    parser.add_argument('--schedule', metavar='FILE', default=None,
+                        help="Fly the flights in a CSV or JSON-lines schedule instead of random traffic")
+    args = parser.parse_args(argv)
+
+    profiler = FrameProfiler()
+    profiler.enabled = args.profile is not None
+    results = run_headless(
+        args.airport, args.ticks, args.seed, args.speed, args.spawn_interval,
+        profiler=profiler, record_path=args.record, schedule_path=args.schedule
+    )
+    print(format_summary(results))
+
+    if profiler.enabled:
+        for name, (p50, p95, p99) in sorted(profiler.percentiles().items()):
+            print(f"  {name}: p50 {p50:.3f}ms  p95 {p95:.3f}ms  p99 {p99:.3f}ms")
+        count = profiler.export_chrome_trace(args.profile)
+        print(f"Wrote {count} trace events to {args.profile}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,12 @@ from config import (
     BASE_SCALE_FACTOR, RADAR_RANGE,
     SPAWN_BUTTON_WIDTH, SPAWN_BUTTON_HEIGHT, SPAWN_BUTTON_MARGIN,
     MIN_SCALE_FACTOR, MAX_SCALE_FACTOR, ZOOM_STEP,
-    AIRCRAFT_CLICK_RADIUS
+    AIRCRAFT_CLICK_RADIUS, WAYPOINT_CLICK_RADIUS
 )
 
 class InputHandler:
-    def __init__(self):
+    def __init__(self, renderer):
+        self.renderer = renderer
         self.dragging = False
         self.drag_start = None
         self.radar_center = np.array([WINDOW_WIDTH - INFO_PANEL_WIDTH, WINDOW_HEIGHT]) // 2
@@ -25,16 +26,16 @@ class InputHandler:
         if event.type == pygame.MOUSEBUTTONDOWN:
             if event.button == 1:  # Left click
                 if self.spawn_button_rect.collidepoint(event.pos):
-                    game_state._spawn_aircraft()
+                    game_state.request_spawn()
                 else:
                     # Check for command button clicks first
                     cmd_clicked = self._handle_command_click(event.pos, game_state)
                     if not cmd_clicked:
                         self._handle_left_click(event.pos, game_state)
             elif event.button == 4:  # Mouse wheel up
-                self._handle_zoom(game_state.renderer, 'in')
+                self._handle_zoom(self.renderer, 'in')
             elif event.button == 5:  # Mouse wheel down
-                self._handle_zoom(game_state.renderer, 'out')
+                self._handle_zoom(self.renderer, 'out')
                 
         elif event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:
@@ -56,7 +57,7 @@ class InputHandler:
         aircraft = game_state.aircraft[game_state.selected_aircraft]
         
         # Check each command button
-        for cmd_id, button in game_state.renderer.command_buttons.items():
+        for cmd_id, button in self.renderer.command_buttons.items():
             if button['rect'].collidepoint(pos):
                 self._execute_command(cmd_id, aircraft, game_state)
                 return True
@@ -64,26 +65,27 @@ class InputHandler:
         return False
 
     def _execute_command(self, cmd_id, aircraft, game_state):
+        # Clearances go through the command queue and take effect at the next tick
         if cmd_id == 'approach':
-            aircraft.cleared_for_approach = not aircraft.cleared_for_approach
+            game_state.issue_commands('approach', [aircraft.callsign], [not aircraft.cleared_for_approach])
         elif cmd_id == 'hold':
-            aircraft.holding_pattern = not aircraft.holding_pattern
+            game_state.issue_commands('hold', [aircraft.callsign], [not aircraft.holding_pattern])
         elif cmd_id == 'heading':
             # Activate heading input mode
             self.active_command = 'heading'
-            game_state.renderer.command_buttons['heading']['active'] = True
+            self.renderer.command_buttons['heading']['active'] = True
         elif cmd_id == 'altitude':
             # Activate altitude input mode
             self.active_command = 'altitude'
-            game_state.renderer.command_buttons['altitude']['active'] = True
+            self.renderer.command_buttons['altitude']['active'] = True
         elif cmd_id == 'speed':
             # Activate speed input mode
             self.active_command = 'speed'
-            game_state.renderer.command_buttons['speed']['active'] = True
+            self.renderer.command_buttons['speed']['active'] = True
         elif cmd_id == 'direct':
             # Activate direct-to mode
             self.active_command = 'direct'
-            game_state.renderer.command_buttons['direct']['active'] = True
+            self.renderer.command_buttons['direct']['active'] = True
         elif cmd_id == 'emergency':
             # Toggle emergency status
             pass  # TODO: Implement emergency handling
@@ -106,19 +108,19 @@ class InputHandler:
             if self.active_command == 'heading':
                 # Build heading (0-360)
                 new_heading = value * 10  # Each digit rotates by 10 degrees
-                aircraft.set_target_heading(new_heading % 360)
+                game_state.issue_commands('heading', [aircraft.callsign], [new_heading % 360])
             elif self.active_command == 'altitude':
                 # Build altitude (in hundreds of feet)
                 new_altitude = value * 1000  # Each digit is 1000 feet
-                aircraft.set_target_altitude(new_altitude)
+                game_state.issue_commands('altitude', [aircraft.callsign], [new_altitude])
             elif self.active_command == 'speed':
                 # Build speed
                 new_speed = value * 10  # Each digit is 10 knots
-                aircraft.set_target_speed(new_speed)
+                game_state.issue_commands('speed', [aircraft.callsign], [new_speed])
 
     def _clear_active_command(self, game_state):
         if self.active_command:
-            game_state.renderer.command_buttons[self.active_command]['active'] = False
+            self.renderer.command_buttons[self.active_command]['active'] = False
             self.active_command = None
 
     def _handle_zoom(self, renderer, direction):
@@ -135,19 +137,23 @@ class InputHandler:
 
     def _handle_left_click(self, pos, game_state):
         # Convert screen position to world coordinates
-        world_pos = self._screen_to_world(pos, game_state.renderer.scale_factor)
+        world_pos = self._screen_to_world(pos, self.renderer.scale_factor)
         
+        # In direct-to mode a click picks the fix for the selected aircraft
+        if self.active_command == 'direct' and game_state.selected_aircraft:
+            name = self._find_waypoint(world_pos, game_state)
+            if name:
+                game_state.issue_commands('direct', [game_state.selected_aircraft], [name])
+                self._clear_active_command(game_state)
+                return
+
         # Check if click is within radar range
         if np.linalg.norm(world_pos) <= RADAR_RANGE:
-            # Try to select an aircraft
-            selected = False
-            for callsign, aircraft in game_state.aircraft.items():
-                if np.linalg.norm(aircraft.position - world_pos) < AIRCRAFT_CLICK_RADIUS:
-                    game_state.select_aircraft(callsign)
-                    selected = True
-                    break
-            
-            if not selected:
+            # Select the nearest aircraft within the click radius
+            aircraft = game_state.spatial_index.nearest(world_pos, AIRCRAFT_CLICK_RADIUS)
+            if aircraft:
+                game_state.select_aircraft(aircraft.callsign)
+            else:
                 game_state.selected_aircraft = None
             
             # If an aircraft is selected and in heading mode, set new heading
@@ -155,18 +161,27 @@ class InputHandler:
                 aircraft = game_state.aircraft[game_state.selected_aircraft]
                 delta = world_pos - aircraft.position
                 new_heading = np.degrees(np.arctan2(delta[0], delta[1])) % 360
-                aircraft.set_target_heading(new_heading)
+                game_state.issue_commands('heading', [aircraft.callsign], [new_heading])
                 self._clear_active_command(game_state)
 
+    def _find_waypoint(self, world_pos, game_state):
+        # Name of the closest waypoint within the click radius, or None
+        closest, closest_distance = None, WAYPOINT_CLICK_RADIUS
+        for name, waypoint in game_state.waypoints.items():
+            distance = np.linalg.norm(waypoint['position'] - world_pos)
+            if distance <= closest_distance:
+                closest, closest_distance = name, distance
+        return closest
+
     def _handle_drag(self, pos, game_state):
         if game_state.selected_aircraft:
             aircraft = game_state.aircraft[game_state.selected_aircraft]
-            world_pos = self._screen_to_world(pos, game_state.renderer.scale_factor)
+            world_pos = self._screen_to_world(pos, self.renderer.scale_factor)
             
             # Calculate new altitude based on vertical drag
             altitude_change = (self.drag_start[1] - pos[1]) * 100  # 100 feet per pixel
             new_altitude = aircraft.altitude + altitude_change
-            aircraft.set_target_altitude(new_altitude)
+            game_state.issue_commands('altitude', [aircraft.callsign], [new_altitude])
             
             self.drag_start = pos
 
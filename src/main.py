@@ -1,29 +1,66 @@
+import argparse
 import pygame
 import sys
+import time
 from game_state import GameState
 from renderer import Renderer
 from input_handler import InputHandler
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, FPS
+from config import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS,
+    MIN_SIMULATION_SPEED, MAX_SIMULATION_SPEED
+)
 from menu import Menu
+from sim_thread import SimulationThread
+from profiler import FrameProfiler
+from track_recorder import TrackRecorder
+from replay import ReplayViewer
+from traffic_schedule import load_schedule
+
+def _toggle_profiler(profiler):
+    # Toggle frame profiling, starting from empty windows each time it comes on
+    if profiler.toggle():
+        profiler.reset()
+
+
+def _export_trace(profiler, path):
+    if profiler.trace_events:
+        count = profiler.export_chrome_trace(path)
+        print(f"Wrote {count} trace events to {path}")
+
 
 class ATCGame:
-    def __init__(self, airport_icao):
+    def __init__(self, airport_icao, record_path=None, schedule_path=None):
         pygame.init()
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Air Traffic Control Simulator")
         self.clock = pygame.time.Clock()
+        self.profiler = FrameProfiler()  # Render thread phases
         
         self.renderer = Renderer(self.screen)
-        self.game_state = GameState(airport_icao)
-        self.game_state.renderer = self.renderer  # Add renderer reference to game state
-        self.input_handler = InputHandler()
+        self.renderer.profiler = self.profiler
+        # The simulation thread owns game_state, with its own profiler; this thread
+        # draws and handles input on view_state, rebuilt from its snapshots
+        self.game_state = GameState(airport_icao, profiler=FrameProfiler())
+        if record_path:
+            self.game_state.recorder = TrackRecorder(record_path, airport_icao)
+        if schedule_path:
+            load_schedule(self.game_state, schedule_path)
+        self.simulation = SimulationThread(self.game_state)
+        self.view_state = None
+        self.alpha = 0.0
+        self.drawn_snapshot = None
+        self.input_handler = InputHandler(self.renderer)
         
         self.is_running = True
         self.is_paused = False
+        self.needs_redraw = True  # Set by any input; a paused scope is otherwise left as is
         self.simulation_speed = 1.0
 
     def handle_events(self):
         for event in pygame.event.get():
+            self.needs_redraw = True
+            if event.type == pygame.WINDOWEXPOSED:
+                self.renderer.invalidate()
             if event.type == pygame.QUIT:
                 self.is_running = False
             elif event.type == pygame.KEYDOWN:
@@ -31,37 +68,84 @@ class ATCGame:
                     self.is_running = False
                 elif event.key == pygame.K_SPACE:
                     self.is_paused = not self.is_paused
+                    self.simulation.paused = self.is_paused
                 elif event.key == pygame.K_PLUS or event.key == pygame.K_KP_PLUS:
-                    self.simulation_speed = min(4.0, self.simulation_speed * 1.5)
+                    self.simulation_speed = min(MAX_SIMULATION_SPEED, self.simulation_speed * 1.5)
+                    self.simulation.simulation_speed = self.simulation_speed
                 elif event.key == pygame.K_MINUS or event.key == pygame.K_KP_MINUS:
-                    self.simulation_speed = max(0.25, self.simulation_speed / 1.5)
+                    self.simulation_speed = max(MIN_SIMULATION_SPEED, self.simulation_speed / 1.5)
+                    self.simulation.simulation_speed = self.simulation_speed
+                elif event.key == pygame.K_F3:
+                    # Toggle frame profiling and its overlay, on both threads
+                    _toggle_profiler(self.profiler)
+                    self.simulation.call(lambda game_state: _toggle_profiler(game_state.profiler))
+                elif event.key == pygame.K_F4:
+                    # The simulation thread writes its own trace alongside
+                    stamp = time.strftime("%Y%m%d_%H%M%S")
+                    _export_trace(self.profiler, f"trace_{stamp}.json")
+                    self.simulation.call(
+                        lambda game_state: _export_trace(game_state.profiler, f"trace_{stamp}_sim.json")
+                    )
             
-            self.input_handler.handle_event(event, self.game_state)
-
-    def update(self):
-        if not self.is_paused:
-            self.game_state.update(self.simulation_speed)
+            self.input_handler.handle_event(event, self.view_state)
 
     def render(self):
-        self.renderer.render(self.game_state)
-        pygame.display.flip()
+        snapshot = self.simulation.snapshot
+        if self.is_paused and not self.needs_redraw and snapshot is self.drawn_snapshot:
+            return
+        self.needs_redraw = False
+        self.drawn_snapshot = snapshot
 
-    def run(self):
-        while self.is_running:
-            self.handle_events()
-            self.update()
-            self.render()
-            self.clock.tick(FPS)
+        self.renderer.simulation_speed = self.simulation_speed
+        self.renderer.effective_speed = (
+            self.simulation_speed if self.is_paused else snapshot.effective_speed
+        )
+        self.renderer.sim_profile = snapshot.profile
+        dirty_rects = self.renderer.render(self.view_state, self.alpha)
+        with self.profiler.phase('display'):
+            if self.renderer.dirty_rects_enabled:
+                pygame.display.update(dirty_rects)
+            else:
+                pygame.display.flip()
 
+    def run(self):
+        self.simulation.start()
+        try:
+            while self.is_running:
+                self.clock.tick(FPS)
+                with self.profiler.phase('snapshot'):
+                    self.view_state, self.alpha = self.simulation.view()
+                with self.profiler.phase('events'):
+                    self.handle_events()
+                with self.profiler.phase('render'):
+                    self.render()
+                self.profiler.end_frame()
+        finally:
+            self.simulation.stop()
+            if self.game_state.recorder:
+                self.game_state.recorder.close()
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Air Traffic Control Simulator")
+    parser.add_argument('--record', metavar='DIR', default=None,
+                        help="Record the session's flight tracks to this directory")
+    parser.add_argument('--schedule', metavar='FILE', default=None,
+                        help="Fly a CSV or JSON-lines traffic schedule instead of random traffic")
+    parser.add_argument('--replay', metavar='DIR', default=None,
+                        help="Play back a recording made with --record instead of a live game")
+    args = parser.parse_args()
+
+    if args.replay:
+        ReplayViewer(args.replay).run()
+        sys.exit()
+
     pygame.init()
     screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
     menu = Menu(screen)
     airport_icao = menu.run()
 
     if airport_icao:
-        game = ATCGame(airport_icao)
+        game = ATCGame(airport_icao, record_path=args.record, schedule_path=args.schedule)
         game.run()
\ No newline at end of file
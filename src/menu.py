@@ -1,13 +1,14 @@
 import pygame
 from config import WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, BLACK, GREEN, FONT_SIZE
+from airport_data import get_airport_database
 
 class Menu:
     def __init__(self, screen):
         self.screen = screen
         self.font = pygame.font.Font(None, FONT_SIZE + 10)
-        self.airports = [("Rochester International (KRST)", "KRST"),
-                         ("Minneapolis-St. Paul International (KMSP)", "KMSP"),
-                         ("Chicago O'Hare International (KORD)", "KORD")]
+        self.airports = [
+            (f"{name} ({icao})", icao) for icao, name in get_airport_database().names()
+        ]
         self.selected_airport = None
         self.buttons = self._create_buttons()
 
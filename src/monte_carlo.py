@@ -0,0 +1,144 @@
+import argparse
+import csv
+import itertools
+import multiprocessing
+import sys
+import time
+import numpy as np
+from airport_data import get_airport_database
+from headless import run_headless, DEFAULT_TICKS
+
+RESULT_COLUMNS = [
+    'run', 'airport', 'spawn_interval', 'seed', 'ticks', 'sim_time',
+    'score', 'conflict_seconds', 'conflict_events', 'aircraft_handled',
+    'peak_aircraft', 'elapsed'
+]
+
+
+def build_scenarios(airports, spawn_intervals, runs_per_scenario, master_seed, ticks,
+                    simulation_speed=1.0):
+    # Every run gets its own seed derived from the master seed, so the whole batch is
+    # reproducible regardless of worker count or completion order
+    combinations = list(itertools.product(airports, spawn_intervals, range(runs_per_scenario)))
+    seeds = np.random.SeedSequence(master_seed).generate_state(len(combinations))
+    return [
+        {
+            'run': run,
+            'airport': airport,
+            'spawn_interval': spawn_interval,
+            'seed': int(seed),
+            'ticks': ticks,
+            'simulation_speed': simulation_speed
+        }
+        for run, ((airport, spawn_interval, _), seed) in enumerate(zip(combinations, seeds))
+    ]
+
+
+def run_scenario(scenario):
+    results = run_headless(
+        scenario['airport'],
+        ticks=scenario['ticks'],
+        seed=scenario['seed'],
+        simulation_speed=scenario['simulation_speed'],
+        spawn_interval=scenario['spawn_interval']
+    )
+    results['run'] = scenario['run']
+    return {column: results[column] for column in RESULT_COLUMNS}
+
+
+def run_batch(scenarios, workers=None, on_result=None):
+    # Workers stream per-run aggregates back as they finish; the merged table is
+    # ordered by run id
+    table = []
+    with multiprocessing.Pool(processes=workers) as pool:
+        for row in pool.imap_unordered(run_scenario, scenarios):
+            table.append(row)
+            if on_result:
+                on_result(row)
+    table.sort(key=lambda row: row['run'])
+    return table
+
+
+def summarize(table):
+    groups = {}
+    for row in table:
+        groups.setdefault((row['airport'], row['spawn_interval']), []).append(row)
+
+    summary = []
+    for (airport, spawn_interval), rows in sorted(groups.items()):
+        summary.append({
+            'airport': airport,
+            'spawn_interval': spawn_interval,
+            'runs': len(rows),
+            'mean_score': float(np.mean([row['score'] for row in rows])),
+            'mean_conflict_seconds': float(np.mean([row['conflict_seconds'] for row in rows])),
+            'mean_conflict_events': float(np.mean([row['conflict_events'] for row in rows])),
+            'max_peak_aircraft': max(row['peak_aircraft'] for row in rows)
+        })
+    return summary
+
+
+def write_table(table, stream):
+    writer = csv.DictWriter(stream, fieldnames=RESULT_COLUMNS)
+    writer.writeheader()
+    writer.writerows(table)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run seeded headless simulations across a process pool")
+    parser.add_argument('--airports', nargs='+', default=['KRST'], help="ICAO codes to evaluate")
+    parser.add_argument('--spawn-intervals', nargs='+', type=float, default=[30.0],
+                        help="Seconds between aircraft spawns")
+    parser.add_argument('--runs', type=int, default=10, help="Seeded runs per scenario")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="Ticks per run")
+    parser.add_argument('--speed', type=float, default=1.0, help="Simulation speed multiplier")
+    parser.add_argument('--master-seed', type=int, default=0, help="Seed the per-run seeds derive from")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--output', default=None, help="CSV path for the per-run table")
+    args = parser.parse_args(argv)
+
+    known_airports = get_airport_database()
+    unknown = [icao for icao in args.airports if icao not in known_airports]
+    if unknown:
+        parser.error(f"unknown airport(s): {', '.join(unknown)}")
+
+    scenarios = build_scenarios(
+        args.airports, args.spawn_intervals, args.runs,
+        args.master_seed, args.ticks, args.speed
+    )
+
+    start = time.perf_counter()
+    done = itertools.count(1)
+    table = run_batch(
+        scenarios,
+        workers=args.workers,
+        on_result=lambda row: print(
+            f"[{next(done)}/{len(scenarios)}] run {row['run']} {row['airport']} "
+            f"interval={row['spawn_interval']} score={int(row['score'])}",
+            file=sys.stderr
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    if args.output:
+        with open(args.output, 'w', newline='') as stream:
+            write_table(table, stream)
+    else:
+        write_table(table, sys.stdout)
+
+    for entry in summarize(table):
+        print(
+            f"{entry['airport']} interval={entry['spawn_interval']}: "
+            f"runs={entry['runs']} score={entry['mean_score']:.0f} "
+            f"conflict-s={entry['mean_conflict_seconds']:.1f} "
+            f"conflicts={entry['mean_conflict_events']:.1f} "
+            f"peak={entry['max_peak_aircraft']}",
+            file=sys.stderr
+        )
+    simulated_hours = sum(row['sim_time'] for row in table) / 3600
+    print(f"{len(table)} runs, {simulated_hours:.1f} simulated hours in {elapsed:.1f}s", file=sys.stderr)
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import numpy as np
+from fleet import heading_difference
+from config import WAYPOINT_CAPTURE_RADIUS, MAX_ANTICIPATED_TURN
+
+
+def update_guidance(fleet, dt):
+    # One pass over every navigating aircraft: point target_heading at the active
+    # waypoint and return the rows that have reached it and should sequence
+    count = fleet.count
+    navigating = fleet.active('navigating')
+    if not count or not navigating.any():
+        return np.empty(0, dtype=np.intp)
+
+    position = fleet.active('position')
+    waypoint = fleet.active('waypoint')
+    delta = waypoint - position
+    distance = np.hypot(delta[:, 0], delta[:, 1])
+    bearing = np.degrees(np.arctan2(delta[:, 0], delta[:, 1])) % 360
+
+    # Fly-by turn anticipation: start the turn onto the next leg one turn radius
+    # times tan(half the track change) before the fix
+    speed = fleet.active('speed') / 3600  # nm per second
+    turn_radius = speed / np.radians(fleet.active('max_turn_rate'))
+    next_leg = fleet.active('next_waypoint') - waypoint
+    next_bearing = np.degrees(np.arctan2(next_leg[:, 0], next_leg[:, 1]))
+    track_change = np.minimum(np.abs(heading_difference(bearing, next_bearing)), MAX_ANTICIPATED_TURN)
+    anticipation = np.where(
+        fleet.active('has_next_waypoint'),
+        turn_radius * np.tan(np.radians(track_change) / 2),
+        0.0
+    )
+
+    # The capture radius grows with the distance flown per step so long steps
+    # cannot jump over a fix, and a fix left behind inside the turn circle is
+    # sequenced rather than orbited. That only applies once the aircraft has been
+    # flying toward the fix: one that is behind when it becomes active (a Direct To,
+    # or a new route) is turned back to instead.
+    capture = np.maximum(np.maximum(anticipation, WAYPOINT_CAPTURE_RADIUS), speed * dt)
+    behind = np.abs(heading_difference(fleet.active('heading'), bearing)) > 90
+    tracking = fleet.active('tracking')
+    reached = navigating & ((distance <= capture) | (tracking & behind & (distance < 2 * turn_radius)))
+    tracking |= navigating & ~behind
+
+    target_heading = fleet.active('target_heading')
+    target_heading[navigating] = bearing[navigating]
+    return np.flatnonzero(reached)
+
+
+class RouteTable:
+    # Arrival routes for one airport, built once: from each entry point, via the
+    # approach fix on that side of the field, to each waypoint
+    def __init__(self, waypoints, entry_points):
+        self.routes = {}  # (entry name, waypoint name) -> list of positions
+        fixes = {
+            name: np.array(waypoint['position'], dtype=float)
+            for name, waypoint in waypoints.items()
+        }
+        for entry, entry_position, _ in entry_points:
+            approach_fix = fixes.get(f"APP_{entry}")
+            for name, position in fixes.items():
+                route = [position]
+                if approach_fix is not None and not np.array_equal(approach_fix, position):
+                    route.insert(0, approach_fix)
+                self.routes[(entry, name)] = route
+
+    def route(self, entry, destination):
+        return self.routes.get((entry, destination))
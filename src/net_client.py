@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import time
+import numpy as np
+from aircraft import Aircraft
+from game_state import GameState
+from track_recorder import SAMPLE_DTYPE, sample_columns
+from net_protocol import (
+    KEYFRAME, DELTA, COMMAND, REJECTED, pack_frame, read_frame, decode_records, extrapolate
+)
+from config import SERVER_HOST, SERVER_PORT, FPS
+
+
+class SimulationClient:
+    # Mirror of a SimulationServer's airspace. Holds the last record received for
+    # every aircraft and dead-reckons them to the estimated server time, producing
+    # a GameState the Renderer can draw.
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.airport = None
+        self.records = np.zeros(0, dtype=SAMPLE_DTYPE)  # Sorted by aircraft_id
+        self.record_time = np.zeros(0)  # Server time each record was taken
+        self.aircraft_info = {}  # aircraft_id -> [callsign, aircraft_type]
+        self.conflict_ids = set()  # aircraft_id pairs in conflict
+        self.weather = None
+        self.time = 0.0  # Server time of the last frame
+        self.score = 0
+        self.speed = 1.0
+        self.received_at = None  # time.monotonic() when the last frame arrived
+        self.rejections = []  # REJECTED headers from the server, oldest first
+        self.frames_received = 0
+        self.bytes_received = 0  # State record bytes
+        self.synced = asyncio.Event()  # Set once the first keyframe is in
+        self.game_state = None
+        self.views = {}  # aircraft_id -> Aircraft view reused across frames
+
+    async def connect(self, host=SERVER_HOST, port=SERVER_PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+    async def run(self):
+        # Apply frames until the server closes the connection
+        while True:
+            frame = await read_frame(self.reader)
+            if frame is None:
+                return
+            header, body = frame
+            self.frames_received += 1
+            self.bytes_received += len(body)
+            self.handle_frame(header, body)
+
+    async def send_command(self, callsign, command, value=None):
+        self.writer.write(pack_frame({
+            'type': COMMAND, 'callsign': callsign, 'command': command, 'value': value
+        }))
+        await self.writer.drain()
+
+    def handle_frame(self, header, body):
+        kind = header['type']
+        if kind == REJECTED:
+            self.rejections.append(header)
+            return
+        records = decode_records(body)
+        if kind == KEYFRAME:
+            self.airport = header['airport']
+            self.records = records.copy()
+            self.record_time = np.full(len(records), header['time'])
+            self.aircraft_info = {}
+            self.conflict_ids = {tuple(pair) for pair in header['conflicts']}
+        elif kind == DELTA:
+            if not self.synced.is_set():
+                return  # Deltas only make sense on top of a keyframe
+            stale = np.isin(self.records['aircraft_id'], header['removed']) | np.isin(
+                self.records['aircraft_id'], records['aircraft_id']
+            )
+            merged = np.concatenate((self.records[~stale], records))
+            merged_time = np.concatenate((self.record_time[~stale], np.full(len(records), header['time'])))
+            order = np.argsort(merged['aircraft_id'], kind='stable')
+            self.records, self.record_time = merged[order], merged_time[order]
+            for aircraft_id in header['removed']:
+                self.aircraft_info.pop(aircraft_id, None)
+            self.conflict_ids -= {tuple(pair) for pair in header.get('conflicts_ended', ())}
+            self.conflict_ids |= {tuple(pair) for pair in header.get('conflicts_started', ())}
+        else:
+            return
+        self.aircraft_info.update(
+            {int(aircraft_id): info for aircraft_id, info in header['aircraft'].items()}
+        )
+        if 'weather' in header:
+            self.weather = header['weather']
+        self.time = header['time']
+        self.score = header['score']
+        self.speed = header['speed']
+        self.received_at = time.monotonic()
+        self.synced.set()
+
+    def estimated_time(self):
+        # Server time now, assuming it kept running at the last reported speed
+        return self.time + (time.monotonic() - self.received_at) * self.speed
+
+    def state(self, sim_time=None):
+        # GameState view of the airspace, dead-reckoned to sim_time (default: now)
+        if sim_time is None:
+            sim_time = self.estimated_time()
+        if self.game_state is None or self.game_state.active_airport.icao != self.airport:
+            self.game_state = GameState(self.airport)
+            self.views = {}
+        game_state = self.game_state
+        records = extrapolate(self.records, sim_time - self.record_time)
+        ids = records['aircraft_id'].tolist()
+        members = [self._view(aircraft_id) for aircraft_id in ids]
+        game_state.fleet.assign(members, **sample_columns(records))
+        game_state.aircraft = {aircraft.callsign: aircraft for aircraft in members}
+        self.views = {aircraft_id: view for aircraft_id, view in zip(ids, members)}
+        game_state.conflicts = {
+            tuple(sorted((self.views[first].callsign, self.views[second].callsign)))
+            for first, second in self.conflict_ids
+            if first in self.views and second in self.views
+        }
+        if self.weather is not None and self.weather is not game_state.weather:
+            game_state.weather = self.weather
+            game_state.weather_field.rebuild(self.weather)
+        game_state.time = sim_time
+        game_state.score = self.score
+        if game_state.selected_aircraft not in game_state.aircraft:
+            game_state.selected_aircraft = None
+        return game_state
+
+    def _view(self, aircraft_id):
+        view = self.views.get(aircraft_id)
+        if view is None:
+            callsign, aircraft_type = self.aircraft_info[aircraft_id]
+            view = Aircraft(callsign, aircraft_type, (0, 0), 0, 0)
+        return view
+
+
+async def run_viewer(client, network):
+    # pygame scope following the server; the network is read on the same event loop
+    import pygame
+    from renderer import Renderer
+    from input_handler import InputHandler
+    from config import WINDOW_WIDTH, WINDOW_HEIGHT
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption(f"Air Traffic Control Simulator - {client.airport}")
+    renderer = Renderer(screen)
+    renderer.dirty_rects_enabled = False
+    input_handler = InputHandler(renderer)
+    running = True
+    while running and not network.done():
+        game_state = client.state()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                input_handler._handle_left_click(event.pos, game_state)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (4, 5):
+                input_handler._handle_zoom(renderer, 'in' if event.button == 4 else 'out')
+        renderer.simulation_speed = renderer.effective_speed = client.speed
+        renderer.render(game_state)
+        pygame.display.flip()
+        await asyncio.sleep(1 / FPS)
+    network.cancel()
+    pygame.quit()
+
+
+async def run_client(host, port, headless, seconds):
+    from replay import describe
+    client = SimulationClient()
+    await client.connect(host, port)
+    network = asyncio.create_task(client.run())
+    await client.synced.wait()
+    if headless:
+        await asyncio.sleep(seconds)
+        print(describe(client.state()))
+        print(f"Frames: {client.frames_received}  Bytes: {client.bytes_received}")
+        network.cancel()
+    else:
+        await run_viewer(client, network)
+    await client.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Watch a shared ATC simulation served by server.py")
+    parser.add_argument('--host', default=SERVER_HOST, help="Server address")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="Server TCP port")
+    parser.add_argument('--headless', action='store_true',
+                        help="Print the traffic picture instead of opening a window")
+    parser.add_argument('--seconds', type=float, default=5.0,
+                        help="With --headless, how long to follow the server before printing")
+    args = parser.parse_args(argv)
+    asyncio.run(run_client(args.host, args.port, args.headless, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
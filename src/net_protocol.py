@@ -0,0 +1,57 @@
+import asyncio
+import json
+import struct
+import numpy as np
+from track_recorder import SAMPLE_DTYPE
+from config import SERVER_MAX_HEADER, SERVER_MAX_BODY
+
+# Every message is one frame: header length and body length (little-endian u32), a
+# UTF-8 JSON header, then the body. State frames carry SAMPLE_DTYPE records as the
+# body, the same 27-byte records the track recorder writes.
+FRAME_PREFIX = struct.Struct('<II')
+
+# Header 'type' values
+KEYFRAME = 'keyframe'  # Server -> client: every aircraft, sent on join and to resync
+DELTA = 'delta'  # Server -> client: aircraft that changed since the last broadcast
+COMMAND = 'command'  # Client -> server: one clearance
+REJECTED = 'rejected'  # Server -> client: a command that was not applied, with the reason
+
+
+def pack_frame(header, body=b''):
+    header = json.dumps(header, separators=(',', ':')).encode()
+    return FRAME_PREFIX.pack(len(header), len(body)) + header + body
+
+
+async def read_frame(reader, max_header=SERVER_MAX_HEADER, max_body=SERVER_MAX_BODY):
+    # Next (header, body) from the stream, or None once it is closed. A frame over
+    # the size limits or with a header that is not a JSON object also returns None,
+    # since the stream can no longer be trusted and the caller should drop it.
+    try:
+        header_length, body_length = FRAME_PREFIX.unpack(
+            await reader.readexactly(FRAME_PREFIX.size)
+        )
+        if header_length > max_header or body_length > max_body:
+            return None
+        header = json.loads(await reader.readexactly(header_length))
+        body = await reader.readexactly(body_length) if body_length else b''
+    except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+        return None
+    if not isinstance(header, dict):
+        return None
+    return header, body
+
+
+def decode_records(body):
+    return np.frombuffer(body, dtype=SAMPLE_DTYPE)
+
+
+def extrapolate(records, elapsed):
+    # Dead-reckon records forward by elapsed seconds (scalar or per record) along
+    # their heading and speed; server and clients predict with this same function
+    # so the server knows exactly what every client is displaying
+    distance = records['speed'] / 10 * np.asarray(elapsed) / 3600
+    heading = np.radians(records['heading'] / 100)
+    predicted = records.copy()
+    predicted['x'] = records['x'] + np.sin(heading) * distance
+    predicted['y'] = records['y'] + np.cos(heading) * distance
+    return predicted
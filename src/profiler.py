@@ -0,0 +1,100 @@
+import json
+import time
+from collections import deque
+import numpy as np
+from config import PROFILER_WINDOW, PROFILER_MAX_TRACE_EVENTS
+
+
+class _NullPhase:
+    # Shared no-op context returned while profiling is off
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class FrameProfiler:
+    # Times named phases with `with profiler.phase(name):`. Durations are summed per
+    # frame, kept in rolling windows for percentiles and logged as Chrome trace events.
+    def __init__(self, window=PROFILER_WINDOW, max_trace_events=PROFILER_MAX_TRACE_EVENTS):
+        self.enabled = False
+        self.window = window
+        self.samples = {}  # phase -> deque of per-frame totals in ms
+        self.frame_totals = {}
+        self.trace_events = deque(maxlen=max_trace_events)  # (name, start, duration)
+        self.origin = time.perf_counter()
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def record(self, name, start, end):
+        duration = end - start
+        self.frame_totals[name] = self.frame_totals.get(name, 0.0) + duration
+        self.trace_events.append((name, start, duration))
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        for name, total in self.frame_totals.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.window)
+            samples.append(total * 1000)
+        self.frame_totals.clear()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frame_totals.clear()
+        return self.enabled
+
+    def reset(self):
+        self.samples.clear()
+        self.frame_totals.clear()
+        self.trace_events.clear()
+
+    def percentiles(self):
+        # phase -> (p50, p95, p99) in ms, over the frames in which the phase ran
+        return {
+            name: tuple(np.percentile(samples, [50, 95, 99]))
+            for name, samples in self.samples.items()
+            if samples
+        }
+
+    def export_chrome_trace(self, path):
+        # Chrome trace / Perfetto "complete" events, timestamps in microseconds
+        events = [
+            {
+                'name': name,
+                'ph': 'X',
+                'ts': (start - self.origin) * 1e6,
+                'dur': duration * 1e6,
+                'pid': 1,
+                'tid': 1
+            }
+            for name, start, duration in self.trace_events
+        ]
+        with open(path, 'w') as stream:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, stream)
+        return len(events)
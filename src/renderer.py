@@ -1,19 +1,27 @@
 import pygame
 import numpy as np
 from config import (
-    BLACK, WHITE, GREEN, RED, BLUE, GRAY,
+    BLACK, WHITE, GREEN, RED, BLUE, GRAY, YELLOW,
     WINDOW_WIDTH, WINDOW_HEIGHT, RADAR_RANGE,
     BASE_SCALE_FACTOR, INFO_PANEL_WIDTH, FONT_SIZE,
     BUTTON_COLOR, BUTTON_HOVER_COLOR, BUTTON_ACTIVE_COLOR,
     SPAWN_BUTTON_WIDTH, SPAWN_BUTTON_HEIGHT, SPAWN_BUTTON_MARGIN,
     CMD_BUTTON_WIDTH, CMD_BUTTON_HEIGHT, CMD_BUTTON_MARGIN, CMD_BUTTON_SPACING,
-    AIRCRAFT_SYMBOL_SIZE, AIRCRAFT_DIRECTION_LENGTH
+    AIRCRAFT_SYMBOL_SIZE, AIRCRAFT_DIRECTION_LENGTH, TEXT_CACHE_SIZE,
+    DIRTY_RECT_RENDERING, STORM_LEVELS, STORM_COLORS, STORM_PIXEL_STEP
 )
+from text_cache import TextCache
+
+VIEWPORT_MARGIN = 80  # pixels; covers the symbol and data block offset
+PROFILER_OVERLAY_TOP = 540  # pixels; below the command buttons
+PROFILER_OVERLAY_REFRESH = 15  # frames between percentile refreshes
 
 class Renderer:
     def __init__(self, screen):
         self.screen = screen
         self.font = pygame.font.Font(None, FONT_SIZE)
+        self.text_cache = TextCache(self.font, TEXT_CACHE_SIZE)
+        self.data_blocks = {}  # callsign -> (content key, rendered data block)
         self.radar_center = np.array([WINDOW_WIDTH - INFO_PANEL_WIDTH, WINDOW_HEIGHT]) // 2
         self.spawn_button_rect = pygame.Rect(
             WINDOW_WIDTH - INFO_PANEL_WIDTH + SPAWN_BUTTON_MARGIN,
@@ -23,6 +31,28 @@ class Renderer:
         )
         self.scale_factor = BASE_SCALE_FACTOR
         self.command_buttons = self._create_command_buttons()
+        self.interpolation = 1.0  # Blend between the last two physics steps
+        self.profiler = None  # FrameProfiler shown in the info panel when enabled
+        self.sim_profile = {}  # Simulation thread phase -> (p50, p95, p99), shown alongside
+        self.profiler_lines = []
+        self.profiler_frame = 0
+        self.background = None  # Pre-rendered static radar layer
+        self.dirty_rects_enabled = DIRTY_RECT_RENDERING
+        self.drawn_background = None  # Background the screen currently holds
+        self.frame_rects = []  # Regions drawn over the background this frame
+        self.previous_rects = None  # Regions drawn last frame, restored before redrawing
+        self.panel_rect = pygame.Rect(
+            WINDOW_WIDTH - INFO_PANEL_WIDTH, 0,
+            INFO_PANEL_WIDTH, WINDOW_HEIGHT
+        )
+        # Radar area, padded so symbols and data blocks near the edge are still drawn
+        self.viewport = pygame.Rect(
+            0, 0, WINDOW_WIDTH - INFO_PANEL_WIDTH, WINDOW_HEIGHT
+        ).inflate(2 * VIEWPORT_MARGIN, 2 * VIEWPORT_MARGIN)
+        self.background_key = None
+        self.background_storm = None  # Storm grid drawn into the background, None if calm
+        self.simulation_speed = 1.0
+        self.effective_speed = 1.0
         
     def _create_command_buttons(self):
         buttons = {}
@@ -50,97 +80,231 @@ class Renderer:
         
         return buttons
         
-    def render(self, game_state):
-        self.screen.fill(BLACK)
+    def render(self, game_state, interpolation=1.0):
+        # Returns the screen regions that changed, for pygame.display.update
+        self.interpolation = interpolation
+        
+        # Static layers (rings, compass, airport, waypoints) come from one cached blit.
+        # In dirty-rect mode only last frame's regions are restored from it.
+        background = self._get_background(game_state)
+        full_redraw = (
+            not self.dirty_rects_enabled or
+            self.previous_rects is None or
+            background is not self.drawn_background
+        )
+        if full_redraw:
+            self.screen.blit(background, (0, 0))
+            self.drawn_background = background
+        else:
+            for rect in self.previous_rects:
+                self.screen.blit(background, rect, rect)
+        self.frame_rects = [self.panel_rect]
+        
+        # Project every aircraft in one pass, then draw only what is on the scope
+        screen_pos, triangles, direction_ends = self._project_aircraft(game_state.fleet)
+        
+        # Draw aircraft
+        self._draw_aircraft(game_state, screen_pos, triangles, direction_ends)
+        self._prune_data_blocks(game_state)
+        
+        # Draw predicted conflicts
+        self._draw_conflict_lines(game_state, game_state.predicted_conflicts, screen_pos, YELLOW)
+        
+        # Draw conflicts
+        self._draw_conflict_lines(game_state, game_state.conflicts, screen_pos, RED)
+        
+        # Draw information panel
+        self._draw_info_panel(game_state)
+        
+        # Draw spawn button
+        self._draw_spawn_button()
+        
+        dirty = self.previous_rects + self.frame_rects if not full_redraw else []
+        # Past half the screen, one full update is cheaper than many small ones
+        screen_rect = self.screen.get_rect()
+        if full_redraw or sum(rect.w * rect.h for rect in dirty) > screen_rect.w * screen_rect.h // 2:
+            dirty = [screen_rect]
+        self.previous_rects = self.frame_rects
+        return dirty
+
+    def invalidate(self):
+        # Force a full redraw on the next frame
+        self.previous_rects = None
+
+    def _get_background(self, game_state):
+        # Rebuilt only when the zoom, airport or waypoint set changes, or the storm
+        # cells move (once per weather update, and never while there are none)
+        key = (self.scale_factor, game_state.active_airport.icao, len(game_state.waypoints))
+        storm = game_state.weather_field.storm
+        storm_changed = storm is not self.background_storm and (
+            self.background_storm is not None or storm.any()
+        )
+        if self.background is None or key != self.background_key or storm_changed:
+            self.background = self._render_background(game_state)
+            self.background_key = key
+            self.background_storm = storm if storm.any() else None
+        return self.background
+
+    def _render_background(self, game_state):
+        surface = pygame.Surface(self.screen.get_size(), 0, self.screen)
+        surface.fill(BLACK)
+
+        # Draw convective cells under everything else
+        self._draw_storms(game_state.weather_field, surface)
         
         # Draw radar circle and range rings
-        pygame.draw.circle(self.screen, GRAY, self.radar_center, RADAR_RANGE * self.scale_factor, 1)
+        pygame.draw.circle(surface, GRAY, self.radar_center, RADAR_RANGE * self.scale_factor, 1)
         for range_nm in [10, 20, 30, 40]:
             pygame.draw.circle(
-                self.screen, GRAY, self.radar_center,
+                surface, GRAY, self.radar_center,
                 range_nm * self.scale_factor, 1
             )
         
         # Draw compass points
-        self._draw_compass_points()
+        self._draw_compass_points(surface)
         
         # Draw airport layout
-        self._draw_airport(game_state.active_airport)
+        self._draw_airport(game_state.active_airport, surface)
 
         # Draw waypoints
         for name, waypoint in game_state.waypoints.items():
             screen_pos = self._world_to_screen(waypoint['position'])
-            pygame.draw.circle(self.screen, BLUE, screen_pos, 5)
-            self._draw_text(name, screen_pos + np.array([10, -10]), WHITE)
-        
-        # Draw aircraft
-        for aircraft in game_state.aircraft.values():
-            self._draw_aircraft(aircraft, game_state.selected_aircraft == aircraft.callsign)
+            pygame.draw.circle(surface, BLUE, screen_pos, 5)
+            self._draw_text(name, screen_pos + np.array([10, -10]), WHITE, surface)
         
-        # Draw conflicts
-        for conflict in game_state.conflicts:
-            aircraft1 = game_state.aircraft[conflict[0]]
-            aircraft2 = game_state.aircraft[conflict[1]]
-            pos1 = self._world_to_screen(aircraft1.position)
-            pos2 = self._world_to_screen(aircraft2.position)
-            pygame.draw.line(self.screen, RED, pos1, pos2, 1)
-        
-        # Draw information panel
-        self._draw_info_panel(game_state)
-        
-        # Draw spawn button
-        self._draw_spawn_button()
+        return surface
+
+    def _draw_storms(self, weather_field, surface):
+        # Weather-radar style intensity bands, sampled every STORM_PIXEL_STEP pixels
+        # across the radar circle in one bilinear pass and scaled up
+        if not weather_field.storm.any():
+            return
+        radius = int(RADAR_RANGE * self.scale_factor)
+        offsets = np.arange(-radius, radius, STORM_PIXEL_STEP) + STORM_PIXEL_STEP / 2
+        x, y = np.meshgrid(offsets, offsets, indexing='ij')  # surfarray is indexed [x][y]
+        positions = np.column_stack((x.ravel(), y.ravel())) / self.scale_factor
+        intensity = weather_field.sample_storm(positions).reshape(x.shape)
+        intensity[np.hypot(x, y) > radius] = 0
+        colors = np.array(((0, 0, 0),) + STORM_COLORS, dtype=np.uint8)
+        image = pygame.surfarray.make_surface(colors[np.searchsorted(STORM_LEVELS, intensity, side='right')])
+        image = pygame.transform.scale(image, (len(offsets) * STORM_PIXEL_STEP,) * 2)
+        image.set_colorkey(BLACK)
+        surface.blit(image, (self.radar_center[0] - radius, self.radar_center[1] - radius))
 
     def _world_to_screen(self, position):
         screen_pos = position * self.scale_factor + self.radar_center
         return screen_pos.astype(int)
 
-    def _draw_airport(self, airport):
+    def _draw_airport(self, airport, surface):
         # Draw runways
         for runway in airport.runways:
             start_pos = self._world_to_screen(runway['start_pos'])
             end_pos = self._world_to_screen(runway['end_pos'])
-            pygame.draw.line(self.screen, GRAY, start_pos, end_pos, int(runway['width'] / 100 * self.scale_factor))
+            pygame.draw.line(surface, GRAY, start_pos, end_pos, int(runway['width'] / 100 * self.scale_factor))
 
         # Draw taxiways
         for taxiway in airport.taxiways:
             points = [self._world_to_screen(p) for p in taxiway]
-            pygame.draw.lines(self.screen, GRAY, False, points, 2)
+            pygame.draw.lines(surface, GRAY, False, points, 2)
 
-    def _draw_aircraft(self, aircraft, is_selected):
-        screen_pos = self._world_to_screen(aircraft.position)
-        
-        # Draw aircraft symbol (triangle)
-        color = GREEN if is_selected else WHITE
-        heading_rad = np.radians(aircraft.heading)
-        
-        # Calculate triangle points
-        direction = np.array([
-            np.sin(heading_rad),
-            np.cos(heading_rad)
-        ])
-        right = np.array([
-            np.cos(heading_rad),
-            -np.sin(heading_rad)
-        ])
-        
-        # Triangle points
-        nose = screen_pos + direction * AIRCRAFT_SYMBOL_SIZE
-        left_wing = screen_pos - direction * (AIRCRAFT_SYMBOL_SIZE/2) - right * (AIRCRAFT_SYMBOL_SIZE/2)
-        right_wing = screen_pos - direction * (AIRCRAFT_SYMBOL_SIZE/2) + right * (AIRCRAFT_SYMBOL_SIZE/2)
-        
-        # Draw filled triangle for better visibility
-        pygame.draw.polygon(self.screen, color, [nose, left_wing, right_wing])
-        
-        # Draw direction line
-        end_pos = screen_pos + direction * AIRCRAFT_DIRECTION_LENGTH
-        pygame.draw.line(self.screen, color, screen_pos, end_pos, 2)
-        
-        # Draw aircraft data block
-        label = f"{aircraft.callsign}\n{int(aircraft.altitude/100):03d}\n{int(aircraft.speed)}"
-        self._draw_text(label, screen_pos + np.array([15, -20]), color)
+    def _project_aircraft(self, fleet):
+        # Screen position, symbol triangle and direction line for every aircraft at once
+        previous = fleet.active('previous_position')
+        positions = previous + (fleet.active('position') - previous) * self.interpolation
+        screen_pos = (positions * self.scale_factor + self.radar_center).astype(int)
+
+        heading_rad = np.radians(fleet.active('heading'))
+        direction = np.column_stack((np.sin(heading_rad), np.cos(heading_rad)))
+        right = np.column_stack((np.cos(heading_rad), -np.sin(heading_rad)))
+
+        # Triangle points: nose, left wing, right wing
+        half = AIRCRAFT_SYMBOL_SIZE / 2
+        triangles = np.stack((
+            screen_pos + direction * AIRCRAFT_SYMBOL_SIZE,
+            screen_pos - direction * half - right * half,
+            screen_pos - direction * half + right * half
+        ), axis=1)
+        direction_ends = screen_pos + direction * AIRCRAFT_DIRECTION_LENGTH
+        return screen_pos, triangles, direction_ends
+
+    def _visible_mask(self, points):
+        viewport = self.viewport
+        return (
+            (points[..., 0] >= viewport.left) & (points[..., 0] < viewport.right) &
+            (points[..., 1] >= viewport.top) & (points[..., 1] < viewport.bottom)
+        )
 
-    def _draw_compass_points(self):
+    def _draw_aircraft(self, game_state, screen_pos, triangles, direction_ends):
+        fleet = game_state.fleet
+        selected = game_state.get_selected_aircraft()
+        for i in np.flatnonzero(self._visible_mask(screen_pos)):
+            aircraft = fleet.members[i]
+            color = GREEN if aircraft is selected else WHITE
+            
+            # Draw filled triangle for better visibility
+            symbol_rect = pygame.draw.polygon(self.screen, color, triangles[i])
+            
+            # Draw direction line
+            line_rect = pygame.draw.line(self.screen, color, screen_pos[i], direction_ends[i], 2)
+            
+            # Draw aircraft data block
+            data_block = self._get_data_block(aircraft, color)
+            block_rect = self.screen.blit(data_block, (screen_pos[i][0] + 15, screen_pos[i][1] - 20))
+            self.frame_rects.append(symbol_rect.union(line_rect).union(block_rect))
+
+    def _draw_conflict_lines(self, game_state, pairs, screen_pos, color):
+        rows = [
+            (aircraft1._index, aircraft2._index)
+            for aircraft1, aircraft2 in (
+                (game_state.aircraft.get(pair[0]), game_state.aircraft.get(pair[1]))
+                for pair in pairs
+            )
+            if aircraft1 and aircraft2
+        ]
+        if not rows:
+            return
+
+        # Skip lines whose bounding box misses the radar viewport
+        ends = screen_pos[np.array(rows)]
+        low, high = ends.min(axis=1), ends.max(axis=1)
+        viewport = self.viewport
+        visible = (
+            (high[:, 0] >= viewport.left) & (low[:, 0] < viewport.right) &
+            (high[:, 1] >= viewport.top) & (low[:, 1] < viewport.bottom)
+        )
+        for start, end in ends[visible]:
+            self.frame_rects.append(pygame.draw.line(self.screen, color, start, end, 1))
+
+    def _get_data_block(self, aircraft, color):
+        # Re-rendered only when the callsign, displayed altitude or speed changes
+        key = (aircraft.callsign, int(aircraft.altitude/100), int(aircraft.speed), color)
+        cached = self.data_blocks.get(aircraft.callsign)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        lines = [
+            self.text_cache.render(aircraft.callsign, color),
+            self.text_cache.render(f"{key[1]:03d}", color),
+            self.text_cache.render(f"{key[2]}", color)
+        ]
+        line_height = FONT_SIZE + 2
+        surface = pygame.Surface(
+            (max(line.get_width() for line in lines), line_height * len(lines)),
+            pygame.SRCALPHA
+        )
+        for i, line in enumerate(lines):
+            surface.blit(line, (0, i * line_height))
+        self.data_blocks[aircraft.callsign] = (key, surface)
+        return surface
+
+    def _prune_data_blocks(self, game_state):
+        if len(self.data_blocks) > 2 * len(game_state.aircraft) + 16:
+            self.data_blocks = {
+                callsign: block for callsign, block in self.data_blocks.items()
+                if callsign in game_state.aircraft
+            }
+
+    def _draw_compass_points(self, surface):
         compass_points = [
             ('N', (0, -RADAR_RANGE)),
             ('S', (0, RADAR_RANGE)),
@@ -150,13 +314,10 @@ class Renderer:
         
         for label, pos in compass_points:
             screen_pos = self._world_to_screen(np.array(pos))
-            self._draw_text(label, screen_pos, WHITE)
+            self._draw_text(label, screen_pos, WHITE, surface)
 
     def _draw_info_panel(self, game_state):
-        panel_rect = pygame.Rect(
-            WINDOW_WIDTH - INFO_PANEL_WIDTH, 0,
-            INFO_PANEL_WIDTH, WINDOW_HEIGHT
-        )
+        panel_rect = self.panel_rect
         pygame.draw.rect(self.screen, GRAY, panel_rect, 1)
         
         y = 10
@@ -179,6 +340,14 @@ class Renderer:
         self._draw_text(zoom_text, (panel_rect.x + 10, y), WHITE)
         y += 30
         
+        # Draw simulation speed, flagging when the CPU cannot keep up
+        speed_text = f"Sim speed: {self.simulation_speed:.2f}x"
+        lagging = self.effective_speed < self.simulation_speed * 0.9
+        if lagging:
+            speed_text += f" (actual {self.effective_speed:.1f}x)"
+        self._draw_text(speed_text, (panel_rect.x + 10, y), RED if lagging else WHITE)
+        y += 30
+        
         # Draw weather information
         weather_text = [
             f"Wind: {int(game_state.weather['wind_speed'])}kts",
@@ -205,6 +374,34 @@ class Renderer:
             
             # Draw command buttons if aircraft is selected
             self._draw_command_buttons(selected)
+        
+        # Draw frame profiler overlay
+        if self.profiler and self.profiler.enabled:
+            self._draw_profiler_overlay(panel_rect.x + 10, PROFILER_OVERLAY_TOP)
+
+    def _draw_profiler_overlay(self, x, y):
+        # Percentiles are refreshed a few times a second rather than every frame
+        if self.profiler_frame % PROFILER_OVERLAY_REFRESH == 0:
+            self.profiler_lines = [
+                f"{name}: {p50:.2f} / {p95:.2f} / {p99:.2f}"
+                for name, (p50, p95, p99) in sorted(self.profiler.percentiles().items())
+            ] + [
+                f"sim {name}: {p50:.2f} / {p95:.2f} / {p99:.2f}"
+                for name, (p50, p95, p99) in sorted(self.sim_profile.items())
+            ]
+            # Hit rate since the last refresh, so a drop shows up while it happens
+            stats = self.text_cache.stats()
+            self.profiler_lines.append(
+                f"text cache: {stats['entries']} entries, {stats['hit_rate']:.0%} hits"
+                f" ({stats['misses']} misses)"
+            )
+            self.text_cache.reset_stats()
+        self.profiler_frame += 1
+
+        self._draw_text("Phase ms (p50 / p95 / p99)", (x, y), WHITE)
+        for line in self.profiler_lines:
+            y += FONT_SIZE + 2
+            self._draw_text(line, (x, y), GRAY)
 
     def _draw_command_buttons(self, aircraft):
         mouse_pos = pygame.mouse.get_pos()
@@ -223,7 +420,7 @@ class Renderer:
             pygame.draw.rect(self.screen, WHITE, button['rect'], 1)
             
             # Draw button text
-            text = self.font.render(button['label'], True, WHITE)
+            text = self.text_cache.render(button['label'], WHITE)
             text_rect = text.get_rect(center=button['rect'].center)
             self.screen.blit(text, text_rect)
             
@@ -245,14 +442,15 @@ class Renderer:
         pygame.draw.rect(self.screen, WHITE, self.spawn_button_rect, 1)
         
         # Draw button text
-        text = self.font.render("Spawn Aircraft", True, WHITE)
+        text = self.text_cache.render("Spawn Aircraft", WHITE)
         text_rect = text.get_rect(center=self.spawn_button_rect.center)
         self.screen.blit(text, text_rect)
 
-    def _draw_text(self, text, position, color):
+    def _draw_text(self, text, position, color, surface=None):
+        surface = surface or self.screen
         for i, line in enumerate(text.split('\n')):
-            text_surface = self.font.render(line, True, color)
-            self.screen.blit(
+            text_surface = self.text_cache.render(line, color)
+            surface.blit(
                 text_surface,
                 (position[0], position[1] + i * (FONT_SIZE + 2))
             ) 
\ No newline at end of file
@@ -0,0 +1,267 @@
+import argparse
+import numpy as np
+from aircraft import Aircraft
+from game_state import GameState
+from track_recorder import TrackRecording, sample_columns
+from config import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, INFO_PANEL_WIDTH, FPS, GRAY, GREEN, WHITE,
+    REPLAY_SPEEDS, REPLAY_SCRUB_STEP
+)
+
+
+class ReplayPlayer:
+    # Plays a recording back through a GameState the Renderer can draw. Seeking restores
+    # the keyframe at or before the target and overlays that tick's recorded fleet, so
+    # any point in the session costs one keyframe load and one tick decode at most.
+    def __init__(self, recording):
+        self.recording = recording
+        self.game_state = None
+        self.keyframe = None  # Index of the keyframe game_state was restored from
+        self.tick = None
+        self.views = {}  # aircraft_id -> Aircraft view reused across ticks
+        self.time = self.start_time
+        self.speed_index = 0
+        self.reverse = False
+        self.playing = True
+        self.seek(self.start_time)
+
+    @property
+    def start_time(self):
+        return float(self.recording.ticks['time'][0])
+
+    @property
+    def end_time(self):
+        return float(self.recording.ticks['time'][-1])
+
+    @property
+    def speed(self):
+        # Signed playback rate, negative when playing in reverse
+        speed = REPLAY_SPEEDS[self.speed_index]
+        return -speed if self.reverse else speed
+
+    def faster(self):
+        self.speed_index = min(self.speed_index + 1, len(REPLAY_SPEEDS) - 1)
+
+    def slower(self):
+        self.speed_index = max(self.speed_index - 1, 0)
+
+    def toggle_reverse(self):
+        self.reverse = not self.reverse
+        self.playing = True
+
+    def toggle_pause(self):
+        self.playing = not self.playing
+
+    def advance(self, frame_time):
+        if not self.playing:
+            return
+        self.seek(self.time + frame_time * self.speed)
+        if self.time in (self.start_time, self.end_time):
+            self.playing = False
+
+    def seek(self, sim_time):
+        self.time = min(max(sim_time, self.start_time), self.end_time)
+        tick = self.recording.tick_at_time(self.time)
+        if tick != self.tick:
+            self._load_tick(tick)
+        return self.game_state
+
+    def _load_tick(self, tick):
+        keyframe = self.recording.keyframe_for_tick(tick)
+        if keyframe != self.keyframe:
+            self._load_keyframe(keyframe)
+        self.tick = tick
+        self._apply_samples(tick)
+
+    def _load_keyframe(self, index):
+        snapshot = self.recording.load_keyframe(index)
+        selected = self.game_state.selected_aircraft if self.game_state else None
+        if self.game_state is None:
+            self.game_state = GameState.from_snapshot(snapshot)
+        else:
+            self.game_state.restore(snapshot)
+        self.game_state.selected_aircraft = selected
+        self.keyframe = index
+        self.views = {aircraft.aircraft_id: aircraft for aircraft in self.game_state.fleet.members}
+
+    def _view(self, aircraft_id):
+        view = self.views.get(aircraft_id)
+        if view is None:
+            # A recording cut short can hold aircraft that spawned after its last keyframe
+            info = self.recording.aircraft_info.get(
+                aircraft_id, {'callsign': 'ID%d' % aircraft_id, 'aircraft_type': 'medium'}
+            )
+            view = Aircraft(info['callsign'], info['aircraft_type'], (0, 0), 0, 0)
+            self.views[aircraft_id] = view
+        return view
+
+    def _apply_samples(self, tick):
+        # Overwrite the keyframe's fleet with the fleet recorded at this tick
+        game_state = self.game_state
+        samples = np.asarray(self.recording.tick_samples(tick))
+        entry = self.recording.ticks[tick]
+        ids = samples['aircraft_id'].tolist()
+        members = [self._view(aircraft_id) for aircraft_id in ids]
+        game_state.fleet.assign(members, **sample_columns(samples))
+        game_state.aircraft = {aircraft.callsign: aircraft for aircraft in members}
+
+        callsigns = {aircraft_id: view.callsign for aircraft_id, view in zip(ids, members)}
+        game_state.conflicts = {
+            tuple(sorted((callsigns[int(pair['first'])], callsigns[int(pair['second'])])))
+            for pair in self.recording.tick_conflicts(tick)
+        }
+        game_state.predicted_conflicts = {}  # Only the keyframes carry probe results
+        game_state.time = float(entry['time'])
+        game_state.score = float(entry['score'])
+        if game_state.selected_aircraft not in game_state.aircraft:
+            game_state.selected_aircraft = None
+
+    def resume(self):
+        # Live GameState continuing from the keyframe at or before the current time
+        keyframe = self.recording.keyframe_for_tick(self.tick)
+        return GameState.from_snapshot(self.recording.load_keyframe(keyframe))
+
+
+class ReplayViewer:
+    # pygame front end: the scope drawn by Renderer plus a scrubbable timeline
+    def __init__(self, recording_path):
+        import pygame
+        from renderer import Renderer
+        from input_handler import InputHandler
+        self.pygame = pygame
+        pygame.init()
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption("Air Traffic Control Simulator - Replay")
+        self.clock = pygame.time.Clock()
+        self.player = ReplayPlayer(TrackRecording(recording_path))
+        self.renderer = Renderer(self.screen)
+        self.renderer.dirty_rects_enabled = False  # The timeline is drawn over every frame
+        self.input_handler = InputHandler(self.renderer)
+        self.timeline_rect = pygame.Rect(
+            20, WINDOW_HEIGHT - 30, WINDOW_WIDTH - INFO_PANEL_WIDTH - 40, 10
+        )
+        self.scrubbing = False
+        self.is_running = True
+
+    def _seek_to_pixel(self, x):
+        fraction = (x - self.timeline_rect.x) / self.timeline_rect.w
+        player = self.player
+        player.seek(player.start_time + fraction * (player.end_time - player.start_time))
+
+    def handle_events(self):
+        pygame = self.pygame
+        player = self.player
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.is_running = False
+            elif event.type == pygame.KEYDOWN:
+                step = REPLAY_SCRUB_STEP * (6 if event.mod & pygame.KMOD_SHIFT else 1)
+                if event.key == pygame.K_ESCAPE:
+                    self.is_running = False
+                elif event.key == pygame.K_SPACE:
+                    player.toggle_pause()
+                elif event.key in (pygame.K_PLUS, pygame.K_KP_PLUS, pygame.K_EQUALS):
+                    player.faster()
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    player.slower()
+                elif event.key == pygame.K_r:
+                    player.toggle_reverse()
+                elif event.key == pygame.K_LEFT:
+                    player.seek(player.time - step)
+                elif event.key == pygame.K_RIGHT:
+                    player.seek(player.time + step)
+                elif event.key == pygame.K_HOME:
+                    player.seek(player.start_time)
+                elif event.key == pygame.K_END:
+                    player.seek(player.end_time)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if event.button == 1 and self.timeline_rect.inflate(0, 20).collidepoint(event.pos):
+                    self.scrubbing = True
+                    self._seek_to_pixel(event.pos[0])
+                elif event.button == 1:
+                    self.input_handler._handle_left_click(event.pos, player.game_state)
+                elif event.button == 4:
+                    self.input_handler._handle_zoom(self.renderer, 'in')
+                elif event.button == 5:
+                    self.input_handler._handle_zoom(self.renderer, 'out')
+            elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+                self.scrubbing = False
+            elif event.type == pygame.MOUSEMOTION and self.scrubbing:
+                self._seek_to_pixel(event.pos[0])
+
+    def render(self):
+        pygame = self.pygame
+        player = self.player
+        self.renderer.simulation_speed = self.renderer.effective_speed = (
+            abs(player.speed) if player.playing else 0.0
+        )
+        self.renderer.render(player.game_state)
+
+        duration = max(player.end_time - player.start_time, 1e-9)
+        fraction = (player.time - player.start_time) / duration
+        pygame.draw.rect(self.screen, GRAY, self.timeline_rect, 1)
+        filled = self.timeline_rect.copy()
+        filled.w = int(filled.w * fraction)
+        pygame.draw.rect(self.screen, GREEN, filled)
+        state = "PLAY" if player.playing else "PAUSED"
+        self.renderer._draw_text(
+            f"REPLAY {state} {player.speed:+d}x  [Space] pause  [+/-] speed  [R] reverse  "
+            f"[Left/Right] scrub  [Home/End]",
+            (self.timeline_rect.x, self.timeline_rect.y - 20), WHITE
+        )
+        pygame.display.flip()
+
+    def run(self):
+        while self.is_running:
+            frame_time = self.clock.tick(FPS) / 1000.0
+            self.handle_events()
+            if not self.scrubbing:
+                self.player.advance(frame_time)
+            self.render()
+        self.pygame.quit()
+
+
+def describe(game_state):
+    lines = [
+        f"Time: {game_state.time:.1f}s  Score: {int(game_state.score)}",
+        f"Aircraft: {len(game_state.aircraft)}  Conflicts: {len(game_state.conflicts)}"
+    ]
+    for callsign, aircraft in sorted(game_state.aircraft.items()):
+        x, y = aircraft.position
+        lines.append(
+            f"  {callsign:8s} {aircraft.aircraft_type:6s} ({x:7.2f}, {y:7.2f})nm "
+            f"{int(aircraft.altitude):5d}ft {int(aircraft.heading):3d}° {int(aircraft.speed)}kts"
+        )
+    for first, second in sorted(game_state.conflicts):
+        lines.append(f"  CONFLICT {first} / {second}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a recorded ATC session")
+    parser.add_argument('recording', help="Directory written by --record")
+    parser.add_argument('--headless', action='store_true', help="Print the state instead of opening a window")
+    parser.add_argument('--at', type=float, default=None, help="Simulated time in seconds to jump to")
+    parser.add_argument('--resume-ticks', type=int, default=0,
+                        help="With --headless, simulate this many ticks onward from the nearest keyframe")
+    args = parser.parse_args(argv)
+
+    if not args.headless:
+        viewer = ReplayViewer(args.recording)
+        if args.at is not None:
+            viewer.player.seek(args.at)
+        viewer.run()
+        return None
+
+    player = ReplayPlayer(TrackRecording(args.recording))
+    game_state = player.seek(player.end_time if args.at is None else args.at)
+    if args.resume_ticks:
+        game_state = player.resume()
+        for _ in range(args.resume_ticks):
+            game_state.update(1.0)
+    print(describe(game_state))
+    return game_state
+
+
+if __name__ == "__main__":
+    main()
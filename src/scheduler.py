@@ -0,0 +1,57 @@
+import heapq
+
+
+class EventScheduler:
+    # Min-heap of (time, sequence, kind, payload) records. Events are plain data so
+    # the queue can be snapshotted; GameState maps each kind to a handler. Cancelled
+    # events stay in the heap and are skipped when they reach the top.
+    def __init__(self):
+        self.queue = []
+        self.sequence = 0  # Tie-breaker keeping same-time events in scheduling order
+        self.pending = set()  # Ids of events still due to fire
+        self.cancelled = set()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def schedule(self, time, kind, payload=None):
+        event_id = self.sequence
+        self.sequence += 1
+        heapq.heappush(self.queue, (time, event_id, kind, payload))
+        self.pending.add(event_id)
+        return event_id
+
+    def cancel(self, event_id):
+        if event_id in self.pending:
+            self.pending.discard(event_id)
+            self.cancelled.add(event_id)
+
+    def _discard_cancelled(self):
+        queue = self.queue
+        while queue and queue[0][1] in self.cancelled:
+            self.cancelled.discard(heapq.heappop(queue)[1])
+
+    def next_time(self):
+        # Time of the earliest pending event, or infinity when none are queued
+        self._discard_cancelled()
+        return self.queue[0][0] if self.queue else float('inf')
+
+    def pop(self):
+        # Earliest pending event as (time, kind, payload)
+        self._discard_cancelled()
+        time, event_id, kind, payload = heapq.heappop(self.queue)
+        self.pending.discard(event_id)
+        return time, kind, payload
+
+    def snapshot(self):
+        return {
+            'queue': sorted(event for event in self.queue if event[1] not in self.cancelled),
+            'sequence': self.sequence
+        }
+
+    def restore(self, snapshot):
+        self.queue = list(snapshot['queue'])
+        heapq.heapify(self.queue)
+        self.sequence = snapshot['sequence']
+        self.pending = {event[1] for event in self.queue}
+        self.cancelled = set()
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import copy
+import sys
+import traceback
+import numpy as np
+from game_state import GameState
+from track_recorder import SAMPLE_DTYPE, encode_samples
+from traffic_schedule import load_schedule
+from net_protocol import (
+    KEYFRAME, DELTA, COMMAND, REJECTED, pack_frame, read_frame, extrapolate
+)
+from config import (
+    TICK_DT, MAX_FRAME_TIME, SERVER_HOST, SERVER_PORT, SERVER_BROADCAST_INTERVAL,
+    SERVER_POSITION_TOLERANCE, SERVER_ALTITUDE_TOLERANCE, SERVER_COMMAND_RATE,
+    SERVER_COMMAND_BURST, SERVER_MAX_BUFFER
+)
+
+# Record fields a client cannot predict; any change in one of them is resent
+DISCRETE_FIELDS = ('heading', 'speed', 'target_altitude', 'target_heading', 'target_speed', 'flags')
+
+
+class ClientConnection:
+    # One connected client: its stream and a token bucket limiting its commands
+    def __init__(self, writer, rate, burst):
+        self.writer = writer
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = None
+        self.needs_keyframe = True  # Joining, or skipped a delta while backed up
+        self.commands_received = 0
+        self.commands_rejected = 0
+
+    def allow_command(self, now):
+        if self.last_refill is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def send(self, frame):
+        self.writer.write(frame)
+
+    @property
+    def backed_up(self):
+        return self.writer.transport.get_write_buffer_size() > SERVER_MAX_BUFFER
+
+
+class SimulationServer:
+    # Runs one GameState authoritatively and streams it to any number of clients.
+    # Clients dead-reckon every aircraft from the last record they were sent, so a
+    # broadcast only carries aircraft whose real state has left that prediction or
+    # changed a clearance. Each broadcast is encoded once and the same bytes are
+    # written to every client; a joining or backed-up client gets a keyframe instead.
+    def __init__(self, game_state, host=SERVER_HOST, port=SERVER_PORT, simulation_speed=1.0,
+                 broadcast_interval=SERVER_BROADCAST_INTERVAL, command_rate=SERVER_COMMAND_RATE,
+                 command_burst=SERVER_COMMAND_BURST):
+        self.game_state = game_state
+        self.host = host
+        self.port = port  # Port 0 picks a free one; the bound port is stored on start()
+        self.simulation_speed = simulation_speed
+        self.broadcast_interval = broadcast_interval
+        self.command_rate = command_rate
+        self.command_burst = command_burst
+        self.clients = set()
+        self.client_tasks = set()
+        self.pending_commands = []  # (client, command) applied at the next tick boundary
+        self.published = np.zeros(0, dtype=SAMPLE_DTYPE)  # What clients were last sent, sorted by id
+        self.published_time = np.zeros(0)  # Sim time each published record was taken
+        self.aircraft_info = {}  # aircraft_id -> [callsign, aircraft_type], for published ids
+        self.sent_conflicts = {}  # Callsign pair -> aircraft_id pair, as clients hold them
+        self.conflict_changes = {}  # Callsign pair -> in conflict, as of the latest step
+        self.sent_weather = None
+        self.server = None
+        self.simulation_task = None
+        self.ticks = 0
+        self.broadcasts = 0
+        self.records_sent = 0  # Records encoded into broadcasts, counted once per broadcast
+        self.bytes_sent = 0  # Bytes written to all clients
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.simulation_task = asyncio.create_task(self._run_simulation())
+
+    async def stop(self):
+        self.simulation_task.cancel()
+        try:
+            await self.simulation_task
+        except asyncio.CancelledError:
+            pass
+        self.server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        await asyncio.gather(*self.client_tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        await self.simulation_task
+
+    async def _handle_client(self, reader, writer):
+        client = ClientConnection(writer, self.command_rate, self.command_burst)
+        self.clients.add(client)
+        self.client_tasks.add(asyncio.current_task())
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                # Commands carry no body, so any client frame with one is dropped
+                frame = await read_frame(reader, max_body=0)
+                if frame is None:
+                    break
+                header, _ = frame
+                if header.get('type') != COMMAND:
+                    continue
+                client.commands_received += 1
+                if client.allow_command(loop.time()):
+                    self.pending_commands.append((client, header))
+                else:
+                    self._reject(client, header, "rate limited")
+        finally:
+            self.clients.discard(client)
+            self.client_tasks.discard(asyncio.current_task())
+            writer.close()
+
+    def _reject(self, client, command, reason):
+        client.commands_rejected += 1
+        client.send(pack_frame({
+            'type': REJECTED,
+            'callsign': command.get('callsign'),
+            'command': command.get('command'),
+            'reason': reason
+        }))
+
+    async def _run_simulation(self):
+        # Fixed-rate tick on the event loop; a backlog longer than MAX_FRAME_TIME is
+        # dropped rather than replayed in a burst
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        last_broadcast = -np.inf
+        while True:
+            try:
+                self.tick()
+            except Exception:
+                # Keep serving; the tick's commands are already consumed, so a bad one is not retried
+                print(f"Simulation tick {self.ticks} failed:", file=sys.stderr)
+                traceback.print_exc()
+            now = loop.time()
+            if now - last_broadcast >= self.broadcast_interval:
+                self.broadcast()
+                last_broadcast = now
+            next_tick += TICK_DT
+            delay = next_tick - loop.time()
+            if delay < -MAX_FRAME_TIME:
+                next_tick = loop.time()
+            await asyncio.sleep(max(delay, 0))
+
+    def tick(self):
+        # Client commands go through GameState's command queue, so they apply at
+        # this tick's boundary; refusals are reported back once it has run
+        game_state = self.game_state
+        submitted = []
+        for client, command in self.pending_commands:
+            value = command.get('value')
+            try:
+                batch = game_state.issue_commands(
+                    command.get('command'), [command.get('callsign')], None if value is None else [value]
+                )
+            except ValueError as error:
+                self._reject(client, command, str(error))
+                continue
+            except Exception as error:
+                # Client input must never take the simulation down
+                print(f"Rejected malformed command {command!r}: {error!r}", file=sys.stderr)
+                self._reject(client, command, "malformed command")
+                continue
+            submitted.append((client, command, batch))
+        self.pending_commands = []
+        game_state.update(self.simulation_speed)
+        for client, command, batch in submitted:
+            if batch.reasons:
+                self._reject(client, command, batch.reasons[0][1])
+        for pair in game_state.conflicts_started:
+            self.conflict_changes[pair] = True
+        for pair in game_state.conflicts_ended:
+            self.conflict_changes[pair] = False
+        self.ticks += 1
+
+    def broadcast(self):
+        game_state = self.game_state
+        now = game_state.time
+        fleet = game_state.fleet
+        current = encode_samples(fleet, np.empty(fleet.count, dtype=SAMPLE_DTYPE))
+        order = np.argsort(current['aircraft_id'], kind='stable')
+        current = current[order]
+        ids = current['aircraft_id']
+
+        # Match against what clients hold and find what they can no longer predict
+        published = self.published
+        published_ids = published['aircraft_id']
+        index = np.minimum(np.searchsorted(published_ids, ids), max(len(published) - 1, 0))
+        known = published_ids[index] == ids if len(published) else np.zeros(len(ids), dtype=bool)
+        base = published[index] if len(published) else current.copy()
+        base_time = self.published_time[index] if len(published) else np.full(len(ids), now)
+        predicted = extrapolate(base, now - base_time)
+        drift = np.hypot(current['x'] - predicted['x'], current['y'] - predicted['y'])
+        changed = (
+            ~known | (drift > SERVER_POSITION_TOLERANCE) |
+            (np.abs(current['altitude'] - base['altitude']) > SERVER_ALTITUDE_TOLERANCE)
+        )
+        for name in DISCRETE_FIELDS:
+            changed |= current[name] != base[name]
+        removed = np.setdiff1d(published_ids, ids, assume_unique=True)
+
+        base[changed] = current[changed]
+        base_time[changed] = now
+        self.published, self.published_time = base, base_time
+        arrivals = {}
+        for row in np.flatnonzero(~known).tolist():
+            aircraft = fleet.members[order[row]]
+            arrivals[int(ids[row])] = [aircraft.callsign, aircraft.aircraft_type]
+        for aircraft_id in removed.tolist():
+            self.aircraft_info.pop(aircraft_id, None)
+        self.aircraft_info.update(arrivals)
+
+        header = {
+            'type': DELTA,
+            'time': now,
+            'score': game_state.score,
+            'speed': self.simulation_speed,
+            'removed': removed.tolist(),
+            'aircraft': arrivals
+        }
+        started, ended = self._conflict_deltas()
+        if started or ended:
+            header['conflicts_started'] = started
+            header['conflicts_ended'] = ended
+        if game_state.weather != self.sent_weather:
+            self.sent_weather = copy.deepcopy(game_state.weather)
+            header['weather'] = game_state.weather
+        records = current[changed]
+        delta = pack_frame(header, records.tobytes())
+        self.broadcasts += 1
+        self.records_sent += len(records)
+
+        keyframe = None
+        for client in list(self.clients):
+            if client.backed_up:
+                client.needs_keyframe = True  # Skipping breaks the delta chain
+                continue
+            if client.needs_keyframe:
+                keyframe = keyframe or self._keyframe()
+                client.send(keyframe)
+                client.needs_keyframe = False
+                self.bytes_sent += len(keyframe)
+            else:
+                client.send(delta)
+                self.bytes_sent += len(delta)
+
+    def _conflict_deltas(self):
+        # Conflicts that began or ended since the last broadcast, as aircraft_id pairs
+        aircraft = self.game_state.aircraft
+        started, ended = [], []
+        for pair, in_conflict in self.conflict_changes.items():
+            if in_conflict and pair not in self.sent_conflicts:
+                first, second = pair
+                if first in aircraft and second in aircraft:
+                    ids = (aircraft[first].aircraft_id, aircraft[second].aircraft_id)
+                    self.sent_conflicts[pair] = ids
+                    started.append(ids)
+            elif not in_conflict and pair in self.sent_conflicts:
+                ended.append(self.sent_conflicts.pop(pair))
+        self.conflict_changes = {}
+        return started, ended
+
+    def _keyframe(self):
+        # Everything published, re-based to the current time so the client predicts
+        # exactly what delta-fed clients do
+        game_state = self.game_state
+        now = game_state.time
+        records = extrapolate(self.published, now - self.published_time)
+        return pack_frame({
+            'type': KEYFRAME,
+            'airport': game_state.active_airport.icao,
+            'time': now,
+            'score': game_state.score,
+            'speed': self.simulation_speed,
+            'aircraft': self.aircraft_info,
+            'conflicts': sorted(self.sent_conflicts.values()),
+            'weather': game_state.weather
+        }, records.tobytes())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve one shared ATC simulation to networked clients")
+    parser.add_argument('--airport', default='KRST', help="ICAO code of the active airport")
+    parser.add_argument('--host', default=SERVER_HOST, help="Address to listen on")
+    parser.add_argument('--port', type=int, default=SERVER_PORT, help="TCP port to listen on")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed for the simulation")
+    parser.add_argument('--speed', type=float, default=1.0, help="Simulation speed multiplier")
+    parser.add_argument('--schedule', metavar='FILE', default=None,
+                        help="Fly a CSV or JSON-lines traffic schedule instead of random traffic")
+    args = parser.parse_args(argv)
+
+    game_state = GameState(args.airport, seed=args.seed)
+    if args.schedule:
+        load_schedule(game_state, args.schedule)
+    server = SimulationServer(game_state, args.host, args.port, args.speed)
+    print(f"Serving {args.airport} on {args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import time
+from config import PHYSICS_DT, SUBSTEP_TIME_BUDGET, MAX_FRAME_TIME, FPS
+
+
+class SimulationClock:
+    # Fixed-timestep driver: each rendered frame banks frame_time * speed of simulated
+    # time and spends it in PHYSICS_DT substeps, within a wall-clock budget. When the
+    # CPU cannot keep up, the backlog is dropped instead of spiralling, so the effective
+    # speed sags rather than the frame rate.
+    def __init__(self, physics_dt=PHYSICS_DT, budget=SUBSTEP_TIME_BUDGET / FPS):
+        self.physics_dt = physics_dt
+        self.budget = budget  # Wall-clock seconds per frame available for substeps
+        self.accumulator = 0.0
+        self.substeps = 0  # Substeps run in the last frame
+        self.dropped_time = 0.0  # Simulated seconds discarded to stay within budget
+        self.effective_speed = 1.0
+
+    @property
+    def alpha(self):
+        # Fraction of a physics step banked but not yet simulated, for interpolation
+        return self.accumulator / self.physics_dt
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.substeps = 0
+
+    def advance(self, game_state, frame_time, simulation_speed):
+        frame_time = min(frame_time, MAX_FRAME_TIME)
+        self.accumulator += frame_time * simulation_speed
+
+        start = time.perf_counter()
+        self.substeps = 0
+        while self.accumulator >= self.physics_dt:
+            game_state.step(self.physics_dt)
+            self.accumulator -= self.physics_dt
+            self.substeps += 1
+            if time.perf_counter() - start > self.budget:
+                break
+
+        # Over budget: keep the sub-step remainder so motion stays smooth, drop the rest
+        backlog = 0.0
+        if self.accumulator >= self.physics_dt:
+            backlog = self.accumulator - self.accumulator % self.physics_dt
+            self.dropped_time += backlog
+            self.accumulator -= backlog
+
+        if frame_time > 0:
+            speed = simulation_speed - backlog / frame_time
+            self.effective_speed += (speed - self.effective_speed) * 0.1
+        return self.substeps
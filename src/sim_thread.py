@@ -0,0 +1,181 @@
+import copy
+import threading
+import time
+import queue
+from aircraft import Aircraft
+from fleet import FLEET_COLUMNS
+from game_state import GameState
+from commands import CommandChannel
+from sim_clock import SimulationClock
+from config import SIM_THREAD_RATE, SUBSTEP_TIME_BUDGET, MAX_FRAME_TIME
+
+PROFILE_REFRESH = 15  # Ticks between the phase percentiles copied into snapshots
+
+
+class StateSnapshot:
+    # Everything the scope draws, copied out of the GameState after a tick. Never
+    # modified once published: its arrays are read-only and its sets frozen.
+    def __init__(self, game_state, weather, storm, clock, speed):
+        fleet = game_state.fleet
+        self.columns = {}
+        for name in FLEET_COLUMNS:
+            column = fleet.active(name).copy()
+            column.flags.writeable = False
+            self.columns[name] = column
+        self.callsigns = tuple(aircraft.callsign for aircraft in fleet.members)
+        self.aircraft_types = tuple(aircraft.aircraft_type for aircraft in fleet.members)
+        self.conflicts = frozenset(game_state.conflicts)
+        self.predicted_conflicts = dict(game_state.predicted_conflicts)
+        self.weather = weather
+        self.storm = storm  # WeatherField.storm; rebuilds replace it rather than write into it
+        self.time = game_state.time
+        self.score = game_state.score
+        self.accumulator = clock.accumulator  # Banked sim time not yet stepped
+        self.speed = speed  # Sim seconds per wall second from here on; 0 while paused
+        self.effective_speed = clock.effective_speed
+        self.published_at = time.perf_counter()
+        self.profile = {}  # Simulation phase percentiles, while profiling
+
+
+class SimulationThread:
+    # Runs a GameState on its own thread at a fixed wall-clock rate, so render frame
+    # times and simulation ticks no longer hold each other up. After every tick the
+    # thread publishes a new StateSnapshot by swapping one reference: the front
+    # buffer the renderer reads, while the next is built behind it. Nothing is
+    # recycled, so a reader never needs a lock. The render thread reaches the
+    # simulation only through the command channel, call() and the speed and pause
+    # attributes.
+    def __init__(self, game_state, rate=SIM_THREAD_RATE):
+        self.game_state = game_state
+        self.interval = 1.0 / rate
+        self.clock = SimulationClock(budget=SUBSTEP_TIME_BUDGET * self.interval)
+        self.channel = CommandChannel()  # Clearances and spawn requests from the render thread
+        self.calls = queue.SimpleQueue()  # function(game_state), run on this thread between ticks
+        self.simulation_speed = 1.0
+        self.paused = False
+        self.snapshot = None  # Latest published StateSnapshot
+        self.ticks = 0
+        self.running = False
+        self.thread = None
+        self.error = None  # Exception that stopped the thread, raised again by view()
+        self.weather = None  # Copy of game_state.weather shared by snapshots until it changes
+        self.weather_source = None  # The wind grid that copy was taken alongside
+        self.storm = None  # Storm grid taken alongside it, for the scope
+        self.view_state = None  # Render-side GameState rebuilt from snapshots
+        self.views = {}  # aircraft_id -> Aircraft view reused across frames
+        self.viewed = None  # Snapshot view_state was last built from
+
+    def start(self):
+        self._publish()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def call(self, function):
+        # Run function(game_state) on the simulation thread before its next tick
+        self.calls.put(function)
+
+    def _run(self):
+        # An exception here would otherwise end the thread silently and leave the
+        # scope showing a frozen airspace
+        try:
+            self._loop()
+        except Exception as error:
+            self.error = error
+            self.running = False
+
+    def _loop(self):
+        game_state = self.game_state
+        last = next_tick = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            frame_time, last = now - last, now
+            while not self.calls.empty():
+                self.calls.get_nowait()(game_state)
+            self.channel.drain(game_state.commands)
+
+            if not self.paused:
+                self.clock.advance(game_state, frame_time, self.simulation_speed)
+                self._publish()
+            elif game_state.commands or self.snapshot.speed:
+                # Clearances given while paused show at once rather than on resume
+                if game_state.commands:
+                    with game_state.profiler.phase('commands'):
+                        game_state.commands.apply(game_state)
+                self._publish()
+            game_state.profiler.end_frame()
+            self.ticks += 1
+
+            # Fixed rate; after a long stall start afresh rather than tick in a burst
+            next_tick += self.interval
+            delay = next_tick - time.perf_counter()
+            if delay < -MAX_FRAME_TIME:
+                next_tick = time.perf_counter()
+            time.sleep(max(delay, 0))
+
+    def _publish(self):
+        game_state = self.game_state
+        if game_state.weather_field.wind is not self.weather_source:
+            self.weather = copy.deepcopy(game_state.weather)
+            self.weather_source = game_state.weather_field.wind
+            self.storm = game_state.weather_field.storm
+            self.storm.flags.writeable = False
+        snapshot = StateSnapshot(
+            game_state, self.weather, self.storm, self.clock, 0.0 if self.paused else self.simulation_speed
+        )
+        profiler = game_state.profiler
+        if profiler.enabled:
+            previous = self.snapshot
+            if previous is None or self.ticks % PROFILE_REFRESH == 0:
+                snapshot.profile = profiler.percentiles()
+            else:
+                snapshot.profile = previous.profile
+        self.snapshot = snapshot
+
+    def view(self):
+        # (GameState, alpha) for the renderer and InputHandler, from the latest
+        # snapshot. Render thread only: commands issued on the view reach the
+        # simulation through the channel, and selection stays on the view.
+        if self.error is not None:
+            raise RuntimeError("simulation thread failed") from self.error
+        snapshot = self.snapshot
+        if self.view_state is None:
+            self.view_state = GameState(self.game_state.active_airport.icao)
+            self.view_state.commands = self.channel
+        view_state = self.view_state
+        if snapshot is not self.viewed:
+            self.viewed = snapshot
+            columns = snapshot.columns
+            ids = columns['aircraft_id'].tolist()
+            members = [
+                self._view(aircraft_id, callsign, aircraft_type)
+                for aircraft_id, callsign, aircraft_type in zip(ids, snapshot.callsigns, snapshot.aircraft_types)
+            ]
+            view_state.fleet.assign(members, **columns)
+            view_state.aircraft = {aircraft.callsign: aircraft for aircraft in members}
+            self.views = dict(zip(ids, members))
+            view_state.conflicts = snapshot.conflicts
+            view_state.predicted_conflicts = snapshot.predicted_conflicts
+            view_state.weather = snapshot.weather
+            view_state.weather_field.storm = snapshot.storm
+            view_state.time = snapshot.time
+            view_state.score = snapshot.score
+            if view_state.selected_aircraft not in view_state.aircraft:
+                view_state.selected_aircraft = None
+
+        # Interpolate on past the snapshot by the wall time since it was taken
+        elapsed = (time.perf_counter() - snapshot.published_at) * snapshot.speed
+        alpha = min((snapshot.accumulator + elapsed) / self.clock.physics_dt, 1.0)
+        return view_state, alpha
+
+    def _view(self, aircraft_id, callsign, aircraft_type):
+        view = self.views.get(aircraft_id)
+        if view is None:
+            view = Aircraft(callsign, aircraft_type, (0, 0), 0, 0)
+        return view
@@ -0,0 +1,29 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class SpatialIndex:
+    # k-d tree over the fleet's horizontal positions, rebuilt on the first query after
+    # the fleet changes (at most once per tick) and shared by every spatial lookup
+    def __init__(self, fleet):
+        self.fleet = fleet
+        self.tree = None
+        self.version = None  # Fleet version the tree was built from
+
+    def _get_tree(self):
+        if self.tree is None or self.version != self.fleet.version:
+            self.tree = cKDTree(self.fleet.active('position'))
+            self.version = self.fleet.version
+        return self.tree
+
+    def nearest(self, point, max_distance=np.inf):
+        # Closest aircraft within max_distance nm of point, or None
+        distance, row = self._get_tree().query(point, distance_upper_bound=max_distance)
+        if row >= self.fleet.count:
+            return None
+        return self.fleet.members[row]
+
+    def within_radius(self, point, radius):
+        rows = self._get_tree().query_ball_point(point, radius)
+        members = self.fleet.members
+        return [members[row] for row in sorted(rows)]
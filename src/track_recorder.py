@@ -0,0 +1,311 @@
+import json
+import os
+import pickle
+import numpy as np
+from config import REPLAY_KEYFRAME_INTERVAL
+
+# One fixed-size record per aircraft per tick (27 bytes, unaligned)
+SAMPLE_DTYPE = np.dtype([
+    ('aircraft_id', '<u4'),
+    ('x', '<f4'),  # nautical miles
+    ('y', '<f4'),
+    ('altitude', '<f4'),  # feet
+    ('heading', '<u2'),  # centidegrees
+    ('speed', '<u2'),  # tenths of a knot
+    ('target_altitude', '<u2'),  # tens of feet
+    ('target_heading', '<u2'),  # centidegrees
+    ('target_speed', '<u2'),  # tenths of a knot
+    ('flags', 'u1')
+])
+
+# One record per tick locating its samples and conflict pairs
+TICK_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('score', '<f8'),
+    ('sample_offset', '<u8'),
+    ('sample_count', '<u4'),
+    ('conflict_offset', '<u8'),
+    ('conflict_count', '<u4')
+])
+
+CONFLICT_DTYPE = np.dtype([('first', '<u4'), ('second', '<u4')])
+
+# Locates one pickled GameState snapshot in the keyframe file
+KEYFRAME_DTYPE = np.dtype([
+    ('time', '<f8'),
+    ('tick', '<u8'),
+    ('offset', '<u8'),
+    ('length', '<u8')
+])
+
+FLAG_CLEARED_FOR_APPROACH = 1
+FLAG_HOLDING_PATTERN = 2
+
+FORMAT_VERSION = 2
+SAMPLES_FILE = 'samples.bin'
+TICKS_FILE = 'ticks.bin'
+CONFLICTS_FILE = 'conflicts.bin'
+KEYFRAMES_FILE = 'keyframes.bin'
+KEYFRAME_INDEX_FILE = 'keyframe_index.bin'
+META_FILE = 'meta.json'
+
+
+def encode_samples(fleet, samples):
+    # Quantize the live fleet into SAMPLE_DTYPE records, one per row
+    samples['aircraft_id'] = fleet.active('aircraft_id')
+    positions = fleet.active('position')
+    samples['x'] = positions[:, 0]
+    samples['y'] = positions[:, 1]
+    samples['altitude'] = fleet.active('altitude')
+    samples['heading'] = np.rint(fleet.active('heading') * 100)
+    samples['speed'] = np.rint(fleet.active('speed') * 10)
+    samples['target_altitude'] = np.rint(fleet.active('target_altitude') / 10)
+    samples['target_heading'] = np.rint(fleet.active('target_heading') * 100)
+    samples['target_speed'] = np.rint(fleet.active('target_speed') * 10)
+    samples['flags'] = (
+        fleet.active('cleared_for_approach') * FLAG_CLEARED_FOR_APPROACH |
+        fleet.active('holding_pattern') * FLAG_HOLDING_PATTERN
+    )
+    return samples
+
+
+def sample_columns(samples):
+    # Inverse of encode_samples, as keyword columns for AircraftFleet.assign
+    positions = np.column_stack((samples['x'], samples['y']))
+    return {
+        'position': positions,
+        'previous_position': positions,
+        'altitude': samples['altitude'],
+        'heading': samples['heading'] / 100,
+        'speed': samples['speed'] / 10,
+        'target_altitude': samples['target_altitude'] * 10.0,
+        'target_heading': samples['target_heading'] / 100,
+        'target_speed': samples['target_speed'] / 10,
+        'cleared_for_approach': (samples['flags'] & FLAG_CLEARED_FOR_APPROACH) != 0,
+        'holding_pattern': (samples['flags'] & FLAG_HOLDING_PATTERN) != 0,
+        'aircraft_id': samples['aircraft_id']
+    }
+
+
+class MappedArray:
+    # Append-only structured array backed by a memory-mapped file that doubles its
+    # size when full and is trimmed to the used length on close
+    def __init__(self, path, dtype, initial_capacity=1024):
+        self.path = path
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self.capacity = 0
+        self.mapping = None
+        self.data = None
+        open(path, 'wb').close()
+        self._resize(initial_capacity)
+
+    def _resize(self, capacity):
+        if self.data is not None:
+            self.mapping.flush()
+            self.mapping = self.data = None
+        with open(self.path, 'r+b') as stream:
+            stream.truncate(capacity * self.dtype.itemsize)
+        self.capacity = capacity
+        self.mapping = np.memmap(self.path, dtype=self.dtype, mode='r+', shape=(capacity,))
+        self.data = self.mapping.view(np.ndarray)  # Plain view skips memmap per-op overhead
+
+    def reserve(self, count):
+        # Slot view for the next count records; call commit(count) after filling it
+        needed = self.length + count
+        if needed > self.capacity:
+            self._resize(max(needed, self.capacity * 2))
+        return self.data[self.length:needed]
+
+    def commit(self, count):
+        self.length += count
+
+    def append(self, records):
+        self.reserve(len(records))[:] = records
+        self.commit(len(records))
+
+    def close(self):
+        if self.data is None:
+            return
+        self.mapping.flush()
+        self.mapping = self.data = None
+        with open(self.path, 'r+b') as stream:
+            stream.truncate(self.length * self.dtype.itemsize)
+
+
+class TrackRecorder:
+    # Appends each tick's fleet state and conflict set to a recording directory, plus
+    # a full GameState snapshot every keyframe_interval simulated seconds
+    def __init__(self, path, airport_icao=None, keyframe_interval=REPLAY_KEYFRAME_INTERVAL):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.airport_icao = airport_icao
+        self.samples = MappedArray(os.path.join(path, SAMPLES_FILE), SAMPLE_DTYPE, 1 << 16)
+        self.ticks = MappedArray(os.path.join(path, TICKS_FILE), TICK_DTYPE, 1 << 12)
+        self.conflicts = MappedArray(os.path.join(path, CONFLICTS_FILE), CONFLICT_DTYPE, 1 << 10)
+        self.keyframe_index = MappedArray(os.path.join(path, KEYFRAME_INDEX_FILE), KEYFRAME_DTYPE, 64)
+        self.keyframes = open(os.path.join(path, KEYFRAMES_FILE), 'wb')
+        self.keyframe_interval = keyframe_interval
+        self.next_keyframe_time = None
+        self.aircraft_info = {}  # aircraft_id -> {'callsign', 'aircraft_type'}
+        self.last_seen_id = 0
+
+    def record(self, game_state):
+        fleet = game_state.fleet
+        count = fleet.count
+        ids = fleet.active('aircraft_id')
+
+        # Aircraft ids only grow, so new arrivals are the ids past the last one seen
+        if count and ids.max() > self.last_seen_id:
+            for row in np.flatnonzero(ids > self.last_seen_id):
+                aircraft = fleet.members[row]
+                self.aircraft_info[int(ids[row])] = {
+                    'callsign': aircraft.callsign,
+                    'aircraft_type': aircraft.aircraft_type
+                }
+            self.last_seen_id = int(ids.max())
+
+        encode_samples(fleet, self.samples.reserve(count))
+        sample_offset = self.samples.length
+        self.samples.commit(count)
+
+        conflict_offset = self.conflicts.length
+        pairs = [
+            (game_state.aircraft[first].aircraft_id, game_state.aircraft[second].aircraft_id)
+            for first, second in game_state.conflicts
+            if first in game_state.aircraft and second in game_state.aircraft
+        ]
+        if pairs:
+            self.conflicts.append(np.array(pairs, dtype=np.uint32).view(CONFLICT_DTYPE).ravel())
+
+        self.ticks.reserve(1)[0] = (
+            game_state.time, game_state.score, sample_offset, count, conflict_offset, len(pairs)
+        )
+        self.ticks.commit(1)
+
+        if self.next_keyframe_time is None or game_state.time >= self.next_keyframe_time:
+            self._write_keyframe(game_state)
+
+    def _write_keyframe(self, game_state):
+        offset = self.keyframes.tell()
+        pickle.dump(game_state.snapshot(), self.keyframes, protocol=pickle.HIGHEST_PROTOCOL)
+        self.keyframe_index.append(np.array(
+            [(game_state.time, self.ticks.length - 1, offset, self.keyframes.tell() - offset)],
+            dtype=KEYFRAME_DTYPE
+        ))
+        self.next_keyframe_time = game_state.time + self.keyframe_interval
+        self._write_meta()
+
+    def _write_meta(self, complete=False):
+        # Replace meta.json atomically so a crash leaves the last keyframe's copy intact
+        for array in (self.samples, self.ticks, self.conflicts, self.keyframe_index):
+            if array.mapping is not None:
+                array.mapping.flush()
+        self.keyframes.flush()
+        meta = {
+            'version': FORMAT_VERSION,
+            'airport': self.airport_icao,
+            'complete': complete,
+            'ticks': self.ticks.length,
+            'samples': self.samples.length,
+            'conflicts': self.conflicts.length,
+            'keyframes': self.keyframe_index.length,
+            'keyframe_interval': self.keyframe_interval,
+            'aircraft': {str(aircraft_id): info for aircraft_id, info in self.aircraft_info.items()}
+        }
+        meta_path = os.path.join(self.path, META_FILE)
+        temp_path = meta_path + '.tmp'
+        with open(temp_path, 'w') as stream:
+            json.dump(meta, stream)
+        os.replace(temp_path, meta_path)
+
+    def close(self):
+        if self.keyframes.closed:
+            return
+        self._write_meta(complete=True)
+        for array in (self.samples, self.ticks, self.conflicts, self.keyframe_index):
+            array.close()
+        self.keyframes.close()
+
+
+class TrackRecording:
+    # Read-only, memory-mapped view of a recording directory
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as stream:
+            self.meta = json.load(stream)
+        self.aircraft_info = {int(key): value for key, value in self.meta['aircraft'].items()}
+        lengths = self.meta
+        if not self.meta.get('complete', True):
+            lengths = self._recover_lengths()
+        self.ticks = self._load(TICKS_FILE, TICK_DTYPE, lengths['ticks'])
+        self.samples = self._load(SAMPLES_FILE, SAMPLE_DTYPE, lengths['samples'])
+        self.conflicts = self._load(CONFLICTS_FILE, CONFLICT_DTYPE, lengths['conflicts'])
+        self.keyframe_index = self._load(KEYFRAME_INDEX_FILE, KEYFRAME_DTYPE, lengths['keyframes'])
+
+    def _capacity(self, name, dtype):
+        return os.path.getsize(os.path.join(self.path, name)) // dtype.itemsize
+
+    def _recover_lengths(self):
+        # The recorder stopped without closing, so meta.json is from the last keyframe.
+        # Ticks written since then are the ones that chain on from it in time and offsets;
+        # past them the files hold zeroed preallocated space.
+        meta = self.meta
+        ticks = np.memmap(os.path.join(self.path, TICKS_FILE), dtype=TICK_DTYPE, mode='r')
+        sample_capacity = self._capacity(SAMPLES_FILE, SAMPLE_DTYPE)
+        conflict_capacity = self._capacity(CONFLICTS_FILE, CONFLICT_DTYPE)
+        tick_count = meta['ticks']
+        while tick_count < len(ticks):
+            entry = ticks[tick_count]
+            if tick_count:
+                previous = ticks[tick_count - 1]
+                if (entry['time'] <= previous['time'] or
+                        entry['sample_offset'] != previous['sample_offset'] + previous['sample_count'] or
+                        entry['conflict_offset'] != previous['conflict_offset'] + previous['conflict_count']):
+                    break
+            elif entry['time'] <= 0 or entry['sample_offset'] or entry['conflict_offset']:
+                break
+            if (entry['sample_offset'] + entry['sample_count'] > sample_capacity or
+                    entry['conflict_offset'] + entry['conflict_count'] > conflict_capacity):
+                break
+            tick_count += 1
+
+        lengths = dict(meta, ticks=tick_count, samples=0, conflicts=0)
+        if tick_count:
+            last = ticks[tick_count - 1]
+            lengths['samples'] = int(last['sample_offset'] + last['sample_count'])
+            lengths['conflicts'] = int(last['conflict_offset'] + last['conflict_count'])
+        del ticks
+        return lengths
+
+    def _load(self, name, dtype, length):
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode='r', shape=(length,))
+
+    def __len__(self):
+        return len(self.ticks)
+
+    def tick_samples(self, tick):
+        entry = self.ticks[tick]
+        start = int(entry['sample_offset'])
+        return self.samples[start:start + int(entry['sample_count'])]
+
+    def tick_conflicts(self, tick):
+        entry = self.ticks[tick]
+        start = int(entry['conflict_offset'])
+        return self.conflicts[start:start + int(entry['conflict_count'])]
+
+    def tick_at_time(self, sim_time):
+        # Last tick recorded at or before sim_time
+        return max(int(np.searchsorted(self.ticks['time'], sim_time, side='right')) - 1, 0)
+
+    def keyframe_for_tick(self, tick):
+        # Index of the last keyframe taken at or before tick
+        return max(int(np.searchsorted(self.keyframe_index['tick'], tick, side='right')) - 1, 0)
+
+    def load_keyframe(self, index):
+        entry = self.keyframe_index[index]
+        with open(os.path.join(self.path, KEYFRAMES_FILE), 'rb') as stream:
+            stream.seek(int(entry['offset']))
+            return pickle.loads(stream.read(int(entry['length'])))
@@ -0,0 +1,135 @@
+import csv
+import itertools
+import json
+import os
+from config import CRUISE_SPEED, SCHEDULE_LOOKAHEAD
+
+# Schedule columns: time (seconds or HH:MM[:SS]), callsign, aircraft_type, entry
+# (N/S/E/W or a waypoint name), altitude (feet), destination (waypoint name, optional)
+# and speed (knots, optional). Rows must be in time order.
+REQUIRED_FIELDS = ('time', 'callsign', 'aircraft_type', 'entry', 'altitude')
+
+
+def parse_time(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if ':' in value:
+        seconds = 0.0
+        for part in value.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds
+    return float(value)
+
+
+def parse_flight(record, line_number):
+    missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"line {line_number}: missing {', '.join(missing)}")
+    if record['aircraft_type'] not in CRUISE_SPEED:
+        raise ValueError(f"line {line_number}: unknown aircraft type {record['aircraft_type']}")
+    speed = record.get('speed')
+    return {
+        'time': parse_time(record['time']),
+        'callsign': str(record['callsign']),
+        'aircraft_type': record['aircraft_type'],
+        'entry': str(record['entry']),
+        'altitude': float(record['altitude']),
+        'destination': record.get('destination') or None,
+        'speed': float(speed) if speed not in (None, '') else None
+    }
+
+
+def read_schedule(path):
+    # Lazily yield flights from a .csv or .jsonl schedule, one line at a time
+    with open(path, newline='') as stream:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(stream)
+            for record in reader:
+                yield parse_flight(record, reader.line_num)
+        else:
+            for line_number, line in enumerate(stream, 1):
+                if line.strip():
+                    yield parse_flight(json.loads(line), line_number)
+
+
+class ScheduleFeeder:
+    # Moves flights from a (streamed) schedule into GameState's event queue, holding
+    # only those due within the lookahead window so memory stays flat for any length.
+    # With a path, its read position goes into GameState snapshots and is picked up
+    # again on restore.
+    def __init__(self, game_state, flights, lookahead=SCHEDULE_LOOKAHEAD, path=None, refill=True):
+        self.game_state = game_state
+        self.flights = iter(flights)
+        self.lookahead = lookahead
+        self.path = path
+        self.flights_read = 0  # Flights taken from the schedule, next_flight included
+        self.next_flight = None  # First flight read but beyond the window
+        self.flights_queued = 0
+        self.exhausted = False
+        game_state.schedule = self
+        game_state.event_handlers['schedule_refill'] = self._handle_refill
+        if refill:
+            self._refill()
+
+    def snapshot(self):
+        return {
+            'path': self.path,
+            'lookahead': self.lookahead,
+            'flights_read': self.flights_read,
+            'next_flight': self.next_flight,
+            'flights_queued': self.flights_queued,
+            'exhausted': self.exhausted
+        }
+
+    @classmethod
+    def restore(cls, game_state, state):
+        # Reopen the schedule after the flights already read; the pending refill is
+        # among the restored events. None when the file is no longer there.
+        path = state['path']
+        if path is None or not os.path.exists(path):
+            return None
+        flights = itertools.islice(read_schedule(path), state['flights_read'], None)
+        feeder = cls(game_state, flights, state['lookahead'], path, refill=False)
+        feeder.flights_read = state['flights_read']
+        feeder.next_flight = state['next_flight']
+        feeder.flights_queued = state['flights_queued']
+        feeder.exhausted = state['exhausted']
+        return feeder
+
+    def _handle_refill(self, payload):
+        self._refill()
+
+    def _refill(self):
+        game_state = self.game_state
+        horizon = game_state.time + self.lookahead
+        while True:
+            if self.next_flight is None:
+                self.next_flight = next(self.flights, None)
+                if self.next_flight is None:
+                    self.exhausted = True
+                    return
+                self.flights_read += 1
+            if self.next_flight['time'] > horizon:
+                break
+            game_state.schedule_event(self.next_flight['time'], 'scheduled_flight', self.next_flight)
+            self.flights_queued += 1
+            self.next_flight = None
+
+        # Come back halfway through the window, or when a quiet gap ends
+        game_state.schedule_event(
+            max(game_state.time + self.lookahead / 2, self.next_flight['time'] - self.lookahead),
+            'schedule_refill'
+        )
+
+
+def load_schedule(game_state, path, lookahead=SCHEDULE_LOOKAHEAD):
+    # Replace random spawns with the flights in a schedule file. The clock jumps
+    # ahead to the first flight, so a schedule starting at 06:00 starts at once.
+    game_state.spawn_interval = float('inf')
+    path = os.path.abspath(path)
+    flights = read_schedule(path)
+    first = next(flights, None)
+    if first is not None:
+        game_state.time = max(game_state.time, first['time'])
+        flights = itertools.chain([first], flights)
+    return ScheduleFeeder(game_state, flights, lookahead, path)
@@ -0,0 +1,186 @@
+import numpy as np
+from config import (
+    RADAR_RANGE, WIND_EFFECT_MULTIPLIER, STORM_RADIUS, WEATHER_GRID_SIZE,
+    WIND_VARIATION, MAX_STORMS, STORM_SPAWN_CHANCE, STORM_LIFETIME, STORM_GUST
+)
+
+WEATHER_GRID_EXTENT = RADAR_RANGE * 1.2  # Out to where aircraft are removed
+WIND_VARIATION_MODES = 3  # Sinusoids summed into the spatial wind variation
+
+
+def mean_wind(weather):
+    # (east, north) knots the air is moving toward; wind_direction is where it blows from
+    direction = np.radians(weather['wind_direction'])
+    return -weather['wind_speed'] * np.array([np.sin(direction), np.cos(direction)])
+
+
+def initialize_weather(rng):
+    weather = {
+        'wind_direction': rng.uniform(0, 360),
+        'wind_speed': rng.uniform(0, 30),
+        'storms': [],  # List of storm centers and radii
+    }
+    # Smooth spatial variation: (wavenumber x, wavenumber y, phase, east amp, north amp)
+    weather['variation'] = [
+        (
+            rng.uniform(-2, 2) * float(np.pi) / WEATHER_GRID_EXTENT,
+            rng.uniform(-2, 2) * float(np.pi) / WEATHER_GRID_EXTENT,
+            rng.uniform(0, 2 * np.pi),
+            rng.gauss(0, 1) / WIND_VARIATION_MODES,
+            rng.gauss(0, 1) / WIND_VARIATION_MODES
+        )
+        for _ in range(WIND_VARIATION_MODES)
+    ]
+    return weather
+
+
+def evolve_storms(weather, rng, dt):
+    # Cells drift with the mean wind, grow then decay over their lifetime, and new
+    # ones pop up at random while there is room
+    drift = mean_wind(weather) * dt / 3600
+    storms = []
+    for storm in weather['storms']:
+        storm['age'] += dt
+        if storm['age'] < storm['lifetime']:
+            storm['position'] = [
+                float(storm['position'][0] + drift[0]), float(storm['position'][1] + drift[1])
+            ]
+            storm['intensity'] = float(storm['peak'] * np.sin(np.pi * storm['age'] / storm['lifetime']))
+            storms.append(storm)
+    if len(storms) < MAX_STORMS and rng.random() < STORM_SPAWN_CHANCE:
+        bearing = rng.uniform(0, 2 * np.pi)
+        distance = RADAR_RANGE * np.sqrt(rng.random())
+        storms.append({
+            'position': [float(distance * np.sin(bearing)), float(distance * np.cos(bearing))],
+            'radius': STORM_RADIUS * rng.uniform(0.5, 1.5),
+            'peak': rng.uniform(0.5, 1.0),
+            'intensity': 0.0,
+            'age': 0.0,
+            'lifetime': rng.uniform(*STORM_LIFETIME)
+        })
+    weather['storms'] = storms
+
+
+class WeatherField:
+    # Wind sampled from a regular grid: the mean wind, a smooth spatial variation and
+    # the gust outflow of each storm cell. Rebuilding the grid costs the same however
+    # many aircraft there are; sampling is one bilinear gather for the whole fleet.
+    def __init__(self, size=WEATHER_GRID_SIZE, extent=WEATHER_GRID_EXTENT):
+        self.size = size
+        self.extent = extent
+        self.spacing = 2 * extent / (size - 1)
+        axis = np.linspace(-extent, extent, size)
+        self.grid_x, self.grid_y = np.meshgrid(axis, axis, indexing='ij')
+        self.wind = np.zeros((size, size, 2))  # Effective ground-track wind, knots
+        self.storm = np.zeros((size, size))  # Convective intensity, 0..1
+
+    def rebuild(self, weather):
+        WeatherField.rebuild_lanes([self], [weather])
+
+    @staticmethod
+    def rebuild_lanes(fields, weathers):
+        # rebuild for several fields of the same size at once, each from its own
+        # weather, as one array pass with a leading lane axis
+        first = fields[0]
+        axis = first.grid_x[:, 0]
+        lanes = len(fields)
+        base = np.array([mean_wind(weather) for weather in weathers])
+
+        # Every term is an outer product of an x factor and a y factor, summed with
+        # one matrix product per wind component. sin(kx * x + ky * y + phase) splits
+        # by the angle sum formula into two such terms.
+        variation = np.array([weather['variation'] for weather in weathers])
+        amplitude = np.array([weather['wind_speed'] for weather in weathers]) * WIND_VARIATION
+        kx, ky, phase, east, north = np.moveaxis(variation, 2, 0)
+        across = kx[..., None] * axis + phase[..., None]
+        along = ky[..., None] * axis
+        factors_x = [np.sin(across), np.cos(across)]
+        factors_y = [np.cos(along), np.sin(along)]
+        weights_east = [(amplitude[:, None] * east)[..., None]] * 2
+        weights_north = [(amplitude[:, None] * north)[..., None]] * 2
+
+        # Storm cells, padded to the most any lane has with zero-intensity cells. The
+        # Gaussian core exp(-(d / r)^2) splits into x and y factors, and the radial
+        # outflow gust * dx / d, with gust = STORM_GUST * core * d / r, peaking one
+        # radius out from the core, comes to STORM_GUST * core * dx / r
+        cells = max(len(weather['storms']) for weather in weathers)
+        storm = np.zeros((lanes,) + first.storm.shape)
+        if cells:
+            centre = np.zeros((lanes, cells, 2))
+            radius = np.ones((lanes, cells, 1))
+            intensity = np.zeros((lanes, cells, 1))
+            for lane, weather in enumerate(weathers):
+                for index, cell in enumerate(weather['storms']):
+                    centre[lane, index] = cell['position']
+                    radius[lane, index] = cell['radius']
+                    intensity[lane, index] = cell['intensity']
+            dx = axis - centre[..., 0, None]
+            dy = axis - centre[..., 1, None]
+            core_x = intensity * np.exp(-(dx / radius) ** 2)
+            core_y = np.exp(-(dy / radius) ** 2)
+            for index in range(cells):
+                np.maximum(storm, core_x[:, index, :, None] * core_y[:, index, None, :], out=storm)
+            gust_x = core_x * (STORM_GUST / radius)
+            factors_x += [gust_x * dx, gust_x]
+            factors_y += [core_y, core_y * dy]
+            weights_east += [np.ones((lanes, cells, 1)), np.zeros((lanes, cells, 1))]
+            weights_north += [np.zeros((lanes, cells, 1)), np.ones((lanes, cells, 1))]
+
+        factors_x = np.concatenate(factors_x, axis=1)
+        factors_y = np.concatenate(factors_y, axis=1)
+        wind = np.stack([
+            base[:, component, None, None] + np.matmul(
+                (factors_x * np.concatenate(weights, axis=1)).transpose(0, 2, 1), factors_y
+            )
+            for component, weights in enumerate([weights_east, weights_north])
+        ], axis=-1) * WIND_EFFECT_MULTIPLIER
+
+        # Ceiling on the wind anywhere until the next rebuild, should every storm slot
+        # fill at full gust; conflict tracking derives its closure speeds from it
+        max_wind = np.sqrt((wind[..., 0] ** 2 + wind[..., 1] ** 2).max(axis=(1, 2))) + (
+            MAX_STORMS * STORM_GUST * WIND_EFFECT_MULTIPLIER
+        )
+        for lane, field in enumerate(fields):
+            field.wind = wind[lane]
+            field.storm = storm[lane]
+            field.max_wind = float(max_wind[lane])
+
+    def _weights(self, positions):
+        # Lower-left grid indices and bilinear weights for each position
+        fraction = np.clip((positions + self.extent) / self.spacing, 0, self.size - 1 - 1e-9)
+        index = fraction.astype(np.intp)
+        return index[..., 0], index[..., 1], fraction - index
+
+    def sample_wind(self, positions):
+        i, j, weight = self._weights(positions)
+        wx = weight[..., 0:1]
+        wy = weight[..., 1:2]
+        grid = self.wind
+        return (
+            grid[i, j] * (1 - wx) * (1 - wy) + grid[i + 1, j] * wx * (1 - wy) +
+            grid[i, j + 1] * (1 - wx) * wy + grid[i + 1, j + 1] * wx * wy
+        )
+
+    def sample_wind_lanes(self, grids, positions):
+        # sample_wind for several fields of this size at once: grids stacks their wind
+        # arrays (lanes, size, size, 2) and positions is (lanes, rows, 2)
+        i, j, weight = self._weights(positions)
+        wx = weight[..., 0:1]
+        wy = weight[..., 1:2]
+        # Gather the four corners by flat cell index, one take each
+        size = self.size
+        cell = (np.arange(len(grids))[:, None] * size + i) * size + j
+        flat = grids.reshape(-1, 2)
+        return (
+            flat.take(cell, axis=0) * (1 - wx) * (1 - wy) + flat.take(cell + size, axis=0) * wx * (1 - wy) +
+            flat.take(cell + 1, axis=0) * (1 - wx) * wy + flat.take(cell + size + 1, axis=0) * wx * wy
+        )
+
+    def sample_storm(self, positions):
+        i, j, weight = self._weights(positions)
+        wx, wy = weight[:, 0], weight[:, 1]
+        grid = self.storm
+        return (
+            grid[i, j] * (1 - wx) * (1 - wy) + grid[i + 1, j] * wx * (1 - wy) +
+            grid[i, j + 1] * (1 - wx) * wy + grid[i + 1, j + 1] * wx * wy
+        )
@@ -0,0 +1,32 @@
+import os
+import shutil
+from airport_data import AirportDatabase, compile_airport_cache
+from config import AIRPORT_DATA_DIR
+
+
+def copy_data(tmp_path):
+    data_dir = str(tmp_path / 'airports')
+    shutil.copytree(AIRPORT_DATA_DIR, data_dir)
+    return data_dir
+
+
+def test_cache_is_replaced_without_leftovers(tmp_path):
+    data_dir = copy_data(tmp_path)
+    cache_path = str(tmp_path / 'airports.cache')
+    with open(cache_path, 'wb') as stream:
+        stream.write(b'truncated')
+    database = AirportDatabase(data_dir, cache_path)
+    assert database.cache_path == cache_path
+    assert sorted(os.listdir(tmp_path)) == ['airports', 'airports.cache']
+    assert database['KRST'].icao == 'KRST'
+    assert AirportDatabase(data_dir, cache_path).index == database.index
+
+
+def test_unwritable_cache_falls_back_to_data_files(tmp_path):
+    data_dir = copy_data(tmp_path)
+    cache_path = str(tmp_path / 'missing' / 'airports.cache')
+    assert compile_airport_cache(data_dir, cache_path) is None
+    assert not os.path.exists(os.path.dirname(cache_path))
+    database = AirportDatabase(data_dir, cache_path)
+    assert database.cache_path is None
+    assert database['KRST'].icao == 'KRST'
@@ -0,0 +1,49 @@
+import numpy as np
+from atc_env import ATCEnv, VectorATCEnv
+from profiler import FrameProfiler
+
+OPTIONS = {'episode_length': 60, 'spawn_interval': 5, 'step_dt': 1.0}
+
+
+def random_actions(rng, shape, rate=0.05):
+    actions = np.full(shape, np.nan)
+    pick = rng.random(shape[:2]) < rate
+    actions[..., 0][pick] = rng.uniform(0, 360, pick.sum())
+    pick = rng.random(shape[:2]) < rate
+    actions[..., 1][pick] = rng.uniform(2000, 30000, pick.sum())
+    return actions
+
+
+def test_vector_env_matches_independent_envs():
+    count = 4
+    envs = VectorATCEnv(count, seed=3, **OPTIONS)
+    singles = [
+        ATCEnv('KRST', seed=int(seed.generate_state(1)[0]), **OPTIONS)
+        for seed in np.random.SeedSequence(3).spawn(count)
+    ]
+    observations, _ = envs.reset()
+    assert np.array_equal(observations, np.stack([env.reset()[0] for env in singles]))
+
+    rng = np.random.default_rng(0)
+    for _ in range(150):  # Past two episode ends, so the automatic resets are covered
+        actions = random_actions(rng, envs.action_shape)
+        observations, rewards, _, truncated, infos = envs.step(actions)
+        for index, env in enumerate(singles):
+            observation, reward, _, done, _ = env.step(actions[index])
+            assert reward == rewards[index]
+            assert done == truncated[index]
+            if done:
+                assert np.array_equal(observation, infos['final_observation'][index])
+                observation, _ = env.reset()
+            assert np.array_equal(observation, observations[index])
+    assert envs.aircraft.sum() > 0
+
+
+def test_vector_env_times_the_step_phases():
+    profiler = FrameProfiler()
+    profiler.enabled = True
+    envs = VectorATCEnv(2, seed=1, profiler=profiler, **OPTIONS)
+    envs.reset()
+    for _ in range(10):
+        envs.step()
+    assert {'navigation', 'weather', 'kinematics', 'conflicts', 'score'} <= set(profiler.percentiles())
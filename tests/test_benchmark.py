@@ -0,0 +1,23 @@
+from benchmark import compare, measure
+
+
+def result(ms, mean_ms, p99_ms):
+    return {'ms': ms, 'mean_ms': mean_ms, 'p99_ms': p99_ms, 'per_second': 1000 / mean_ms, 'samples': 100}
+
+
+def test_measure_counts_occasional_slow_calls():
+    calls = []
+
+    def tick():
+        calls.append(None)
+        if len(calls) % 10 == 0:
+            sum(range(200000))
+    stats = measure(tick, min_repeats=100, min_duration=0)
+    assert stats['samples'] == 100
+    assert stats['p99_ms'] > stats['mean_ms'] > stats['ms']
+
+
+def test_compare_flags_each_statistic():
+    baseline = {'results': {'update': result(1.0, 2.0, 10.0), 'old': {'ms': 1.0, 'per_second': 1000}}}
+    current = {'results': {'update': result(1.0, 3.0, 10.0), 'old': result(1.1, 50.0, 90.0)}}
+    assert compare(current, baseline, 0.25) == [('update', 'mean_ms', 2.0, 3.0)]
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from game_state import GameState
+from commands import BAD_VALUE, UNKNOWN_AIRCRAFT, UNKNOWN_WAYPOINT
+
+
+@pytest.fixture
+def game_state():
+    game_state = GameState('KRST', seed=1)
+    game_state.request_spawn()
+    game_state.request_spawn()
+    game_state.step(0.1)
+    return game_state
+
+
+def test_numeric_strings_are_coerced(game_state):
+    callsign = next(iter(game_state.aircraft))
+    batch = game_state.issue_commands('heading', [callsign], ['270'])
+    game_state.step(0.1)
+    assert batch.accepted.tolist() == [True]
+    assert game_state.aircraft[callsign].target_heading == 270
+
+
+@pytest.mark.parametrize('kind', ['heading', 'altitude', 'speed'])
+@pytest.mark.parametrize('value', ['abc', None, {'a': 1}, True, np.nan, np.inf])
+def test_malformed_numbers_are_rejected(game_state, kind, value):
+    callsign = next(iter(game_state.aircraft))
+    aircraft = game_state.aircraft[callsign]
+    # Guidance keeps steering a routed aircraft, so a refused heading leaves it navigating
+    before = (aircraft.navigating, aircraft.target_altitude, aircraft.target_speed)
+    batch = game_state.issue_commands(kind, [callsign], [value])
+    game_state.step(0.1)
+    assert batch.accepted.tolist() == [False]
+    assert batch.reasons == [(0, BAD_VALUE)]
+    assert (aircraft.navigating, aircraft.target_altitude, aircraft.target_speed) == before
+
+
+@pytest.mark.parametrize('kind', ['hold', 'approach'])
+@pytest.mark.parametrize('value', ['false', 'true', 1, 0, None])
+def test_flags_must_be_booleans(game_state, kind, value):
+    callsign = next(iter(game_state.aircraft))
+    batch = game_state.issue_commands(kind, [callsign], [value])
+    game_state.step(0.1)
+    assert batch.reasons == [(0, BAD_VALUE)]
+    aircraft = game_state.aircraft[callsign]
+    assert not aircraft.holding_pattern and not aircraft.cleared_for_approach
+
+
+def test_flags_accept_booleans(game_state):
+    callsign = next(iter(game_state.aircraft))
+    batch = game_state.issue_commands('hold', [callsign], [True])
+    game_state.step(0.1)
+    assert batch.accepted.tolist() == [True]
+    assert game_state.aircraft[callsign].holding_pattern
+
+
+@pytest.mark.parametrize('value', [[1, 2], {'a': 1}, 7, None])
+def test_direct_needs_a_waypoint_name(game_state, value):
+    callsigns = list(game_state.aircraft)
+    waypoint = next(iter(game_state.waypoints))
+    batch = game_state.issue_commands('direct', callsigns, np.array([value, waypoint], dtype=object))
+    game_state.step(0.1)
+    assert batch.accepted.tolist() == [False, True]
+    assert batch.reasons == [(0, BAD_VALUE)]
+
+
+def test_unknown_waypoint_and_aircraft(game_state):
+    callsign = next(iter(game_state.aircraft))
+    batch = game_state.issue_commands('direct', [callsign, 'NOPE', {'x': 1}], ['XXX', 'XXX', 'XXX'])
+    game_state.step(0.1)
+    assert batch.reasons == [(0, UNKNOWN_WAYPOINT), (1, UNKNOWN_AIRCRAFT), (2, UNKNOWN_AIRCRAFT)]
+
+
+@pytest.mark.parametrize('kind', ['heading', 'direct', 'hold'])
+def test_nested_values_raise(game_state, kind):
+    callsign = next(iter(game_state.aircraft))
+    with pytest.raises(ValueError):
+        game_state.issue_commands(kind, [callsign], [[1, 2]])
+    with pytest.raises(ValueError):
+        game_state.issue_commands(kind, [[callsign]], [1])
+
+
+def test_valid_batch_matches_setters(game_state):
+    ids = game_state.fleet.active('aircraft_id').copy()
+    batch = game_state.issue_commands('speed', ids, [50, 1000])
+    game_state.step(0.1)
+    assert batch.accepted.all()
+    for aircraft in game_state.aircraft.values():
+        assert 100 <= aircraft.target_speed <= aircraft.max_speed
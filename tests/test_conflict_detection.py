@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from aircraft import Aircraft
+from fleet import AircraftFleet
+from conflict_detection import ConflictTracker, find_conflicts, find_conflicts_brute_force
+
+
+def make_fleet(states):
+    # states: (x, y, altitude) per aircraft
+    fleet = AircraftFleet()
+    for index, (x, y, altitude) in enumerate(states):
+        aircraft = Aircraft(f"T{index:04d}", 'medium', (x, y), altitude, 0)
+        fleet.add(aircraft)
+        aircraft.aircraft_id = index + 1
+    return fleet
+
+
+def assert_matches(fleet):
+    expected = find_conflicts_brute_force(fleet.members)
+    assert find_conflicts(fleet) == expected
+    assert ConflictTracker().update(fleet, 0.0) == expected
+    return expected
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('count', [2, 50, 400])
+def test_matches_brute_force_on_random_fleets(seed, count):
+    rng = np.random.default_rng(seed)
+    states = np.column_stack((
+        rng.uniform(-30, 30, count),
+        rng.uniform(-30, 30, count),
+        rng.integers(50, 150, count) * 100.0
+    ))
+    assert_matches(make_fleet(states))
+
+
+def test_empty_and_single_fleets():
+    assert assert_matches(make_fleet([])) == set()
+    assert assert_matches(make_fleet([(0, 0, 10000)])) == set()
+
+
+def test_horizontal_boundary():
+    # 3-4-5 triangle: exactly 5 nm apart is separated, just inside is not
+    at_minimum = assert_matches(make_fleet([(0, 0, 10000), (3, 4, 10000)]))
+    inside = assert_matches(make_fleet([(0, 0, 10000), (3, 4 - 1e-9, 10000)]))
+    assert at_minimum == set()
+    assert inside == {('T0000', 'T0001')}
+
+
+def test_vertical_boundary():
+    at_minimum = assert_matches(make_fleet([(0, 0, 10000), (1, 0, 11000)]))
+    inside = assert_matches(make_fleet([(0, 0, 10000), (1, 0, 10999.999)]))
+    assert at_minimum == set()
+    assert inside == {('T0000', 'T0001')}
+
+
+def test_corner_of_separation_box():
+    # Inside the bounding box in every axis, but outside the 5 nm circle
+    assert assert_matches(make_fleet([(0, 0, 10000), (4, 4, 10500)])) == set()
+
+
+def test_grid_on_exact_spacing():
+    # Every neighbour sits exactly on a minimum, diagonals are well inside the box
+    states = [(x * 5.0, y * 5.0, level * 1000.0) for x in range(6) for y in range(6) for level in range(10, 13)]
+    assert assert_matches(make_fleet(states)) == set()
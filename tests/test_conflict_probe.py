@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from aircraft import Aircraft
+from fleet import AircraftFleet
+from conflict_detection import ConflictProbe, predict_conflicts
+
+
+def make_fleet(states):
+    # states: (x, y, altitude, heading) per aircraft, all at 360 kt (0.1 nm/s) in still air
+    fleet = AircraftFleet()
+    for index, (x, y, altitude, heading) in enumerate(states):
+        fleet.add(Aircraft(f"T{index:04d}", 'medium', (x, y), altitude, heading, speed=360))
+    return fleet
+
+
+def test_head_on_pair_matches_hand_computed_geometry():
+    # Closing at 0.2 nm/s from 20 nm along x with a 3 nm lateral offset: the CPA is
+    # at 100 s, 3 nm apart, and the 5 nm minimum is lost once 20 - 0.2 t reaches
+    # sqrt(5^2 - 3^2) = 4, at 80 s
+    fleet = make_fleet([(0.0, 0.0, 10000, 90), (20.0, 3.0, 10000, 270)])
+    predictions = predict_conflicts(fleet, horizon=120)
+    assert list(predictions) == [('T0000', 'T0001')]
+    prediction = predictions[('T0000', 'T0001')]
+    assert prediction['time_to_conflict'] == pytest.approx(80.0)
+    assert prediction['time_to_cpa'] == pytest.approx(100.0)
+    assert prediction['cpa_distance'] == pytest.approx(3.0)
+    assert prediction['cpa_vertical'] == pytest.approx(0.0)
+
+
+def test_climb_into_the_band_sets_the_loss_time():
+    # Same geometry, but the second aircraft climbs from 6000 ft to 10000 ft at 1800
+    # fpm (30 ft/s): inside the 1000 ft band from 100 s, still inside the 80..120 s
+    # horizontal window, and 1000 ft below at the CPA
+    fleet = make_fleet([(0.0, 0.0, 10000, 90), (20.0, 3.0, 6000, 270)])
+    fleet.target_altitude[1] = 10000
+    fleet.climb_rate[1] = 1800
+    prediction = predict_conflicts(fleet, horizon=150)[('T0000', 'T0001')]
+    assert prediction['time_to_conflict'] == pytest.approx(100.0)
+    assert prediction['time_to_cpa'] == pytest.approx(100.0)
+    assert prediction['cpa_vertical'] == pytest.approx(1000.0)
+
+
+@pytest.mark.parametrize('states', [
+    # Diverging: the second is north of the first and heading further north
+    [(0.0, 0.0, 10000, 180), (0.0, 10.0, 10000, 0)],
+    # Parallel tracks 6 nm apart, never closer
+    [(0.0, 0.0, 10000, 90), (0.0, 6.0, 10000, 90)],
+    # Head-on through each other, but 2000 ft apart and level
+    [(0.0, 0.0, 10000, 90), (20.0, 0.0, 12000, 270)],
+    # Converging, but the loss of separation comes after the horizon
+    [(0.0, 0.0, 10000, 90), (40.0, 0.0, 10000, 270)],
+])
+def test_non_converging_pairs_are_not_reported(states):
+    assert predict_conflicts(make_fleet(states), horizon=120) == {}
+
+
+def test_spread_probe_matches_one_shot_probe():
+    rng = np.random.default_rng(3)
+    count = 300
+    fleet = make_fleet(zip(
+        rng.uniform(-40, 40, count), rng.uniform(-40, 40, count),
+        rng.choice([8000, 9000, 10000, 11000], count), rng.uniform(0, 360, count)
+    ))
+    expected = predict_conflicts(fleet, horizon=300)
+    assert expected
+
+    # Advanced over 5 s in 1/60 s ticks; times count from the tick that computed them
+    probe = ConflictProbe()
+    probe.start(fleet, horizon=300, interval=5.0)
+    ticks = 0
+    predictions = None
+    while predictions is None:
+        ticks += 1
+        predictions = probe.advance(1 / 60)
+    assert ticks > 1
+    assert ticks <= 5 * 60 + 1
+    assert predictions.keys() == expected.keys()
+    for pair, prediction in predictions.items():
+        assert prediction['cpa_distance'] == pytest.approx(expected[pair]['cpa_distance'])
+        for name in ('time_to_conflict', 'time_to_cpa'):
+            assert expected[pair][name] - probe.elapsed - 1e-9 <= prediction[name] <= expected[pair][name]
@@ -0,0 +1,57 @@
+import numpy as np
+from aircraft import Aircraft
+from fleet import AircraftFleet
+
+
+def make_aircraft():
+    # Turning both ways, climbing, descending, slowing down and holding steady
+    setups = [
+        ((0.0, 0.0), 5000, 90, 'medium', dict(target_heading=180, target_altitude=9000)),
+        ((10.0, -4.0), 12000, 350, 'heavy', dict(target_heading=270, target_altitude=6000)),
+        ((-8.0, 3.0), 8000, 45, 'small', dict(target_speed=160)),
+        ((2.0, 15.0), 3000, 200, 'medium', dict(target_heading=20, target_altitude=4000, target_speed=220)),
+        ((-5.0, -9.0), 7000, 120, 'heavy', dict()),
+    ]
+    wind = [(10.0, -5.0), (-20.0, 3.0), (0.0, 12.0), (7.0, 7.0), (-3.0, -15.0)]
+    result = []
+    for index, ((position, altitude, heading, aircraft_type, targets), drift) in enumerate(zip(setups, wind)):
+        aircraft = Aircraft(f"T{index}", aircraft_type, position, altitude, heading)
+        aircraft.set_target_altitude(targets.get('target_altitude', altitude))
+        aircraft.set_target_heading(targets.get('target_heading', heading))
+        aircraft.set_target_speed(targets.get('target_speed', aircraft.speed))
+        aircraft._fleet.wind[aircraft._index] = drift
+        result.append(aircraft)
+    return result
+
+
+def test_fleet_step_matches_scalar_updates():
+    # The same aircraft flown as one fleet, through an index array as well as a
+    # slice, and one by one through Aircraft.update
+    scalar = make_aircraft()
+    fleet = AircraftFleet(capacity=8)
+    batched = make_aircraft()
+    for aircraft in batched:
+        fleet.add(aircraft)
+
+    rows = np.array([3, 0, 4, 1, 2])
+    for step in range(40):
+        for aircraft in scalar:
+            aircraft.update(0.5, 1.0)
+        fleet.step(rows if step % 2 else slice(0, fleet.count), 0.5)
+
+    for one, many in zip(scalar, batched):
+        assert np.allclose(one.position, many.position)
+        assert np.isclose(one.altitude, many.altitude)
+        assert np.isclose(one.heading, many.heading)
+        assert np.isclose(one.speed, many.speed)
+    assert not np.allclose(batched[0].position, (0.0, 0.0))
+
+
+def test_fleet_step_leaves_other_rows_alone():
+    fleet = AircraftFleet(capacity=8)
+    for aircraft in make_aircraft():
+        fleet.add(aircraft)
+    before = fleet.active('position').copy()
+    fleet.step(np.array([1, 3]), 1.0)
+    moved = np.any(fleet.active('position') != before, axis=1)
+    assert moved.tolist() == [False, True, False, True, False]
@@ -0,0 +1,45 @@
+import numpy as np
+from game_state import GameState
+
+
+def single_aircraft(position, heading, aircraft_type='heavy'):
+    game_state = GameState('KRST', seed=1)
+    game_state.spawn_interval = float('inf')
+    game_state.add_aircraft('T1', aircraft_type, position, 10000, heading)
+    return game_state, game_state.aircraft['T1']
+
+
+def test_direct_to_a_fix_behind_turns_back_to_it():
+    game_state, aircraft = single_aircraft((10.0, 10.0), 0)
+    fix = np.array([10.0, 6.0])  # 4 nm behind, inside two turn radii at 450 kt
+    aircraft.direct_to(fix)
+    game_state.step(0.1)
+    assert aircraft.navigating
+    assert len(aircraft.waypoints) == 1
+
+    closest = np.inf
+    for _ in range(3000):
+        game_state.step(0.1)
+        closest = min(closest, np.hypot(*(aircraft.position - fix)))
+        if not aircraft.waypoints:
+            break
+    assert not aircraft.waypoints
+    assert closest < 1.0
+
+
+def test_route_fixes_are_flown_by():
+    # 90 degree turn at (0, 20): the first fix is sequenced a turn anticipation
+    # before it is reached, then the second is flown to
+    game_state, aircraft = single_aircraft((0.0, 0.0), 0, 'medium')
+    aircraft.set_route([(0.0, 20.0), (20.0, 20.0)])
+    sequenced_at = None
+    for _ in range(6000):
+        game_state.step(0.1)
+        if sequenced_at is None and len(aircraft.waypoints) == 1:
+            sequenced_at = aircraft.position.copy()
+        if not aircraft.waypoints:
+            break
+    assert sequenced_at is not None
+    assert 0.5 < np.hypot(*(sequenced_at - (0.0, 20.0))) < 5.0
+    assert not aircraft.waypoints
+    assert np.hypot(*(aircraft.position - (20.0, 20.0))) < 2.0
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pytest
+
+pygame = pytest.importorskip('pygame')
+
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, STORM_COLORS
+from game_state import GameState
+from profiler import FrameProfiler
+from renderer import Renderer
+
+
+@pytest.fixture
+def screen():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.init()
+    yield pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.quit()
+
+
+def add_storm(game_state, position, intensity=0.9):
+    game_state.weather['storms'] = [{
+        'position': list(position), 'radius': 8.0, 'intensity': intensity, 'peak': intensity,
+        'age': 100.0, 'lifetime': 3000.0
+    }]
+    game_state.weather_field.rebuild(game_state.weather)
+
+
+def test_storm_cells_are_drawn_on_the_scope(screen):
+    game_state = GameState('KRST', seed=1)
+    renderer = Renderer(screen)
+    renderer.render(game_state)
+    calm = renderer.background
+
+    add_storm(game_state, (20.0, -10.0))
+    renderer.render(game_state)
+    assert renderer.background is not calm
+    x, y = renderer._world_to_screen(np.array([20.0, -10.0]))
+    assert tuple(screen.get_at((int(x), int(y))))[:3] == STORM_COLORS[-1]
+
+
+def test_calm_weather_updates_keep_the_background(screen):
+    game_state = GameState('KRST', seed=1)
+    renderer = Renderer(screen)
+    renderer.render(game_state)
+    background = renderer.background
+    game_state.weather_field.rebuild(game_state.weather)
+    renderer.render(game_state)
+    assert renderer.background is background
+
+
+
+def test_profiler_overlay_reports_text_cache_hits(screen):
+    renderer = Renderer(screen)
+    renderer.profiler = FrameProfiler()
+    renderer.profiler.enabled = True
+    renderer.text_cache.hits, renderer.text_cache.misses = 9, 1
+    entries = len(renderer.text_cache.entries)
+    renderer._draw_profiler_overlay(0, 0)
+    assert renderer.profiler_lines[-1] == f"text cache: {entries} entries, 90% hits (1 misses)"
+
+    # Counters restart at each refresh; only the overlay's own text has been looked up since
+    assert renderer.text_cache.hits + renderer.text_cache.misses == len(renderer.profiler_lines) + 1
@@ -0,0 +1,64 @@
+import asyncio
+from game_state import GameState
+from net_protocol import COMMAND, FRAME_PREFIX, REJECTED, pack_frame, read_frame
+from server import SimulationServer
+
+
+def serve(scenario):
+    async def main():
+        server = SimulationServer(GameState('KRST', seed=1), port=0)
+        await server.start()
+        try:
+            return await asyncio.wait_for(scenario(server), 10)
+        finally:
+            await server.stop()
+    return asyncio.run(main())
+
+
+async def frames_until(reader, predicate):
+    while True:
+        frame = await read_frame(reader)
+        if frame is None or predicate(frame[0]):
+            return frame
+
+
+def test_oversized_frame_drops_the_connection():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(FRAME_PREFIX.pack(1 << 30, 0))
+        await writer.drain()
+        frame = await frames_until(reader, lambda header: False)
+        writer.close()
+        return frame, server.clients
+
+    frame, clients = serve(scenario)
+    assert frame is None
+    assert not clients
+
+
+def test_malformed_commands_are_rejected_and_the_simulation_keeps_running():
+    async def scenario(server):
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        malformed = [
+            {'type': COMMAND, 'command': ['heading'], 'callsign': 'X', 'value': 90},
+            {'type': COMMAND, 'command': 'heading', 'callsign': {'a': 1}, 'value': 90},
+            {'type': COMMAND, 'command': 'altitude', 'callsign': 'X', 'value': [[1, 2], [3]]},
+            {'type': COMMAND, 'command': 'direct', 'callsign': 'X', 'value': {'name': 'R13'}},
+        ]
+        for command in malformed:
+            writer.write(pack_frame(command))
+        writer.write(b'\x00\x00\x00\x00')  # Half a prefix; the connection stays open
+        await writer.drain()
+        rejections = []
+        while len(rejections) < len(malformed):
+            frame = await frames_until(reader, lambda header: header['type'] == REJECTED)
+            assert frame is not None
+            rejections.append(frame[0])
+        ticks = server.ticks
+        await asyncio.sleep(0.1)
+        writer.close()
+        return rejections, ticks, server.ticks
+
+    rejections, before, after = serve(scenario)
+    assert len(rejections) == 4
+    assert after > before
@@ -0,0 +1,60 @@
+import time
+import pytest
+from commands import UNKNOWN_AIRCRAFT
+from game_state import GameState
+from sim_thread import SimulationThread
+
+
+def test_commands_and_spawns_apply_in_submission_order():
+    game_state = GameState('KRST', seed=1)
+    next_id = game_state.next_aircraft_id
+    before = game_state.issue_commands('heading', [next_id], [90])
+    game_state.request_spawn()
+    after = game_state.issue_commands('heading', [next_id], [180])
+    game_state.step(0.1)
+    assert before.reasons == [(0, UNKNOWN_AIRCRAFT)]
+    assert after.accepted.tolist() == [True]
+    assert game_state.fleet.target_heading[0] == 180
+
+
+def test_channel_keeps_spawns_in_order():
+    simulation = SimulationThread(GameState('KRST', seed=1))
+    next_id = simulation.game_state.next_aircraft_id
+    simulation.channel.request_spawn()
+    batch = simulation.channel.submit('altitude', [next_id], [12000])
+    simulation.channel.drain(simulation.game_state.commands)
+    simulation.game_state.step(0.1)
+    assert batch.accepted.tolist() == [True]
+
+
+def test_failure_on_the_simulation_thread_reaches_view():
+    simulation = SimulationThread(GameState('KRST', seed=1))
+    simulation.start()
+    try:
+        simulation.view()
+
+        def fail(game_state):
+            raise ZeroDivisionError("boom")
+        simulation.call(fail)
+        deadline = time.perf_counter() + 5
+        while simulation.running and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        assert isinstance(simulation.error, ZeroDivisionError)
+        with pytest.raises(RuntimeError) as failure:
+            simulation.view()
+        assert isinstance(failure.value.__cause__, ZeroDivisionError)
+    finally:
+        simulation.stop()
+
+
+def test_snapshots_carry_the_storm_grid():
+    game_state = GameState('KRST', seed=1)
+    game_state.weather['storms'] = [{
+        'position': [0.0, 0.0], 'radius': 8.0, 'intensity': 0.5, 'peak': 0.5, 'age': 0.0, 'lifetime': 600.0
+    }]
+    game_state.weather_field.rebuild(game_state.weather)
+    simulation = SimulationThread(game_state)
+    simulation._publish()
+    view_state, _ = simulation.view()
+    assert view_state.weather_field.storm is game_state.weather_field.storm
+    assert not view_state.weather_field.storm.flags.writeable
@@ -0,0 +1,53 @@
+import json
+import os
+import numpy as np
+from game_state import GameState
+from track_recorder import META_FILE, TrackRecorder, TrackRecording
+
+
+def record(path, seconds, keyframe_interval=10.0, dt=0.5):
+    game_state = GameState('KRST', seed=3)
+    game_state.spawn_interval = 5
+    game_state.recorder = TrackRecorder(path, 'KRST', keyframe_interval=keyframe_interval)
+    for _ in range(int(seconds / dt)):
+        game_state.step(dt)
+    return game_state
+
+
+def test_closed_recording_round_trips(tmp_path):
+    path = str(tmp_path / 'rec')
+    game_state = record(path, 60)
+    game_state.recorder.close()
+    recording = TrackRecording(path)
+    assert recording.meta['complete']
+    assert len(recording) == 120
+    assert recording.ticks['time'][-1] == game_state.time
+    assert len(recording.tick_samples(len(recording) - 1)) == len(game_state.aircraft)
+
+
+def test_meta_is_written_at_every_keyframe(tmp_path):
+    path = str(tmp_path / 'rec')
+    game_state = record(path, 25)
+    with open(os.path.join(path, META_FILE)) as stream:
+        meta = json.load(stream)
+    assert not meta['complete']
+    assert meta['keyframes'] == 3
+    assert not os.path.exists(os.path.join(path, META_FILE + '.tmp'))
+    game_state.recorder.close()
+
+
+def test_unclosed_recording_recovers_ticks_past_last_keyframe(tmp_path):
+    # Never closing the recorder leaves the files as a crash would
+    crashed = str(tmp_path / 'crashed')
+    closed = str(tmp_path / 'closed')
+    record(crashed, 45)
+    record(closed, 45).recorder.close()
+
+    recovered = TrackRecording(crashed)
+    reference = TrackRecording(closed)
+    assert recovered.meta['ticks'] < len(reference)
+    assert len(recovered) == len(reference)
+    assert np.array_equal(recovered.ticks, reference.ticks)
+    assert np.array_equal(recovered.samples, reference.samples)
+    assert np.array_equal(recovered.conflicts, reference.conflicts)
+    assert len(recovered.keyframe_index) == len(reference.keyframe_index)
@@ -0,0 +1,54 @@
+import os
+import pytest
+from game_state import GameState
+from traffic_schedule import load_schedule
+
+
+def write_schedule(path, rows=200, start=6 * 3600, spacing=20):
+    entries = ['N', 'S', 'E', 'W']
+    with open(path, 'w') as stream:
+        stream.write("time,callsign,aircraft_type,entry,altitude\n")
+        for row in range(rows):
+            stream.write(f"{start + row * spacing},TST{row},medium,{entries[row % 4]},{10000 + row % 5 * 2000}\n")
+
+
+def run(game_state, seconds, dt=1.0):
+    for _ in range(int(seconds / dt)):
+        game_state.step(dt)
+
+
+def test_clock_starts_at_first_flight(tmp_path):
+    path = str(tmp_path / 'schedule.csv')
+    write_schedule(path)
+    game_state = GameState('KRST', seed=1)
+    load_schedule(game_state, path)
+    assert game_state.time == 6 * 3600
+    game_state.step(1.0)
+    assert 'TST0' in game_state.aircraft
+
+
+def test_restored_snapshot_keeps_feeding(tmp_path):
+    path = str(tmp_path / 'schedule.csv')
+    write_schedule(path)
+    game_state = GameState('KRST', seed=1)
+    load_schedule(game_state, path, lookahead=120)
+    run(game_state, 600)
+    restored = GameState.from_snapshot(game_state.snapshot())
+    run(game_state, 900)
+    run(restored, 900)
+    assert restored.schedule.flights_queued == game_state.schedule.flights_queued
+    assert restored.aircraft_handled == game_state.aircraft_handled
+    assert set(restored.aircraft) == set(game_state.aircraft)
+
+
+def test_restore_without_schedule_file(tmp_path):
+    path = str(tmp_path / 'schedule.csv')
+    write_schedule(path)
+    game_state = GameState('KRST', seed=1)
+    load_schedule(game_state, path, lookahead=120)
+    run(game_state, 300)
+    snapshot = game_state.snapshot()
+    os.remove(path)
+    restored = GameState.from_snapshot(snapshot)
+    assert restored.schedule is None
+    run(restored, 600)  # Refill events left in the queue are skipped
@@ -0,0 +1,46 @@
+import random
+import numpy as np
+from config import STORM_GUST, WIND_EFFECT_MULTIPLIER
+from weather import WeatherField, evolve_storms, initialize_weather
+
+
+def stormy_weathers(count, updates=300):
+    rng = random.Random(7)
+    weathers = []
+    for index in range(count):
+        weather = initialize_weather(rng)
+        for _ in range(updates * index // count):
+            evolve_storms(weather, rng, 10)
+        weathers.append(weather)
+    return weathers
+
+
+def test_rebuild_lanes_matches_single_rebuilds():
+    # Lanes with differing storm counts are padded; each must come out as if alone
+    weathers = stormy_weathers(6)
+    assert len({len(weather['storms']) for weather in weathers}) > 1
+    fields = [WeatherField() for _ in weathers]
+    WeatherField.rebuild_lanes(fields, weathers)
+    for field, weather in zip(fields, weathers):
+        single = WeatherField()
+        single.rebuild(weather)
+        assert np.allclose(field.wind, single.wind)
+        assert np.allclose(field.storm, single.storm)
+        assert np.isclose(field.max_wind, single.max_wind)
+
+
+def test_storm_outflow_matches_radial_formula():
+    # One cell in still air: gust = STORM_GUST * core * d / r, pointing away from it
+    weather = {'wind_direction': 0.0, 'wind_speed': 0.0, 'variation': [(0, 0, 0, 0, 0)], 'storms': [
+        {'position': [3.0, -4.0], 'radius': 10.0, 'intensity': 0.8}
+    ]}
+    field = WeatherField()
+    field.rebuild(weather)
+    dx = field.grid_x - 3.0
+    dy = field.grid_y + 4.0
+    distance = np.hypot(dx, dy)
+    core = 0.8 * np.exp(-(distance / 10.0) ** 2)
+    gust = STORM_GUST * core * distance / 10.0 * WIND_EFFECT_MULTIPLIER
+    assert np.allclose(field.storm, core)
+    assert np.allclose(field.wind[..., 0], gust * dx / np.maximum(distance, 1e-9))
+    assert np.allclose(field.wind[..., 1], gust * dy / np.maximum(distance, 1e-9))